@@ -32,6 +32,8 @@ def get_default_config() -> Dict[str, Any]:
         "storage": {
             "data_dir": _expand_path("~/.cache/fastgraph/data"),
             "default_format": "msgpack",
+            "trust_extension": True,
+            "search_workers": 1,
             "backup_enabled": True,
             "backup_interval": 3600,  # seconds
             "max_backup_files": 5,
@@ -154,6 +156,8 @@ def get_config_schema() -> Dict[str, Any]:
             "properties": {
                 "data_dir": {"type": "string", "required": True},
                 "default_format": {"type": "string", "required": True, "enum": ["msgpack", "pickle", "json"]},
+                "trust_extension": {"type": "boolean", "default": True},
+                "search_workers": {"type": "integer", "min": 1, "default": 1},
                 "backup_enabled": {"type": "boolean", "default": True},
                 "backup_interval": {"type": "integer", "min": 60, "default": 3600},
                 "max_backup_files": {"type": "integer", "min": 1, "default": 5}
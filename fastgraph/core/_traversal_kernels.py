@@ -0,0 +1,349 @@
+"""
+Compiled traversal kernels for FastGraph
+
+This module contains Numba-compiled BFS/DFS kernels that operate directly
+on the CSR arrays built by TraversalOperations. Numba is optional: when it
+is not installed NUMBA_AVAILABLE is False and the traversal code keeps
+using its pure-Python loops.
+
+Importing Numba takes far longer than the rest of the package, so it is
+only imported, and the kernels compiled, the first time enabled() is
+called; NUMBA_AVAILABLE is just whether it is installed.
+"""
+
+from array import array
+from importlib.util import find_spec
+from typing import Optional
+
+NUMBA_AVAILABLE = find_spec("numba") is not None and find_spec("numpy") is not None
+
+# Bound by _load_kernels()
+np = None
+prange = range
+bfs_csr = bfs_csr_parallel = dfs_csr = shortest_path_csr = None
+components_csr_parallel = None
+_loaded = False
+
+
+def as_int32(values: array):
+    """
+    Wrap an int32 ``array.array`` as a NumPy view without copying.
+    
+    Args:
+        values: Array with typecode "i"
+    
+    Returns:
+        numpy.ndarray of dtype int32 sharing the same buffer
+    """
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int32)
+    return np.frombuffer(values, dtype=np.int32)
+
+
+def _bfs_csr(indptr, indices, src, max_depth):
+    """
+    Top-down BFS from ``src`` over a CSR graph.
+    
+    Args:
+        indptr: Row offsets (int32, length N + 1)
+        indices: Column indices (int32, length M)
+        src: Source node int
+        max_depth: Maximum depth to expand, or -1 for unlimited
+    
+    Returns:
+        Tuple of (nodes in discovery order, parent per node, CSR position
+        of the edge each node was discovered through, depth per node);
+        undiscovered nodes hold -1
+    """
+    n = indptr.shape[0] - 1
+    depth = np.full(n, -1, np.int32)
+    parent = np.full(n, -1, np.int32)
+    parent_edge = np.full(n, -1, np.int32)
+    queue = np.empty(n, np.int32)
+    
+    queue[0] = src
+    depth[src] = 0
+    head = 0
+    tail = 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        if max_depth >= 0 and depth[u] >= max_depth:
+            continue
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            if depth[v] == -1:
+                depth[v] = depth[u] + 1
+                parent[v] = u
+                parent_edge[v] = j
+                queue[tail] = v
+                tail += 1
+    
+    return queue[:tail], parent, parent_edge, depth
+
+
+def _bfs_csr_parallel(indptr, indices, src, max_depth):
+    """
+    Level-synchronous BFS that scans each frontier in parallel.
+    
+    Numba has no atomic compare-and-swap, so each level is expanded in two
+    passes: threads scan their frontier nodes' rows in parallel and write
+    every still-unvisited neighbor into a private slice of a candidate
+    buffer, then a sequential pass dedupes the candidates in frontier
+    order. The result is identical to ``_bfs_csr``.
+    
+    Args:
+        indptr: Row offsets (int32, length N + 1)
+        indices: Column indices (int32, length M)
+        src: Source node int
+        max_depth: Maximum depth to expand, or -1 for unlimited
+    
+    Returns:
+        Same tuple as ``_bfs_csr``
+    """
+    n = indptr.shape[0] - 1
+    depth = np.full(n, -1, np.int32)
+    parent = np.full(n, -1, np.int32)
+    parent_edge = np.full(n, -1, np.int32)
+    queue = np.empty(n, np.int32)
+    
+    queue[0] = src
+    depth[src] = 0
+    head = 0
+    tail = 1
+    level = 0
+    while head < tail and (max_depth < 0 or level < max_depth):
+        f_len = tail - head
+        # Slot offsets so every frontier node owns a private candidate slice
+        offsets = np.empty(f_len + 1, np.int64)
+        offsets[0] = 0
+        for i in range(f_len):
+            u = queue[head + i]
+            offsets[i + 1] = offsets[i] + indptr[u + 1] - indptr[u]
+        candidates = np.empty(offsets[f_len], np.int32)
+        
+        for i in prange(f_len):
+            u = queue[head + i]
+            k = offsets[i]
+            for j in range(indptr[u], indptr[u + 1]):
+                # depth is only written between levels, so this read is race-free
+                candidates[k] = j if depth[indices[j]] == -1 else -1
+                k += 1
+        
+        for i in range(f_len):
+            u = queue[head + i]
+            for k in range(offsets[i], offsets[i + 1]):
+                j = candidates[k]
+                if j == -1:
+                    continue
+                v = indices[j]
+                if depth[v] == -1:
+                    depth[v] = level + 1
+                    parent[v] = u
+                    parent_edge[v] = j
+                    queue[tail] = v
+                    tail += 1
+        
+        head += f_len
+        level += 1
+    
+    return queue[:tail], parent, parent_edge, depth
+
+
+def _dfs_csr(indptr, indices, src, max_depth):
+    """
+    Stack-based DFS from ``src`` over a CSR graph.
+    
+    Nodes are marked visited when popped and neighbors are pushed in
+    reverse so they pop in adjacency order, matching
+    TraversalOperations.dfs.
+    
+    Args:
+        indptr: Row offsets (int32, length N + 1)
+        indices: Column indices (int32, length M)
+        src: Source node int
+        max_depth: Maximum depth to expand, or -1 for unlimited
+    
+    Returns:
+        Tuple of (nodes in visit order, nodes in first-discovery order,
+        parent per node, CSR positions of every pushed edge, deepest
+        visited depth)
+    """
+    n = indptr.shape[0] - 1
+    m = indices.shape[0]
+    visited = np.zeros(n, np.bool_)
+    discovered = np.zeros(n, np.bool_)
+    parent = np.full(n, -1, np.int32)
+    visit_order = np.empty(n, np.int32)
+    discover_order = np.empty(n, np.int32)
+    pushed_edges = np.empty(m, np.int32)
+    # Every push follows an edge out of a node visited once, so M + 1 slots suffice
+    stack_node = np.empty(m + 1, np.int32)
+    stack_depth = np.empty(m + 1, np.int32)
+    
+    stack_node[0] = src
+    stack_depth[0] = 0
+    top = 1
+    discovered[src] = True
+    discover_order[0] = src
+    n_discovered = 1
+    n_visited = 0
+    n_pushed = 0
+    max_seen = 0
+    
+    while top > 0:
+        top -= 1
+        u = stack_node[top]
+        d = stack_depth[top]
+        if visited[u]:
+            continue
+        
+        visited[u] = True
+        visit_order[n_visited] = u
+        n_visited += 1
+        if d > max_seen:
+            max_seen = d
+        if max_depth >= 0 and d >= max_depth:
+            continue
+        
+        for j in range(indptr[u + 1] - 1, indptr[u] - 1, -1):
+            v = indices[j]
+            if visited[v]:
+                continue
+            stack_node[top] = v
+            stack_depth[top] = d + 1
+            top += 1
+            pushed_edges[n_pushed] = j
+            n_pushed += 1
+            if not discovered[v]:
+                discovered[v] = True
+                parent[v] = u
+                discover_order[n_discovered] = v
+                n_discovered += 1
+    
+    return (visit_order[:n_visited], discover_order[:n_discovered], parent,
+            pushed_edges[:n_pushed], max_seen)
+
+
+def _shortest_path_csr(indptr, indices, src, dst):
+    """
+    BFS from ``src`` that stops as soon as ``dst`` is discovered.
+    
+    Args:
+        indptr: Row offsets (int32, length N + 1)
+        indices: Column indices (int32, length M)
+        src: Source node int
+        dst: Target node int
+    
+    Returns:
+        Parent per node (the source is its own parent); ``parent[dst]`` is
+        -1 when the target is unreachable
+    """
+    n = indptr.shape[0] - 1
+    parent = np.full(n, -1, np.int32)
+    queue = np.empty(n, np.int32)
+    
+    parent[src] = src
+    queue[0] = src
+    head = 0
+    tail = 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            if parent[v] == -1:
+                parent[v] = u
+                if v == dst:
+                    return parent
+                queue[tail] = v
+                tail += 1
+    
+    return parent
+
+
+def _components_csr_parallel(indptr, indices):
+    """
+    Weakly connected component labels by parallel min-label hooking.
+    
+    Every label is a node of the same component with an id no larger than
+    the node's own, so concurrent unsynchronized writes can lose an update
+    but never break that invariant: a lost hook is simply redone on the
+    next pass. Passes alternate between hooking across edges and pointer
+    jumping until an edge pass makes no change, at which point every node
+    holds the smallest id of its component.
+    
+    Args:
+        indptr: Row offsets (int32, length N + 1)
+        indices: Column indices (int32, length M)
+    
+    Returns:
+        Component label per node (the component's smallest node int)
+    """
+    n = indptr.shape[0] - 1
+    m = indices.shape[0]
+    src = np.empty(m, np.int32)
+    labels = np.empty(n, np.int32)
+    for u in prange(n):
+        labels[u] = u
+        for j in range(indptr[u], indptr[u + 1]):
+            src[j] = u
+    
+    changed = 1
+    while changed > 0:
+        changed = 0
+        for j in prange(m):
+            lu = labels[src[j]]
+            lv = labels[indices[j]]
+            if lu < lv:
+                labels[lv] = lu
+                changed += 1
+            elif lv < lu:
+                labels[lu] = lv
+                changed += 1
+        
+        for v in prange(n):
+            while labels[v] != labels[labels[v]]:
+                labels[v] = labels[labels[v]]
+    
+    return labels
+
+
+def max_depth_arg(max_depth: Optional[int]) -> int:
+    """Encode an optional depth limit for the kernels (-1 = unlimited)."""
+    return -1 if max_depth is None else max_depth
+
+
+def _load_kernels() -> None:
+    """Import Numba and NumPy and compile the kernels."""
+    global np, prange, NUMBA_AVAILABLE, _loaded
+    global bfs_csr, bfs_csr_parallel, dfs_csr, shortest_path_csr, components_csr_parallel
+    
+    _loaded = True
+    try:
+        import numpy
+        from numba import njit, prange as numba_prange
+    except ImportError:  # pragma: no cover - depends on the environment
+        NUMBA_AVAILABLE = False
+        return
+    
+    # The kernels resolve np and prange as module globals when compiled
+    np = numpy
+    prange = numba_prange
+    bfs_csr = njit(cache=True, boundscheck=False)(_bfs_csr)
+    bfs_csr_parallel = njit(cache=True, boundscheck=False, parallel=True)(_bfs_csr_parallel)
+    dfs_csr = njit(cache=True, boundscheck=False)(_dfs_csr)
+    shortest_path_csr = njit(cache=True, boundscheck=False)(_shortest_path_csr)
+    components_csr_parallel = njit(cache=True, boundscheck=False, parallel=True)(_components_csr_parallel)
+
+
+def enabled() -> bool:
+    """
+    Check whether the compiled kernels can be used, loading them if so.
+    
+    Returns:
+        True if Numba is available and the kernels are bound
+    """
+    if NUMBA_AVAILABLE and not _loaded:
+        _load_kernels()
+    return NUMBA_AVAILABLE
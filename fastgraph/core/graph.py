@@ -102,6 +102,10 @@ class FastGraph:
         # Optimization: Relation index for fast rel queries
         self._rel_index: Dict[str, List[Edge]] = defaultdict(list)
         
+        # Bumped on every structural change; derived structures (e.g. the
+        # traversal CSR) compare against it to know when to rebuild
+        self._mutation_version = 0
+        
         # Thread safety - must be initialized before managers that use it
         self._lock = threading.RLock()
         
@@ -215,6 +219,7 @@ class FastGraph:
                 self.graph["nodes"][node_id] = dict(attrs)
                 self.index_manager.update_node_index(node_id, {}, attrs)
             
+            self._mutation_version += 1
             self._metrics["nodes_added"] += len(nodes)
             self.clear_cache()
     
@@ -260,6 +265,7 @@ class FastGraph:
             # Update indexes
             self.index_manager.update_node_index(node_id, old_attrs, attrs)
             
+            self._mutation_version += 1
             self._metrics["nodes_added"] += 1
             self.clear_cache()
     
@@ -298,6 +304,7 @@ class FastGraph:
             
             # Remove node
             del self.graph["nodes"][node_id]
+            self._mutation_version += 1
             self.clear_cache()
     
     # ==================== EDGE OPERATIONS ====================
@@ -329,6 +336,8 @@ class FastGraph:
         
         # Update relation index
         self._rel_index[rel].append(edge)
+        
+        self._mutation_version += 1
     
     def add_edge(self, src: NodeId, dst: NodeId, rel: str, **attrs: Any) -> None:
         """
@@ -372,6 +381,7 @@ class FastGraph:
         key = edge.key()
         if key in self._edges:
             del self._edges[key]
+            self._mutation_version += 1
             
             # Update adjacency lists
             if edge.src in self._out_edges:
@@ -471,6 +481,19 @@ class FastGraph:
         """
         return self.traversal_ops.neighbors(node_id, rel)
     
+    def neighbors_iter(self, node_id: NodeId, rel: Optional[str] = None) -> Iterator[Tuple[NodeId, Edge]]:
+        """
+        Iterate over all neighbors (both directions) without building lists.
+        
+        Args:
+            node_id: Node ID
+            rel: Optional relation filter
+            
+        Returns:
+            Iterator of (neighbor_id, edge) tuples
+        """
+        return self.traversal_ops.neighbors_iter(node_id, rel)
+    
     def degree(self, node_id: NodeId) -> Tuple[int, int, int]:
         """
         Returns (out_degree, in_degree, total_degree).
@@ -806,6 +829,7 @@ class FastGraph:
         # Reconstruct graph
         self.graph["nodes"] = data["nodes"]
         self.graph["metadata"] = data.get("metadata", self.graph["metadata"])
+        self._mutation_version += 1
         
         # Rebuild edges
         for edge in data["edges"].values():
@@ -1229,6 +1253,7 @@ class FastGraph:
             self._rel_index.clear()
             self.index_manager.node_indexes.clear()
             self._subgraph_views.clear()
+            self._mutation_version += 1
             self.clear_cache()
             
             # Reset metrics
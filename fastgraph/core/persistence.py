@@ -97,7 +97,8 @@ class PersistenceManager:
             path.parent.mkdir(parents=True, exist_ok=True)
             
             with self.lock:
-                start_time = time.time()
+                # Only time the write when someone is listening for it
+                start_time = time.perf_counter() if logger.isEnabledFor(logging.DEBUG) else None
                 
                 if format == "msgpack":
                     self._save_msgpack(save_data, path, compress)
@@ -109,11 +110,10 @@ class PersistenceManager:
                     raise PersistenceError(f"Unsupported format: {format}",
                                         operation="save", format=format)
                 
-                save_time = time.time() - start_time
-                file_size = path.stat().st_size
-                
-                # Log statistics (in real implementation, would use proper logging)
-                print(f"Saved graph in {save_time:.3f}s, size: {file_size:,} bytes")
+                if start_time is not None:
+                    save_time = time.perf_counter() - start_time
+                    file_size = path.stat().st_size
+                    logger.debug(f"Saved graph in {save_time:.3f}s, size: {file_size:,} bytes")
                 
         except Exception as e:
             raise PersistenceError(f"Failed to save graph to {path}: {e}",
@@ -147,7 +147,7 @@ class PersistenceManager:
         
         try:
             with self.lock:
-                start_time = time.time()
+                start_time = time.perf_counter() if logger.isEnabledFor(logging.DEBUG) else None
                 
                 if format == "msgpack":
                     data = self._load_msgpack(path)
@@ -159,13 +159,14 @@ class PersistenceManager:
                     raise PersistenceError(f"Unsupported format: {format}",
                                         operation="load", file_path=str(path), format=format)
                 
-                load_time = time.time() - start_time
+                if start_time is not None:
+                    load_time = time.perf_counter() - start_time
                 
                 # Validate and process loaded data
                 processed_data = self._process_loaded_data(data)
                 
-                # Log statistics
-                print(f"Loaded graph in {load_time:.3f}s, nodes: {len(processed_data.get('nodes', {}))}, edges: {len(data.get('edges', []))}")
+                if start_time is not None:
+                    logger.debug(f"Loaded graph in {load_time:.3f}s, nodes: {len(processed_data.get('nodes', {}))}, edges: {len(data.get('edges', []))}")
                 
                 return processed_data
                 
@@ -250,6 +250,108 @@ class SubgraphView:
         max_possible_edges = self.node_count * (self.node_count - 1)
         return self.edge_count / max_possible_edges
     
+    def _component_lists(self, first_only: bool = False) -> List[List[NodeId]]:
+        """
+        Group this view's nodes into undirected connected components.
+        
+        Runs a BFS over the parent's CSR snapshot when it is current, and
+        over the parent's adjacency lists otherwise, so a check right after
+        a parent mutation costs only the view's own edges. View nodes
+        missing from the parent have no edges and form singleton components.
+        
+        Args:
+            first_only: Stop after the first component containing a node
+                        present in the parent
+            
+        Returns:
+            List of components as lists of node IDs
+        """
+        csr = self.parent.traversal_ops._current_csr()
+        if csr is None:
+            return self._adjacency_component_lists(first_only)
+        
+        # A byte mask marks view nodes not yet assigned to a component
+        id_to_int = csr.id_to_int
+        int_to_id = csr.int_to_id
+        directions = ((csr.out_indptr, csr.out_indices), (csr.in_indptr, csr.in_indices))
+        
+        pending = bytearray(csr.node_count)
+        roots = []
+        components = []
+        for node_id in self._node_ids:
+            i = id_to_int.get(node_id)
+            if i is None:
+                components.append([node_id])
+            else:
+                pending[i] = 1
+                roots.append(i)
+        
+        for root in roots:
+            if not pending[root]:
+                continue
+            
+            # The component list doubles as the BFS queue
+            pending[root] = 0
+            component = [root]
+            head = 0
+            while head < len(component):
+                u = component[head]
+                head += 1
+                for indptr, indices in directions:
+                    for j in range(indptr[u], indptr[u + 1]):
+                        v = indices[j]
+                        if pending[v]:
+                            pending[v] = 0
+                            component.append(v)
+            
+            components.append([int_to_id[v] for v in component])
+            if first_only:
+                break
+        
+        return components
+    
+    def _adjacency_component_lists(self, first_only: bool) -> List[List[NodeId]]:
+        """_component_lists over the parent's adjacency lists."""
+        out_edges = self.parent._out_edges
+        in_edges = self.parent._in_edges
+        parent_nodes = self.parent.graph["nodes"]
+        
+        pending = set()
+        roots = []
+        components = []
+        for node_id in self._node_ids:
+            if node_id in parent_nodes:
+                pending.add(node_id)
+                roots.append(node_id)
+            else:
+                components.append([node_id])
+        
+        for root in roots:
+            if root not in pending:
+                continue
+            
+            # The component list doubles as the BFS queue
+            pending.discard(root)
+            component = [root]
+            head = 0
+            while head < len(component):
+                u = component[head]
+                head += 1
+                for edge in out_edges.get(u, ()):
+                    if edge.dst in pending:
+                        pending.discard(edge.dst)
+                        component.append(edge.dst)
+                for edge in in_edges.get(u, ()):
+                    if edge.src in pending:
+                        pending.discard(edge.src)
+                        component.append(edge.src)
+            
+            components.append(component)
+            if first_only:
+                break
+        
+        return components
+    
     def is_connected(self) -> bool:
         """
         Check if this subgraph is connected.
@@ -263,24 +365,8 @@ class SubgraphView:
         if self.node_count == 1:
             return True
         
-        # Use BFS to check connectivity
-        visited = set()
-        to_visit = [next(iter(self._node_ids))]  # Start with any node
-        
-        while to_visit:
-            current = to_visit.pop(0)
-            if current in visited:
-                continue
-            
-            visited.add(current)
-            
-            # Add unvisited neighbors
-            neighbors = self.get_neighbors(current)
-            for neighbor in neighbors:
-                if neighbor not in visited and neighbor not in to_visit:
-                    to_visit.append(neighbor)
-        
-        return len(visited) == self.node_count
+        components = self._component_lists(first_only=True)
+        return len(components) == 1 and len(components[0]) == self.node_count
     
     def find_components(self) -> List[Set[NodeId]]:
         """
@@ -292,32 +378,7 @@ class SubgraphView:
         if self.node_count == 0:
             return []
         
-        unvisited = set(self._node_ids)
-        components = []
-        
-        while unvisited:
-            # Start BFS from an unvisited node
-            start = next(iter(unvisited))
-            component = set()
-            to_visit = [start]
-            
-            while to_visit:
-                current = to_visit.pop(0)
-                if current in component:
-                    continue
-                
-                component.add(current)
-                
-                # Add unvisited neighbors within this subgraph
-                neighbors = self.get_neighbors(current)
-                for neighbor in neighbors:
-                    if neighbor not in component and neighbor in unvisited:
-                        to_visit.append(neighbor)
-            
-            components.append(component)
-            unvisited -= component
-        
-        return components
+        return [set(component) for component in self._component_lists()]
     
     def __contains__(self, node_id: NodeId) -> bool:
         """Check if node is in subgraph using 'in' operator."""
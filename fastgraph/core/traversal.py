@@ -5,13 +5,18 @@ This module contains traversal algorithms and neighbor operations for
 navigating and analyzing graph structures.
 """
 
-from typing import Any, Dict, List, Set, Optional, Iterator, Callable, Generator, Tuple
-from collections import deque, defaultdict
+from array import array
+from itertools import accumulate, chain, compress
+from operator import add, sub
+from typing import Any, Dict, List, Set, Optional, Iterator, Callable, Generator, Tuple, Union
+from collections import deque
 from dataclasses import dataclass
 
 from ..types import NodeId, NodeAttrs, EdgeFilter, NodeFilter, EdgeKey, EdgeAttrs
-from ..exceptions import TraversalError, NodeNotFoundError
+from ..exceptions import TraversalError, NodeNotFoundError, ValidationError
 from .edge import Edge
+from . import _reordering
+from . import _traversal_kernels as kernels
 
 
 @dataclass
@@ -40,6 +45,207 @@ class TraversalResult:
         return len(self.paths)
 
 
+class CompactTraversalResult:
+    """
+    Array-backed result of a graph traversal.
+    
+    Holds the discovery order and parent of each node as int32 arrays over
+    the CSR node numbering instead of one ID list per path. Paths are only
+    materialized when asked for, either all at once through ``paths`` or one
+    at a time through ``get_path``. ``depths`` holds each visited node's
+    depth in the traversal tree (-1 if unvisited); ``depth`` is the same
+    overall depth TraversalResult reports.
+    """
+    
+    __slots__ = ("int_to_id", "id_to_int", "order", "parent", "depths",
+                 "visited", "edges", "depth")
+    
+    def __init__(self, csr: "_CSRAdjacency", order: array, parent: array,
+                 edges: List[Edge], depth: int):
+        """
+        Wrap traversal arrays produced over a CSR snapshot.
+        
+        Args:
+            csr: CSR snapshot the traversal ran on
+            order: Node ints in discovery order (root first)
+            parent: Parent int per node, -1 for the root and unvisited nodes
+            edges: Edges traversed
+            depth: Overall traversal depth
+        """
+        self.int_to_id = csr.int_to_id
+        self.id_to_int = csr.id_to_int
+        self.order = order
+        self.parent = parent
+        self.edges = edges
+        self.depth = depth
+        
+        node_count = csr.node_count
+        self.visited = bytearray(node_count)
+        self.depths = array("i", [-1]) * node_count
+        for v in order:
+            self.visited[v] = 1
+            p = parent[v]
+            self.depths[v] = 0 if p < 0 else self.depths[p] + 1
+    
+    @property
+    def nodes(self) -> Set[NodeId]:
+        """Get the set of visited node IDs."""
+        int_to_id = self.int_to_id
+        return {int_to_id[v] for v in self.order}
+    
+    @property
+    def paths(self) -> List[List[NodeId]]:
+        """Get root-to-node paths in discovery order."""
+        return TraversalOperations._build_paths(self.int_to_id, self.order, self.parent)
+    
+    @property
+    def node_count(self) -> int:
+        """Get number of nodes in result."""
+        return len(self.order)
+    
+    @property
+    def edge_count(self) -> int:
+        """Get number of edges in result."""
+        return len(self.edges)
+    
+    @property
+    def path_count(self) -> int:
+        """Get number of paths found."""
+        return len(self.order)
+    
+    def get_path(self, node_id: NodeId) -> Optional[List[NodeId]]:
+        """
+        Get the path from the traversal root to a node.
+        
+        Args:
+            node_id: Node ID
+            
+        Returns:
+            List of node IDs from the root to node_id, or None if the node
+            was not visited
+        """
+        v = self.id_to_int.get(node_id)
+        if v is None or not self.visited[v]:
+            return None
+        
+        int_to_id = self.int_to_id
+        path = [int_to_id[v]]
+        while self.parent[v] >= 0:
+            v = self.parent[v]
+            path.append(int_to_id[v])
+        path.reverse()
+        return path
+
+
+class _CSRAdjacency:
+    """
+    Compressed sparse row snapshot of the graph adjacency.
+    
+    Node IDs are interned to dense integers in node insertion order, or in
+    the order given by ``node_order`` when the snapshot is reordered. The
+    outgoing neighbors of node ``i`` are ``out_indices[out_indptr[i]:out_indptr[i + 1]]``
+    and ``out_edges`` holds the matching Edge objects position for position,
+    so filters can still be evaluated against the original edges. The
+    incoming structure mirrors this with edge sources as indices.
+    
+    Per-relation CSRs with the same layout are split off lazily the first
+    time a relation-filtered neighbor lookup needs them.
+    """
+    
+    __slots__ = ("version", "id_to_int", "int_to_id",
+                 "out_indptr", "out_indices", "out_edges",
+                 "in_indptr", "in_indices", "in_edges",
+                 "rel_out", "rel_in", "degrees", "scc", "lca", "results")
+    
+    def __init__(self, graph, version: int, node_order: Optional[List[NodeId]] = None):
+        """
+        Build the CSR arrays from the graph's adjacency lists.
+        
+        Args:
+            graph: FastGraph instance to snapshot
+            version: Graph mutation version the snapshot corresponds to
+            node_order: Optional permutation of all node IDs to intern in
+        """
+        self.version = version
+        if node_order is None:
+            node_order = list(graph.graph["nodes"])
+        self.int_to_id: List[NodeId] = node_order
+        self.id_to_int: Dict[NodeId, int] = {node_id: i for i, node_id in enumerate(self.int_to_id)}
+        self.out_indptr, self.out_indices, self.out_edges = self._build_rows(graph._out_edges, "dst")
+        self.in_indptr, self.in_indices, self.in_edges = self._build_rows(graph._in_edges, "src")
+        # Derived results cached for the lifetime of this snapshot
+        self.rel_out: Optional[Dict[str, Tuple[array, array, List[Edge]]]] = None
+        self.rel_in: Optional[Dict[str, Tuple[array, array, List[Edge]]]] = None
+        self.degrees: Optional[Tuple[array, array]] = None
+        self.scc: Optional[Tuple[array, int, bool]] = None
+        self.lca: Optional[Tuple[array, array, List[array], array]] = None
+        # Memoized whole-graph query results, keyed by method name
+        self.results: Dict[str, Any] = {}
+    
+    def _build_rows(self, adjacency: Dict[NodeId, List[Edge]],
+                    endpoint: str) -> Tuple[array, array, List[Edge]]:
+        """Flatten an adjacency dict into (indptr, indices, edges)."""
+        id_to_int = self.id_to_int
+        indptr = array("i", [0]) * (len(self.int_to_id) + 1)
+        indices = array("i")
+        edges: List[Edge] = []
+        
+        for i, node_id in enumerate(self.int_to_id):
+            row = adjacency.get(node_id)
+            if row:
+                edges.extend(row)
+                indices.extend([id_to_int[getattr(e, endpoint)] for e in row])
+            indptr[i + 1] = len(edges)
+        
+        return indptr, indices, edges
+    
+    def relation_rows(self, outgoing: bool) -> Dict[str, Tuple[array, array, List[Edge]]]:
+        """
+        Get the per-relation CSRs for one edge direction, building them once.
+        
+        Args:
+            outgoing: True for outgoing edges, False for incoming edges
+            
+        Returns:
+            Dict mapping relation name to (indptr, indices, edges)
+        """
+        rows = self.rel_out if outgoing else self.rel_in
+        if rows is not None:
+            return rows
+        
+        if outgoing:
+            indptr, indices, edges = self.out_indptr, self.out_indices, self.out_edges
+        else:
+            indptr, indices, edges = self.in_indptr, self.in_indices, self.in_edges
+        
+        # Count per row first, then prefix-sum the counts into row offsets
+        node_count = len(self.int_to_id)
+        rows = {}
+        for i in range(node_count):
+            for j in range(indptr[i], indptr[i + 1]):
+                edge = edges[j]
+                entry = rows.get(edge.rel)
+                if entry is None:
+                    entry = rows[edge.rel] = (array("i", [0]) * (node_count + 1), array("i"), [])
+                entry[0][i + 1] += 1
+                entry[1].append(indices[j])
+                entry[2].append(edge)
+        
+        for rel, (counts, rel_indices, rel_edges) in rows.items():
+            rows[rel] = (array("i", accumulate(counts)), rel_indices, rel_edges)
+        
+        if outgoing:
+            self.rel_out = rows
+        else:
+            self.rel_in = rows
+        return rows
+    
+    @property
+    def node_count(self) -> int:
+        """Number of interned nodes."""
+        return len(self.int_to_id)
+
+
 class TraversalOperations:
     """
     Provides graph traversal algorithms and neighbor operations.
@@ -48,6 +254,19 @@ class TraversalOperations:
     graph exploration algorithms optimized for the FastGraph data structure.
     """
     
+    # Direction-optimizing BFS thresholds from Beamer et al.
+    _BFS_ALPHA = 14
+    _BFS_BETA = 24
+    
+    # Below this many edges thread start-up outweighs the parallel frontier scan
+    _PARALLEL_BFS_MIN_EDGES = 1 << 20
+    _PARALLEL_COMPONENTS_MIN_EDGES = 1 << 20
+    
+    # Point traversals on a stale snapshot walk the adjacency dicts; the
+    # snapshot is rebuilt for them only once this many have run against the
+    # same graph version, so interleaved writes never pay for a rebuild
+    _CSR_REBUILD_QUERIES = 8
+    
     def __init__(self, graph):
         """
         Initialize traversal operations.
@@ -56,9 +275,224 @@ class TraversalOperations:
             graph: FastGraph instance to operate on
         """
         self.graph = graph
+        self._csr: Optional[_CSRAdjacency] = None
+        self._reorder_mode: Optional[str] = None
+        self._stale_version: Optional[int] = None
+        self._stale_queries = 0
+        self._nodes: Dict[NodeId, NodeAttrs] = graph.graph["nodes"]
+        self._nodes_version = graph._mutation_version
+    
+    @property
+    def _nodes_view(self) -> Dict[NodeId, NodeAttrs]:
+        """
+        The graph's node dict, re-fetched only after a mutation.
+        
+        Loading or clearing a graph may swap the dict out, and both bump the
+        mutation version.
+        """
+        version = self.graph._mutation_version
+        if self._nodes_version != version:
+            self._nodes = self.graph.graph["nodes"]
+            self._nodes_version = version
+        return self._nodes
+    
+    def _ensure_csr(self) -> _CSRAdjacency:
+        """
+        Get the CSR adjacency snapshot, rebuilding it if the graph changed.
+        
+        Returns:
+            CSR snapshot matching the graph's current mutation version
+        """
+        csr = self._csr
+        if csr is not None and csr.version == self.graph._mutation_version:
+            return csr
+        
+        with self.graph._lock:
+            version = self.graph._mutation_version
+            csr = _CSRAdjacency(self.graph, version)
+            if self._reorder_mode is not None:
+                perm = _reordering.ORDERINGS[self._reorder_mode](
+                    csr.out_indptr, csr.out_indices, csr.in_indptr, csr.in_indices)
+                int_to_id = csr.int_to_id
+                csr = _CSRAdjacency(self.graph, version, [int_to_id[i] for i in perm])
+            self._csr = csr
+        return csr
+    
+    def _current_csr(self) -> Optional[_CSRAdjacency]:
+        """
+        Get the CSR snapshot only if it matches the current graph version.
+        
+        Point lookups use this instead of _ensure_csr() so that a mutation
+        never makes a single-node query pay for a full rebuild.
+        
+        Returns:
+            Current CSR snapshot, or None if there is none or it is stale
+        """
+        csr = self._csr
+        if csr is not None and csr.version == self.graph._mutation_version:
+            return csr
+        return None
+    
+    def _query_csr(self) -> Optional[_CSRAdjacency]:
+        """
+        Get the CSR snapshot for a point traversal, if it is worth using.
+        
+        Returns the current snapshot, or rebuilds it once _CSR_REBUILD_QUERIES
+        traversals have run since the last mutation.
+        
+        Returns:
+            CSR snapshot, or None to traverse the adjacency dicts instead
+        """
+        csr = self._current_csr()
+        if csr is not None:
+            return csr
+        
+        version = self.graph._mutation_version
+        if self._stale_version != version:
+            self._stale_version = version
+            self._stale_queries = 0
+        self._stale_queries += 1
+        if self._stale_queries < self._CSR_REBUILD_QUERIES:
+            return None
+        return self._ensure_csr()
+    
+    def reorder(self, mode: Optional[str] = "freq") -> None:
+        """
+        Renumber nodes in the CSR snapshot to improve cache locality.
+        
+        The chosen ordering is kept and reapplied whenever the snapshot is
+        rebuilt after a mutation. Row contents keep adjacency order, so
+        walks such as BFS, DFS and shortest paths return the same results.
+        Outputs ordered by node index follow the reordered layout instead:
+        components are listed in a different order, and topological_sort()
+        returns a different (still valid) order because Kahn's algorithm
+        seeds and pops nodes by CSR index.
+        
+        Args:
+            mode: "freq" (cluster high-degree nodes first), "rcm" (reverse
+                  Cuthill-McKee), "gorder" (greedy Gorder), or None to
+                  restore insertion order
+                  
+        Raises:
+            ValidationError: If mode is not a known ordering
+        """
+        if mode is not None and mode not in _reordering.ORDERINGS:
+            raise ValidationError(f"Unknown reorder mode '{mode}'", field="mode", value=mode)
+        
+        with self.graph._lock:
+            self._reorder_mode = mode
+            self._csr = None
+    
+    @staticmethod
+    def _build_paths(int_to_id: List[NodeId], order: List[int], parent: array) -> List[List[NodeId]]:
+        """
+        Materialize root-to-node paths from a parent array.
+        
+        Args:
+            int_to_id: Node ID per int of the CSR snapshot used
+            order: Node ints in discovery order (root first)
+            parent: Parent int per node, -1 for the root
+            
+        Returns:
+            List of paths in discovery order
+        """
+        paths: Dict[int, List[NodeId]] = {}
+        for v in order:
+            p = parent[v]
+            paths[v] = [int_to_id[v]] if p < 0 else paths[p] + [int_to_id[v]]
+        return list(paths.values())
+    
+    @staticmethod
+    def _adjacency_result(parent: Dict[NodeId, Optional[NodeId]], edges: List[Edge],
+                          depth: int) -> TraversalResult:
+        """
+        Package BFS/DFS output over the adjacency dicts.
+        
+        Args:
+            parent: Parent per discovered node in discovery order, None for
+                    the root
+            edges: Edges traversed
+            depth: Overall traversal depth
+            
+        Returns:
+            TraversalResult matching what the CSR traversal builds
+        """
+        paths: Dict[NodeId, List[NodeId]] = {}
+        for v, p in parent.items():
+            paths[v] = [v] if p is None else paths[p] + [v]
+        return TraversalResult(nodes=set(parent), edges=edges, depth=depth,
+                               paths=list(paths.values()))
+    
+    @classmethod
+    def _traversal_result(cls, csr: _CSRAdjacency, order: List[int], parent: array,
+                          edges: List[Edge], depth: int,
+                          compact: bool) -> Union[TraversalResult, CompactTraversalResult]:
+        """Package BFS/DFS output as a full or compact result."""
+        if compact:
+            return CompactTraversalResult(csr, array("i", order), parent, edges, depth)
+        
+        int_to_id = csr.int_to_id
+        return TraversalResult(
+            nodes={int_to_id[v] for v in order},
+            edges=edges,
+            depth=depth,
+            paths=cls._build_paths(int_to_id, order, parent)
+        )
+    
+    def _relation_slice(self, node_id: NodeId, rel: str, outgoing: bool) -> List[Edge]:
+        """
+        Get a node's edges with one relation.
+        
+        Slices the per-relation CSR when the snapshot is current, otherwise
+        filters the node's adjacency list.
+        
+        Args:
+            node_id: Node ID (must exist)
+            rel: Relation name
+            outgoing: True for outgoing edges, False for incoming edges
+            
+        Returns:
+            Edges of the node with the given relation, in adjacency order
+        """
+        csr = self._current_csr()
+        if csr is None:
+            adjacency = self.graph._out_edges if outgoing else self.graph._in_edges
+            return [e for e in adjacency.get(node_id, ()) if e.rel == rel]
+        
+        rows = csr.relation_rows(outgoing).get(rel)
+        if rows is None:
+            return []
+        indptr, _, edges = rows
+        i = csr.id_to_int[node_id]
+        return edges[indptr[i]:indptr[i + 1]]
+    
+    def _neighbors_out_fast(self, node_id: NodeId, rel: Optional[str],
+                            edge_filter: Optional[EdgeFilter]) -> List[Tuple[NodeId, Edge]]:
+        """Outgoing neighbors of an existing node, without error wrapping."""
+        if rel:
+            edges = self._relation_slice(node_id, rel, True)
+        else:
+            edges = self.graph._out_edges.get(node_id, ())
+        
+        if edge_filter:
+            return [(e.dst, e) for e in edges if edge_filter(e)]
+        return [(e.dst, e) for e in edges]
+    
+    def _neighbors_in_fast(self, node_id: NodeId, rel: Optional[str],
+                           edge_filter: Optional[EdgeFilter]) -> List[Tuple[NodeId, Edge]]:
+        """Incoming neighbors of an existing node, without error wrapping."""
+        if rel:
+            edges = self._relation_slice(node_id, rel, False)
+        else:
+            edges = self.graph._in_edges.get(node_id, ())
+        
+        if edge_filter:
+            return [(e.src, e) for e in edges if edge_filter(e)]
+        return [(e.src, e) for e in edges]
     
     def neighbors_out(self, node_id: NodeId, rel: Optional[str] = None, 
-                     edge_filter: Optional[EdgeFilter] = None) -> List[Tuple[NodeId, Edge]]:
+                     edge_filter: Optional[EdgeFilter] = None,
+                     skip_validate: bool = False) -> List[Tuple[NodeId, Edge]]:
         """
         Get outgoing neighbors of a node.
         
@@ -66,6 +500,8 @@ class TraversalOperations:
             node_id: Starting node ID
             rel: Optional relation filter
             edge_filter: Optional edge filter function
+            skip_validate: Skip the existence check for a node the caller
+                           has already validated
             
         Returns:
             List of (neighbor_id, edge) tuples
@@ -74,28 +510,18 @@ class TraversalOperations:
             NodeNotFoundError: If node doesn't exist
             TraversalError: If traversal fails
         """
-        if node_id not in self.graph.graph["nodes"]:
+        if not skip_validate and node_id not in self._nodes_view:
             raise NodeNotFoundError(node_id)
         
         try:
-            edges = self.graph._out_edges.get(node_id, [])
-            
-            # Apply relation filter
-            if rel:
-                edges = [e for e in edges if e.rel == rel]
-            
-            # Apply edge filter
-            if edge_filter:
-                edges = [e for e in edges if edge_filter(e)]
-            
-            return [(e.dst, e) for e in edges]
-            
+            return self._neighbors_out_fast(node_id, rel, edge_filter)
         except Exception as e:
             raise TraversalError(f"Failed to get outgoing neighbors for node '{node_id}': {e}",
                               node_id=node_id, operation="neighbors_out")
     
-    def neighbors_in(self, node_id: NodeId, rel: Optional[str] = None,
-                    edge_filter: Optional[EdgeFilter] = None) -> List[Tuple[NodeId, Edge]]:
+    def neighbors_in(self, node_id: NodeId, rel: Optional[str] = None, 
+                    edge_filter: Optional[EdgeFilter] = None,
+                    skip_validate: bool = False) -> List[Tuple[NodeId, Edge]]:
         """
         Get incoming neighbors of a node.
         
@@ -103,6 +529,8 @@ class TraversalOperations:
             node_id: Target node ID
             rel: Optional relation filter
             edge_filter: Optional edge filter function
+            skip_validate: Skip the existence check for a node the caller
+                           has already validated
             
         Returns:
             List of (neighbor_id, edge) tuples
@@ -111,22 +539,11 @@ class TraversalOperations:
             NodeNotFoundError: If node doesn't exist
             TraversalError: If traversal fails
         """
-        if node_id not in self.graph.graph["nodes"]:
+        if not skip_validate and node_id not in self._nodes_view:
             raise NodeNotFoundError(node_id)
         
         try:
-            edges = self.graph._in_edges.get(node_id, [])
-            
-            # Apply relation filter
-            if rel:
-                edges = [e for e in edges if e.rel == rel]
-            
-            # Apply edge filter
-            if edge_filter:
-                edges = [e for e in edges if edge_filter(e)]
-            
-            return [(e.src, e) for e in edges]
-            
+            return self._neighbors_in_fast(node_id, rel, edge_filter)
         except Exception as e:
             raise TraversalError(f"Failed to get incoming neighbors for node '{node_id}': {e}",
                               node_id=node_id, operation="neighbors_in")
@@ -143,30 +560,135 @@ class TraversalOperations:
             
         Returns:
             List of (neighbor_id, edge) tuples
+            
+        Raises:
+            NodeNotFoundError: If node doesn't exist
+            TraversalError: If traversal fails
+        """
+        if node_id not in self._nodes_view:
+            raise NodeNotFoundError(node_id)
+        
+        # One handler around both directions instead of one per direction
+        try:
+            outgoing = self._neighbors_out_fast(node_id, rel, edge_filter)
+            outgoing.extend(self._neighbors_in_fast(node_id, rel, edge_filter))
+            return outgoing
+        except Exception as e:
+            raise TraversalError(f"Failed to get neighbors for node '{node_id}': {e}",
+                              node_id=node_id, operation="neighbors")
+    
+    def neighbors_iter(self, node_id: NodeId, rel: Optional[str] = None,
+                       edge_filter: Optional[EdgeFilter] = None) -> Iterator[Tuple[NodeId, Edge]]:
         """
-        outgoing = self.neighbors_out(node_id, rel, edge_filter)
-        incoming = self.neighbors_in(node_id, rel, edge_filter)
-        return outgoing + incoming
+        Iterate over all neighbors (outgoing, then incoming) of a node.
+        
+        Yields the same (neighbor_id, edge) tuples as neighbors() without
+        building any intermediate lists.
+        
+        Args:
+            node_id: Node ID
+            rel: Optional relation filter
+            edge_filter: Optional edge filter function
+            
+        Returns:
+            Iterator of (neighbor_id, edge) tuples
+            
+        Raises:
+            NodeNotFoundError: If node doesn't exist
+        """
+        if node_id not in self._nodes_view:
+            raise NodeNotFoundError(node_id)
+        
+        return chain(self._iter_neighbors(node_id, rel, edge_filter, True),
+                     self._iter_neighbors(node_id, rel, edge_filter, False))
+    
+    def _iter_neighbors(self, node_id: NodeId, rel: Optional[str],
+                        edge_filter: Optional[EdgeFilter],
+                        outgoing: bool) -> Iterator[Tuple[NodeId, Edge]]:
+        """Lazily yield one direction's (neighbor_id, edge) tuples."""
+        if rel:
+            edges = self._relation_slice(node_id, rel, outgoing)
+        elif outgoing:
+            edges = self.graph._out_edges.get(node_id, ())
+        else:
+            edges = self.graph._in_edges.get(node_id, ())
+        
+        for e in edges:
+            if edge_filter and not edge_filter(e):
+                continue
+            yield (e.dst if outgoing else e.src), e
     
-    def degree(self, node_id: NodeId, rel: Optional[str] = None) -> tuple[int, int, int]:
+    def degree(self, node_id: NodeId, rel: Optional[str] = None) -> Tuple[int, int, int]:
         """
         Calculate degree of a node.
         
+        Unfiltered degrees are the adjacency list lengths. Relation degrees
+        are row lengths in the per-relation CSR when the snapshot is current,
+        and counted from the adjacency lists otherwise.
+        
         Args:
             node_id: Node ID
             rel: Optional relation filter
             
         Returns:
             Tuple of (out_degree, in_degree, total_degree)
+            
+        Raises:
+            NodeNotFoundError: If node doesn't exist
         """
-        out_degree = len(self.neighbors_out(node_id, rel))
-        in_degree = len(self.neighbors_in(node_id, rel))
+        if node_id not in self._nodes_view:
+            raise NodeNotFoundError(node_id)
+        
+        csr = self._current_csr() if rel else None
+        if csr is not None:
+            i = csr.id_to_int[node_id]
+            out_rows = csr.relation_rows(True).get(rel)
+            in_rows = csr.relation_rows(False).get(rel)
+            out_degree = out_rows[0][i + 1] - out_rows[0][i] if out_rows else 0
+            in_degree = in_rows[0][i + 1] - in_rows[0][i] if in_rows else 0
+        elif rel:
+            out_degree = sum(1 for e in self.graph._out_edges.get(node_id, ()) if e.rel == rel)
+            in_degree = sum(1 for e in self.graph._in_edges.get(node_id, ()) if e.rel == rel)
+        else:
+            out_degree = len(self.graph._out_edges.get(node_id, ()))
+            in_degree = len(self.graph._in_edges.get(node_id, ()))
+        
         total_degree = out_degree + in_degree
         return (out_degree, in_degree, total_degree)
     
+    def all_degrees(self, rel: Optional[str] = None) -> Dict[NodeId, Tuple[int, int, int]]:
+        """
+        Calculate the degree of every node at once.
+        
+        Degrees are differences of consecutive CSR offsets, computed with
+        C-level map/zip passes and cached on the snapshot.
+        
+        Args:
+            rel: Optional relation filter
+            
+        Returns:
+            Dictionary mapping node ID to (out_degree, in_degree, total_degree)
+        """
+        csr = self._ensure_csr()
+        if rel:
+            empty = array("i", [0]) * (csr.node_count + 1)
+            out_indptr = csr.relation_rows(True).get(rel, (empty,))[0]
+            in_indptr = csr.relation_rows(False).get(rel, (empty,))[0]
+            out_deg = array("i", map(sub, out_indptr[1:], out_indptr[:-1]))
+            in_deg = array("i", map(sub, in_indptr[1:], in_indptr[:-1]))
+        else:
+            if csr.degrees is None:
+                out_indptr, in_indptr = csr.out_indptr, csr.in_indptr
+                csr.degrees = (array("i", map(sub, out_indptr[1:], out_indptr[:-1])),
+                               array("i", map(sub, in_indptr[1:], in_indptr[:-1])))
+            out_deg, in_deg = csr.degrees
+        
+        return dict(zip(csr.int_to_id, zip(out_deg, in_deg, map(add, out_deg, in_deg))))
+    
     def bfs(self, start_node: NodeId, max_depth: Optional[int] = None,
            node_filter: Optional[NodeFilter] = None,
-           edge_filter: Optional[EdgeFilter] = None) -> TraversalResult:
+           edge_filter: Optional[EdgeFilter] = None,
+           compact: bool = False) -> Union[TraversalResult, CompactTraversalResult]:
         """
         Breadth-First Search traversal.
         
@@ -175,6 +697,7 @@ class TraversalOperations:
             max_depth: Maximum depth to traverse
             node_filter: Optional node filter function
             edge_filter: Optional edge filter function
+            compact: Return a CompactTraversalResult with lazily built paths
             
         Returns:
             TraversalResult containing visited nodes, edges, depth, and paths
@@ -182,56 +705,229 @@ class TraversalOperations:
         Raises:
             NodeNotFoundError: If start node doesn't exist
         """
-        if start_node not in self.graph.graph["nodes"]:
+        nodes = self._nodes_view
+        if start_node not in nodes:
             raise NodeNotFoundError(start_node)
         
-        visited = set()
-        queue = deque([(start_node, 0)])  # (node, depth)
-        visited_nodes = set()
+        csr = self._ensure_csr() if compact else self._query_csr()
+        if csr is None:
+            return self._bfs_adjacency(start_node, max_depth, node_filter, edge_filter)
+        
+        indptr, indices, edges = csr.out_indptr, csr.out_indices, csr.out_edges
+        in_indptr, in_indices, in_edges = csr.in_indptr, csr.in_indices, csr.in_edges
+        int_to_id = csr.int_to_id
+        node_count = csr.node_count
+        
+        root = csr.id_to_int[start_node]
+        if not edge_filter and not node_filter and kernels.enabled():
+            return self._bfs_compiled(csr, root, max_depth, compact)
+        
+        # Inverted visited bitmap: 1 until a node is discovered
+        unseen = bytearray(b"\x01") * node_count
+        unseen[root] = 0
+        parent = array("i", [-1]) * node_count
+        order = [root]
         visited_edges = []
-        paths = {start_node: [start_node]}
+        frontier = [root]
         current_depth = 0
         
-        while queue:
-            node, depth = queue.popleft()
-            
-            if node in visited:
-                continue
-            
-            visited.add(node)
-            visited_nodes.add(node)
-            current_depth = max(current_depth, depth)
-            
-            # Check max depth
-            if max_depth is not None and depth >= max_depth:
-                continue
+        # Out-edges not yet reachable from the visited set; drives the
+        # push/pull switch below
+        unexplored_edges = len(indices) - (indptr[root + 1] - indptr[root])
+        pull = False
+        
+        # Level-synchronous expansion: nodes are marked when discovered, so
+        # each node enters a frontier at most once
+        while frontier and (max_depth is None or current_depth < max_depth):
+            # Direction-optimizing switch (Beamer): pull once the frontier
+            # touches a large share of the remaining edges, push again once
+            # it has shrunk back to a small fraction of the nodes
+            if pull:
+                pull = len(frontier) >= node_count / self._BFS_BETA
+            else:
+                frontier_edges = 0
+                for u in frontier:
+                    frontier_edges += indptr[u + 1] - indptr[u]
+                pull = frontier_edges > unexplored_edges / self._BFS_ALPHA
             
-            # Get neighbors
-            for neighbor, edge in self.neighbors_out(node, edge_filter=edge_filter):
-                if neighbor not in visited:
+            next_frontier = []
+            if pull:
+                # Bottom-up step: each unvisited node looks for any parent in
+                # the frontier and stops at the first one
+                in_frontier = bytearray(node_count)
+                for u in frontier:
+                    in_frontier[u] = 1
+                
+                for v in compress(range(node_count), unseen):
+                    for j in range(in_indptr[v], in_indptr[v + 1]):
+                        if in_frontier[in_indices[j]]:
+                            edge = in_edges[j]
+                            if not edge_filter or edge_filter(edge):
+                                break
+                    else:
+                        continue
+                    
                     # Apply node filter
                     if node_filter:
-                        neighbor_attrs = self.graph.graph["nodes"].get(neighbor, {})
-                        if not node_filter(neighbor, neighbor_attrs):
+                        neighbor = int_to_id[v]
+                        if not node_filter(neighbor, nodes.get(neighbor, {})):
                             continue
                     
-                    queue.append((neighbor, depth + 1))
+                    unseen[v] = 0
+                    parent[v] = in_indices[j]
+                    order.append(v)
+                    next_frontier.append(v)
                     visited_edges.append(edge)
+            else:
+                # Top-down step; compress() skips discovered neighbors in C,
+                # reading the bitmap lazily so in-row duplicates are caught
+                for u in frontier:
+                    start_j, end_j = indptr[u], indptr[u + 1]
+                    for j in compress(range(start_j, end_j),
+                                      map(unseen.__getitem__, indices[start_j:end_j])):
+                        v = indices[j]
+                        edge = edges[j]
+                        if edge_filter and not edge_filter(edge):
+                            continue
+                        
+                        # Apply node filter
+                        if node_filter:
+                            neighbor = int_to_id[v]
+                            if not node_filter(neighbor, nodes.get(neighbor, {})):
+                                continue
+                        
+                        unseen[v] = 0
+                        parent[v] = u
+                        order.append(v)
+                        next_frontier.append(v)
+                        visited_edges.append(edge)
+            
+            if not next_frontier:
+                break
+            for v in next_frontier:
+                unexplored_edges -= indptr[v + 1] - indptr[v]
+            frontier = next_frontier
+            current_depth += 1
+        
+        return self._traversal_result(csr, order, parent, visited_edges, current_depth, compact)
+    
+    def _bfs_adjacency(self, start_node: NodeId, max_depth: Optional[int],
+                       node_filter: Optional[NodeFilter],
+                       edge_filter: Optional[EdgeFilter]) -> TraversalResult:
+        """Top-down BFS over the adjacency dicts, for a stale snapshot."""
+        nodes = self._nodes_view
+        out_edges = self.graph._out_edges
+        parent: Dict[NodeId, Optional[NodeId]] = {start_node: None}
+        visited_edges = []
+        frontier = [start_node]
+        current_depth = 0
+        
+        while frontier and (max_depth is None or current_depth < max_depth):
+            next_frontier = []
+            for u in frontier:
+                for edge in out_edges.get(u, ()):
+                    v = edge.dst
+                    if v in parent:
+                        continue
+                    if edge_filter and not edge_filter(edge):
+                        continue
+                    if node_filter and not node_filter(v, nodes.get(v, {})):
+                        continue
                     
-                    # Track path
-                    if neighbor not in paths:
-                        paths[neighbor] = paths[node] + [neighbor]
+                    parent[v] = u
+                    next_frontier.append(v)
+                    visited_edges.append(edge)
+            
+            if not next_frontier:
+                break
+            frontier = next_frontier
+            current_depth += 1
         
-        return TraversalResult(
-            nodes=visited_nodes,
-            edges=visited_edges,
-            depth=current_depth,
-            paths=list(paths.values())
-        )
+        return self._adjacency_result(parent, visited_edges, current_depth)
+    
+    def _bfs_compiled(self, csr: _CSRAdjacency, root: int, max_depth: Optional[int],
+                      compact: bool) -> Union[TraversalResult, CompactTraversalResult]:
+        """Unfiltered BFS through the Numba kernel."""
+        if len(csr.out_indices) >= self._PARALLEL_BFS_MIN_EDGES:
+            kernel = kernels.bfs_csr_parallel
+        else:
+            kernel = kernels.bfs_csr
+        order, parent, parent_edge, depth = kernel(
+            kernels.as_int32(csr.out_indptr), kernels.as_int32(csr.out_indices),
+            root, kernels.max_depth_arg(max_depth))
+        
+        edges = csr.out_edges
+        visited_edges = [edges[j] for j in parent_edge[order[1:]].tolist()]
+        return self._traversal_result(csr, order.tolist(), array("i", parent.tobytes()),
+                                      visited_edges, int(depth[order[-1]]), compact)
+    
+    def bfs_multi(self, sources: List[NodeId],
+                  max_depth: Optional[int] = None) -> Dict[NodeId, Set[NodeId]]:
+        """
+        Run one BFS per source node simultaneously (multi-source BFS).
+        
+        Every node carries a bitset with one bit per source; a level is
+        expanded by OR-ing each frontier node's bits into its neighbors, so
+        all searches share a single pass over the adjacency arrays.
+        
+        Args:
+            sources: Starting node IDs
+            max_depth: Maximum depth to traverse
+            
+        Returns:
+            Dictionary mapping each source to the set of nodes it reaches
+            (including itself)
+            
+        Raises:
+            NodeNotFoundError: If any source node doesn't exist
+        """
+        nodes = self._nodes_view
+        for source in sources:
+            if source not in nodes:
+                raise NodeNotFoundError(source)
+        
+        sources = list(dict.fromkeys(sources))
+        csr = self._ensure_csr()
+        indptr, indices = csr.out_indptr, csr.out_indices
+        int_to_id = csr.int_to_id
+        
+        # Python ints act as arbitrary-width bitsets, so all sources fit in
+        # one word per node regardless of how many there are
+        seen = [0] * csr.node_count
+        frontier: Dict[int, int] = {}
+        for bit, source in enumerate(sources):
+            u = csr.id_to_int[source]
+            seen[u] |= 1 << bit
+            frontier[u] = frontier.get(u, 0) | (1 << bit)
+        
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            next_frontier: Dict[int, int] = {}
+            for u, bits in frontier.items():
+                for j in range(indptr[u], indptr[u + 1]):
+                    v = indices[j]
+                    new_bits = bits & ~seen[v]
+                    if new_bits:
+                        next_frontier[v] = next_frontier.get(v, 0) | new_bits
+            
+            for v, bits in next_frontier.items():
+                seen[v] |= bits
+            frontier = next_frontier
+            depth += 1
+        
+        reached: Dict[NodeId, Set[NodeId]] = {source: set() for source in sources}
+        for v, bits in enumerate(seen):
+            while bits:
+                low = bits & -bits
+                reached[sources[low.bit_length() - 1]].add(int_to_id[v])
+                bits ^= low
+        
+        return reached
     
     def dfs(self, start_node: NodeId, max_depth: Optional[int] = None,
            node_filter: Optional[NodeFilter] = None,
-           edge_filter: Optional[EdgeFilter] = None) -> TraversalResult:
+           edge_filter: Optional[EdgeFilter] = None,
+           compact: bool = False) -> Union[TraversalResult, CompactTraversalResult]:
         """
         Depth-First Search traversal.
         
@@ -240,56 +936,139 @@ class TraversalOperations:
             max_depth: Maximum depth to traverse
             node_filter: Optional node filter function
             edge_filter: Optional edge filter function
+            compact: Return a CompactTraversalResult with lazily built paths
             
         Returns:
             TraversalResult containing visited nodes, edges, depth, and paths
         """
-        if start_node not in self.graph.graph["nodes"]:
+        nodes = self._nodes_view
+        if start_node not in nodes:
             raise NodeNotFoundError(start_node)
         
-        visited = set()
-        stack = [(start_node, 0)]  # (node, depth)
-        visited_nodes = set()
+        csr = self._ensure_csr() if compact else self._query_csr()
+        if csr is None:
+            return self._dfs_adjacency(start_node, max_depth, node_filter, edge_filter)
+        
+        indptr, indices, edges = csr.out_indptr, csr.out_indices, csr.out_edges
+        int_to_id = csr.int_to_id
+        
+        root = csr.id_to_int[start_node]
+        if not edge_filter and not node_filter and kernels.enabled():
+            return self._dfs_compiled(csr, root, max_depth, compact)
+        
+        # Inverted visited bitmap: 1 until a node is popped and visited
+        unvisited = bytearray(b"\x01") * csr.node_count
+        discovered = bytearray(csr.node_count)
+        discovered[root] = 1
+        parent = array("i", [-1]) * csr.node_count
+        order = [root]
+        # Parallel node/depth stacks avoid a tuple allocation per push
+        stack_nodes = [root]
+        stack_depths = [0]
         visited_edges = []
-        paths = {start_node: [start_node]}
         current_depth = 0
         
-        while stack:
-            node, depth = stack.pop()
+        while stack_nodes:
+            u = stack_nodes.pop()
+            depth = stack_depths.pop()
             
-            if node in visited:
+            if not unvisited[u]:
                 continue
             
-            visited.add(node)
-            visited_nodes.add(node)
-            current_depth = max(current_depth, depth)
+            unvisited[u] = 0
+            if depth > current_depth:
+                current_depth = depth
             
             # Check max depth
             if max_depth is not None and depth >= max_depth:
                 continue
             
-            # Get neighbors (LIFO order for DFS)
-            for neighbor, edge in reversed(list(self.neighbors_out(node, edge_filter=edge_filter))):
-                if neighbor not in visited:
-                    # Apply node filter
-                    if node_filter:
-                        neighbor_attrs = self.graph.graph["nodes"].get(neighbor, {})
-                        if not node_filter(neighbor, neighbor_attrs):
-                            continue
-                    
-                    stack.append((neighbor, depth + 1))
-                    visited_edges.append(edge)
-                    
-                    # Track path
-                    if neighbor not in paths:
-                        paths[neighbor] = paths[node] + [neighbor]
+            # Push neighbors in reverse so they pop in adjacency order; walking
+            # the row backwards by index copies nothing, and compress() drops
+            # visited neighbors in C
+            start_j, end_j = indptr[u], indptr[u + 1]
+            for j in compress(range(end_j - 1, start_j - 1, -1),
+                              map(unvisited.__getitem__, reversed(indices[start_j:end_j]))):
+                v = indices[j]
+                edge = edges[j]
+                if edge_filter and not edge_filter(edge):
+                    continue
+                
+                # Apply node filter
+                if node_filter:
+                    neighbor = int_to_id[v]
+                    if not node_filter(neighbor, nodes.get(neighbor, {})):
+                        continue
+                
+                stack_nodes.append(v)
+                stack_depths.append(depth + 1)
+                visited_edges.append(edge)
+                
+                # Track path
+                if not discovered[v]:
+                    discovered[v] = 1
+                    parent[v] = u
+                    order.append(v)
         
-        return TraversalResult(
-            nodes=visited_nodes,
-            edges=visited_edges,
-            depth=current_depth,
-            paths=list(paths.values())
-        )
+        # Every discovered node is pushed and so eventually visited
+        return self._traversal_result(csr, order, parent, visited_edges, current_depth, compact)
+    
+    def _dfs_adjacency(self, start_node: NodeId, max_depth: Optional[int],
+                       node_filter: Optional[NodeFilter],
+                       edge_filter: Optional[EdgeFilter]) -> TraversalResult:
+        """DFS over the adjacency dicts, for a stale snapshot."""
+        nodes = self._nodes_view
+        out_edges = self.graph._out_edges
+        visited: Set[NodeId] = set()
+        parent: Dict[NodeId, Optional[NodeId]] = {start_node: None}
+        stack_nodes = [start_node]
+        stack_depths = [0]
+        visited_edges = []
+        current_depth = 0
+        
+        while stack_nodes:
+            u = stack_nodes.pop()
+            depth = stack_depths.pop()
+            
+            if u in visited:
+                continue
+            
+            visited.add(u)
+            if depth > current_depth:
+                current_depth = depth
+            
+            if max_depth is not None and depth >= max_depth:
+                continue
+            
+            # Push neighbors in reverse so they pop in adjacency order
+            for edge in reversed(out_edges.get(u, ())):
+                v = edge.dst
+                if v in visited:
+                    continue
+                if edge_filter and not edge_filter(edge):
+                    continue
+                if node_filter and not node_filter(v, nodes.get(v, {})):
+                    continue
+                
+                stack_nodes.append(v)
+                stack_depths.append(depth + 1)
+                visited_edges.append(edge)
+                if v not in parent:
+                    parent[v] = u
+        
+        return self._adjacency_result(parent, visited_edges, current_depth)
+    
+    def _dfs_compiled(self, csr: _CSRAdjacency, root: int, max_depth: Optional[int],
+                      compact: bool) -> Union[TraversalResult, CompactTraversalResult]:
+        """Unfiltered DFS through the Numba kernel."""
+        _, discover_order, parent, pushed_edges, max_seen = kernels.dfs_csr(
+            kernels.as_int32(csr.out_indptr), kernels.as_int32(csr.out_indices),
+            root, kernels.max_depth_arg(max_depth))
+        
+        edges = csr.out_edges
+        visited_edges = [edges[j] for j in pushed_edges.tolist()]
+        return self._traversal_result(csr, discover_order.tolist(), array("i", parent.tobytes()),
+                                      visited_edges, int(max_seen), compact)
     
     def shortest_path(self, start: NodeId, end: NodeId,
                      edge_filter: Optional[EdgeFilter] = None) -> Optional[List[NodeId]]:
@@ -307,34 +1086,96 @@ class TraversalOperations:
         Raises:
             NodeNotFoundError: If either node doesn't exist
         """
-        if start not in self.graph.graph["nodes"]:
+        nodes = self._nodes_view
+        if start not in nodes:
             raise NodeNotFoundError(start)
-        if end not in self.graph.graph["nodes"]:
+        if end not in nodes:
             raise NodeNotFoundError(end)
         
         if start == end:
             return [start]
         
-        visited = set()
-        queue = deque([(start, [start])])
+        csr = self._query_csr()
+        if csr is None:
+            return self._shortest_path_adjacency(start, end, edge_filter)
+        
+        indptr, indices, edges = csr.out_indptr, csr.out_indices, csr.out_edges
+        source = csr.id_to_int[start]
+        target = csr.id_to_int[end]
+        
+        if not edge_filter and kernels.enabled():
+            parent = kernels.shortest_path_csr(kernels.as_int32(indptr), kernels.as_int32(indices),
+                                               source, target)
+            if parent[target] == -1:
+                return None
+            return self._backtrack(csr, parent, source, target)
+        
+        # BFS recording parents; the path is rebuilt once the target is reached
+        parent = array("i", [-1]) * csr.node_count
+        parent[source] = source
+        unseen = bytearray(b"\x01") * csr.node_count
+        unseen[source] = 0
+        queue = deque([source])
         
         while queue:
-            node, path = queue.popleft()
-            
-            if node in visited:
-                continue
-            
-            visited.add(node)
+            u = queue.popleft()
+            start_j, end_j = indptr[u], indptr[u + 1]
             
-            for neighbor, edge in self.neighbors_out(node, edge_filter=edge_filter):
-                if neighbor == end:
-                    return path + [neighbor]
+            # compress() skips already-seen neighbors in C; its selectors are
+            # read lazily, so nodes marked earlier in the same row are skipped
+            for j in compress(range(start_j, end_j), map(unseen.__getitem__, indices[start_j:end_j])):
+                if edge_filter and not edge_filter(edges[j]):
+                    continue
                 
-                if neighbor not in visited:
-                    queue.append((neighbor, path + [neighbor]))
+                v = indices[j]
+                unseen[v] = 0
+                parent[v] = u
+                if v == target:
+                    return self._backtrack(csr, parent, source, target)
+                queue.append(v)
         
         return None
     
+    def _shortest_path_adjacency(self, start: NodeId, end: NodeId,
+                                 edge_filter: Optional[EdgeFilter]) -> Optional[List[NodeId]]:
+        """BFS shortest path over the adjacency dicts, for a stale snapshot."""
+        out_edges = self.graph._out_edges
+        parent: Dict[NodeId, NodeId] = {start: start}
+        queue = deque([start])
+        
+        while queue:
+            u = queue.popleft()
+            for edge in out_edges.get(u, ()):
+                v = edge.dst
+                if v in parent:
+                    continue
+                if edge_filter and not edge_filter(edge):
+                    continue
+                
+                parent[v] = u
+                if v == end:
+                    path = [end]
+                    while v != start:
+                        v = parent[v]
+                        path.append(v)
+                    path.reverse()
+                    return path
+                queue.append(v)
+        
+        return None
+    
+    @staticmethod
+    def _backtrack(csr: _CSRAdjacency, parent: array, source: int, target: int) -> List[NodeId]:
+        """Walk a parent array from target back to source."""
+        int_to_id = csr.int_to_id
+        path = [int_to_id[target]]
+        v = target
+        while v != source:
+            v = parent[v]
+            path.append(int_to_id[v])
+        path.reverse()
+        return path
+    
     def all_shortest_paths(self, start: NodeId, end: NodeId,
                           edge_filter: Optional[EdgeFilter] = None) -> List[List[NodeId]]:
         """
@@ -348,38 +1189,120 @@ class TraversalOperations:
         Returns:
             List of paths, each path is a list of node IDs
         """
-        if start not in self.graph.graph["nodes"]:
+        nodes = self._nodes_view
+        if start not in nodes:
             raise NodeNotFoundError(start)
-        if end not in self.graph.graph["nodes"]:
+        if end not in nodes:
             raise NodeNotFoundError(end)
         
         if start == end:
             return [[start]]
         
-        # BFS to find shortest distance
-        visited = set()
-        queue = deque([(start, [start])])
-        found_paths = []
-        shortest_length = None
+        csr = self._query_csr()
+        if csr is None:
+            return self._all_shortest_paths_adjacency(start, end, edge_filter)
         
-        while queue and (shortest_length is None):
-            node, path = queue.popleft()
-            
-            if node in visited:
-                continue
+        indptr, indices, edges = csr.out_indptr, csr.out_indices, csr.out_edges
+        int_to_id = csr.int_to_id
+        source = csr.id_to_int[start]
+        target = csr.id_to_int[end]
+        
+        # BFS recording every predecessor one level closer to the source;
+        # the resulting parent DAG encodes all shortest paths at once
+        dist = array("i", [-1]) * csr.node_count
+        dist[source] = 0
+        preds: Dict[int, List[int]] = {}
+        queue = deque([source])
+        target_dist = None
+        
+        while queue:
+            u = queue.popleft()
+            next_dist = dist[u] + 1
+            if target_dist is not None and next_dist > target_dist:
+                break
             
-            visited.add(node)
+            for j in range(indptr[u], indptr[u + 1]):
+                if edge_filter and not edge_filter(edges[j]):
+                    continue
+                
+                v = indices[j]
+                if dist[v] == -1:
+                    dist[v] = next_dist
+                    preds[v] = [u]
+                    if v == target:
+                        target_dist = next_dist
+                    else:
+                        queue.append(v)
+                elif dist[v] == next_dist and preds[v][-1] != u:
+                    preds[v].append(u)
+        
+        if target_dist is None:
+            return []
+        
+        return [[int_to_id[v] for v in path] for path in self._dag_paths(preds, source, target)]
+    
+    def _all_shortest_paths_adjacency(self, start: NodeId, end: NodeId,
+                                      edge_filter: Optional[EdgeFilter]) -> List[List[NodeId]]:
+        """All shortest paths over the adjacency dicts, for a stale snapshot."""
+        out_edges = self.graph._out_edges
+        dist: Dict[NodeId, int] = {start: 0}
+        preds: Dict[NodeId, List[NodeId]] = {}
+        queue = deque([start])
+        target_dist = None
+        
+        while queue:
+            u = queue.popleft()
+            next_dist = dist[u] + 1
+            if target_dist is not None and next_dist > target_dist:
+                break
             
-            for neighbor, edge in self.neighbors_out(node, edge_filter=edge_filter):
-                if neighbor == end:
-                    found_path = path + [neighbor]
-                    found_paths.append(found_path)
-                    shortest_length = len(found_path)
-                    break
+            for edge in out_edges.get(u, ()):
+                if edge_filter and not edge_filter(edge):
+                    continue
                 
-                if neighbor not in visited:
-                    if shortest_length is None or len(path) + 1 < shortest_length:
-                        queue.append((neighbor, path + [neighbor]))
+                v = edge.dst
+                v_dist = dist.get(v)
+                if v_dist is None:
+                    dist[v] = next_dist
+                    preds[v] = [u]
+                    if v == end:
+                        target_dist = next_dist
+                    else:
+                        queue.append(v)
+                elif v_dist == next_dist and preds[v][-1] != u:
+                    preds[v].append(u)
+        
+        if target_dist is None:
+            return []
+        
+        return self._dag_paths(preds, start, end)
+    
+    @staticmethod
+    def _dag_paths(preds: Dict[Any, List[Any]], source: Any, target: Any) -> List[List[Any]]:
+        """
+        Enumerate every source-to-target path of a shortest-path parent DAG.
+        
+        Args:
+            preds: Predecessors one level closer to the source, per node
+            source: Source node
+            target: Target node
+            
+        Returns:
+            List of paths from source to target
+        """
+        found_paths = []
+        path = [target]
+        stack = [iter(preds[target])]
+        while stack:
+            u = next(stack[-1], None)
+            if u is None:
+                stack.pop()
+                path.pop()
+            elif u == source:
+                found_paths.append([source] + path[::-1])
+            else:
+                path.append(u)
+                stack.append(iter(preds[u]))
         
         return found_paths
     
@@ -387,36 +1310,65 @@ class TraversalOperations:
         """
         Find all connected components in the graph.
         
+        Unfiltered results are memoized until the graph next changes.
+        
         Args:
             edge_filter: Optional edge filter function
             
         Returns:
             List of sets, each containing node IDs for a component
         """
-        visited = set()
+        csr = self._ensure_csr()
+        # Only unfiltered results are memoized: a filter may not be pure
+        if not edge_filter and "connected_components" in csr.results:
+            return [set(component) for component in csr.results["connected_components"]]
+        
+        int_to_id = csr.int_to_id
+        if (not edge_filter and len(csr.out_indices) >= self._PARALLEL_COMPONENTS_MIN_EDGES
+                and kernels.enabled()):
+            labels = kernels.components_csr_parallel(kernels.as_int32(csr.out_indptr),
+                                                     kernels.as_int32(csr.out_indices))
+            # Labels are each component's smallest int, so first-seen order
+            # matches the sequential BFS below
+            groups: Dict[int, Set[NodeId]] = {}
+            for v, label in enumerate(labels.tolist()):
+                groups.setdefault(label, set()).add(int_to_id[v])
+            components = list(groups.values())
+            csr.results["connected_components"] = [frozenset(c) for c in components]
+            return components
+        
+        directions = ((csr.out_indptr, csr.out_indices, csr.out_edges),
+                      (csr.in_indptr, csr.in_indices, csr.in_edges))
+        
+        visited = bytearray(csr.node_count)
         components = []
         
-        for node_id in self.graph.graph["nodes"]:
-            if node_id not in visited:
-                # BFS to find component
-                component = set()
-                queue = deque([node_id])
-                
-                while queue:
-                    current = queue.popleft()
-                    if current in visited:
-                        continue
-                    
-                    visited.add(current)
-                    component.add(current)
-                    
-                    # Add all neighbors
-                    for neighbor, _ in self.neighbors(current, edge_filter=edge_filter):
-                        if neighbor not in visited:
-                            queue.append(neighbor)
+        for root in range(csr.node_count):
+            if visited[root]:
+                continue
+            
+            # BFS over both edge directions; the component list doubles as the queue
+            visited[root] = 1
+            component = [root]
+            head = 0
+            while head < len(component):
+                u = component[head]
+                head += 1
                 
-                components.append(component)
+                for indptr, indices, edges in directions:
+                    for j in range(indptr[u], indptr[u + 1]):
+                        v = indices[j]
+                        if visited[v]:
+                            continue
+                        if edge_filter and not edge_filter(edges[j]):
+                            continue
+                        visited[v] = 1
+                        component.append(v)
+            
+            components.append({int_to_id[v] for v in component})
         
+        if not edge_filter:
+            csr.results["connected_components"] = [frozenset(c) for c in components]
         return components
     
     def weakly_connected_components(self) -> List[Set[NodeId]]:
@@ -426,65 +1378,281 @@ class TraversalOperations:
         Returns:
             List of sets, each containing node IDs for a component
         """
-        visited = set()
-        components = []
+        return self.connected_components()
+    
+    def _tarjan_scc(self) -> Tuple[array, int, bool]:
+        """
+        Label strongly connected components with an iterative Tarjan pass.
+        
+        Components are numbered in the order Tarjan closes them, which is a
+        reverse topological order of the condensation DAG. The result is
+        stored on the CSR snapshot, so it is recomputed only after the graph
+        changes.
+        
+        Returns:
+            Tuple of (component id per node int, component count,
+            whether any self-loop exists)
+        """
+        csr = self._ensure_csr()
+        if csr.scc is not None:
+            return csr.scc
         
-        for node_id in self.graph.graph["nodes"]:
-            if node_id not in visited:
-                # BFS treating edges as undirected
-                component = set()
-                queue = deque([node_id])
+        indptr, indices = csr.out_indptr, csr.out_indices
+        node_count = csr.node_count
+        index = array("i", [-1]) * node_count
+        low = array("i", [0]) * node_count
+        comp = array("i", [-1]) * node_count
+        on_stack = bytearray(node_count)
+        scc_stack = []
+        counter = 0
+        comp_count = 0
+        has_self_loop = False
+        
+        for root in range(node_count):
+            if index[root] != -1:
+                continue
+            
+            index[root] = low[root] = counter
+            counter += 1
+            scc_stack.append(root)
+            on_stack[root] = 1
+            # Explicit call stack of (node, next adjacency position)
+            call_stack = [(root, indptr[root])]
+            
+            while call_stack:
+                u, j = call_stack[-1]
+                if j < indptr[u + 1]:
+                    call_stack[-1] = (u, j + 1)
+                    v = indices[j]
+                    if v == u:
+                        has_self_loop = True
+                    if index[v] == -1:
+                        index[v] = low[v] = counter
+                        counter += 1
+                        scc_stack.append(v)
+                        on_stack[v] = 1
+                        call_stack.append((v, indptr[v]))
+                    elif on_stack[v] and index[v] < low[u]:
+                        low[u] = index[v]
+                    continue
                 
-                while queue:
-                    current = queue.popleft()
-                    if current in visited:
-                        continue
-                    
-                    visited.add(current)
-                    component.add(current)
-                    
-                    # Add both incoming and outgoing neighbors
-                    for neighbor, _ in self.neighbors(current):
-                        if neighbor not in visited:
-                            queue.append(neighbor)
+                call_stack.pop()
+                if call_stack:
+                    p = call_stack[-1][0]
+                    if low[u] < low[p]:
+                        low[p] = low[u]
                 
-                components.append(component)
+                if low[u] == index[u]:
+                    while True:
+                        w = scc_stack.pop()
+                        on_stack[w] = 0
+                        comp[w] = comp_count
+                        if w == u:
+                            break
+                    comp_count += 1
         
-        return components
+        csr.scc = (comp, comp_count, has_self_loop)
+        return csr.scc
+    
+    def _lca_tables(self) -> Tuple[array, array, List[array], array]:
+        """
+        Build binary-lifting tables over the condensation DAG.
+        
+        Each strongly connected component becomes one vertex. A BFS from the
+        components without incoming edges picks a spanning forest, and
+        ``up[k][c]`` holds the 2^k-th ancestor of component ``c`` in it
+        (roots point to themselves). Cached on the CSR snapshot.
+        
+        Returns:
+            Tuple of (component per node int, depth per component,
+            lifting table, representative node int per component)
+        """
+        csr = self._ensure_csr()
+        if csr.lca is not None:
+            return csr.lca
+        
+        comp, comp_count, _ = self._tarjan_scc()
+        indptr, indices = csr.out_indptr, csr.out_indices
+        
+        members: List[List[int]] = [[] for _ in range(comp_count)]
+        for v in range(csr.node_count):
+            members[comp[v]].append(v)
+        
+        has_parent = bytearray(comp_count)
+        for v in range(csr.node_count):
+            for j in range(indptr[v], indptr[v + 1]):
+                w = comp[indices[j]]
+                if w != comp[v]:
+                    has_parent[w] = 1
+        
+        parent = array("i", [-1]) * comp_count
+        depth = array("i", [-1]) * comp_count
+        # Tarjan numbers components in reverse topological order
+        for root in range(comp_count - 1, -1, -1):
+            if has_parent[root] or depth[root] != -1:
+                continue
+            depth[root] = 0
+            parent[root] = root
+            queue = deque([root])
+            while queue:
+                c = queue.popleft()
+                for v in members[c]:
+                    for j in range(indptr[v], indptr[v + 1]):
+                        w = comp[indices[j]]
+                        if depth[w] == -1:
+                            depth[w] = depth[c] + 1
+                            parent[w] = c
+                            queue.append(w)
+        
+        up = [parent]
+        for _ in range(1, max(1, max(depth, default=0).bit_length())):
+            prev = up[-1]
+            up.append(array("i", [prev[prev[c]] for c in range(comp_count)]))
+        
+        representative = array("i", [group[0] for group in members])
+        csr.lca = (comp, depth, up, representative)
+        return csr.lca
+    
+    def _ancestor_chain(self, node_id: NodeId) -> Optional[List[NodeId]]:
+        """
+        Walk a node's single-parent ancestor chain over the adjacency dicts.
+        
+        Args:
+            node_id: Node ID
+            
+        Returns:
+            The node followed by its ancestors up to the root, or None if a
+            node on the way has several parents or the chain is a cycle
+        """
+        in_edges = self.graph._in_edges
+        chain = [node_id]
+        seen = {node_id}
+        u = node_id
+        while True:
+            parents = {e.src for e in in_edges.get(u, ()) if e.src != u}
+            if not parents:
+                return chain
+            if len(parents) > 1:
+                return None
+            u = parents.pop()
+            if u in seen:
+                return None
+            seen.add(u)
+            chain.append(u)
+    
+    def lca(self, node_a: NodeId, node_b: NodeId) -> Optional[NodeId]:
+        """
+        Find the lowest common ancestor of two nodes.
+        
+        Ancestors follow edge direction (an edge src -> dst makes src the
+        parent). Cycles are collapsed into their strongly connected
+        component first. The answer is exact on trees and forests; for
+        nodes with several parents it is taken on a BFS spanning forest of
+        the condensation DAG.
+        
+        Answering from the lifting tables needs the CSR snapshot plus an
+        O(V + E log V) build, cached until the next mutation. On a stale
+        snapshot, nodes whose ancestors each have a single parent are
+        answered by walking up their parent chains instead; other queries
+        build the tables.
+        
+        Args:
+            node_a: First node ID
+            node_b: Second node ID
+            
+        Returns:
+            Node ID of the common ancestor, or None if the nodes share no root
+            
+        Raises:
+            NodeNotFoundError: If either node doesn't exist
+        """
+        nodes = self._nodes_view
+        if node_a not in nodes:
+            raise NodeNotFoundError(node_a)
+        if node_b not in nodes:
+            raise NodeNotFoundError(node_b)
+        
+        if self._query_csr() is None:
+            chain_a = self._ancestor_chain(node_a)
+            chain_b = self._ancestor_chain(node_b) if chain_a is not None else None
+            if chain_b is not None:
+                ancestors_a = set(chain_a)
+                for node_id in chain_b:
+                    if node_id in ancestors_a:
+                        return node_id
+                return None
+        
+        csr = self._ensure_csr()
+        comp, depth, up, representative = self._lca_tables()
+        a = comp[csr.id_to_int[node_a]]
+        b = comp[csr.id_to_int[node_b]]
+        
+        # Lift the deeper node to the same depth, one bit of the gap at a time
+        if depth[a] < depth[b]:
+            a, b = b, a
+        diff = depth[a] - depth[b]
+        k = 0
+        while diff:
+            if diff & 1:
+                a = up[k][a]
+            diff >>= 1
+            k += 1
+        
+        if a != b:
+            for k in range(len(up) - 1, -1, -1):
+                if up[k][a] != up[k][b]:
+                    a = up[k][a]
+                    b = up[k][b]
+            a = up[0][a]
+            if a != up[0][b]:
+                return None  # Different trees of the forest
+        
+        if a == comp[csr.id_to_int[node_a]]:
+            return node_a
+        if a == comp[csr.id_to_int[node_b]]:
+            return node_b
+        return csr.int_to_id[representative[a]]
     
     def topological_sort(self) -> Optional[List[NodeId]]:
         """
         Perform topological sort on directed acyclic graph.
         
+        The result is memoized until the graph next changes.
+        
         Returns:
             List of node IDs in topological order, or None if graph has cycles
         """
-        # Calculate in-degrees
-        in_degrees = defaultdict(int)
-        for node_id in self.graph.graph["nodes"]:
-            in_degrees[node_id] = 0
+        csr = self._ensure_csr()
+        if "topological_sort" in csr.results:
+            order = csr.results["topological_sort"]
+            return None if order is None else list(order)
         
-        for edge in self.graph._edges.values():
-            in_degrees[edge.dst] += 1
+        indptr, indices = csr.out_indptr, csr.out_indices
+        in_indptr = csr.in_indptr
         
-        # Queue of nodes with no incoming edges
-        queue = deque([node for node, degree in in_degrees.items() if degree == 0])
-        result = []
+        # In-degrees fall out of the incoming CSR offsets in one C-level pass
+        in_degree = array("i", map(sub, in_indptr[1:], in_indptr[:-1]))
         
-        while queue:
-            node = queue.popleft()
-            result.append(node)
-            
-            # Reduce in-degree of neighbors
-            for neighbor, _ in self.neighbors_out(node):
-                in_degrees[neighbor] -= 1
-                if in_degrees[neighbor] == 0:
-                    queue.append(neighbor)
+        # Kahn's algorithm; the order list doubles as the FIFO queue
+        order = [v for v in range(csr.node_count) if not in_degree[v]]
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for j in range(indptr[u], indptr[u + 1]):
+                v = indices[j]
+                in_degree[v] -= 1
+                if not in_degree[v]:
+                    order.append(v)
         
-        # Check if all nodes were processed (no cycles)
-        if len(result) != len(self.graph.graph["nodes"]):
-            return None  # Graph has cycles
+        # Nodes on a cycle (self-loops included) never reach in-degree zero
+        if len(order) != csr.node_count:
+            csr.results["topological_sort"] = None
+            return None
         
+        int_to_id = csr.int_to_id
+        result = [int_to_id[v] for v in order]
+        csr.results["topological_sort"] = tuple(result)
         return result
     
     def has_cycles(self) -> bool:
@@ -494,32 +1662,12 @@ class TraversalOperations:
         Returns:
             True if graph has cycles, False otherwise
         """
-        # Simple cycle detection using DFS
-        visited = set()
-        rec_stack = set()
+        csr = self._ensure_csr()
+        if "topological_sort" in csr.results:
+            return csr.results["topological_sort"] is None
         
-        def has_cycle_dfs(node):
-            if node in rec_stack:
-                return True
-            if node in visited:
-                return False
-            
-            visited.add(node)
-            rec_stack.add(node)
-            
-            for neighbor, _ in self.neighbors_out(node):
-                if has_cycle_dfs(neighbor):
-                    return True
-            
-            rec_stack.remove(node)
-            return False
-        
-        for node_id in self.graph.graph["nodes"]:
-            if node_id not in visited:
-                if has_cycle_dfs(node_id):
-                    return True
-        
-        return False
+        _, comp_count, has_self_loop = self._tarjan_scc()
+        return has_self_loop or comp_count < csr.node_count
     
     def find_paths(self, start: NodeId, end: NodeId, max_length: Optional[int] = None,
                   edge_filter: Optional[EdgeFilter] = None) -> Generator[List[NodeId], None, None]:
@@ -535,30 +1683,116 @@ class TraversalOperations:
         Yields:
             Paths as lists of node IDs
         """
-        if start not in self.graph.graph["nodes"]:
+        nodes = self._nodes_view
+        if start not in nodes:
             raise NodeNotFoundError(start)
-        if end not in self.graph.graph["nodes"]:
+        if end not in nodes:
             raise NodeNotFoundError(end)
         
-        def dfs_path(current, path, visited):
-            if current == end:
-                yield path.copy()
-                return
-            
-            if max_length is not None and len(path) >= max_length:
-                return
+        if start == end:
+            yield [start]
+            return
+        
+        csr = self._query_csr()
+        if csr is None:
+            yield from self._find_paths_adjacency(start, end, max_length, edge_filter)
+            return
+        
+        indptr = csr.out_indptr
+        indices = csr.out_indices
+        edges = csr.out_edges
+        int_to_id = csr.int_to_id
+        
+        source = csr.id_to_int[start]
+        target = csr.id_to_int[end]
+        
+        # A simple path never repeats a node, so it holds at most N of them
+        size = csr.node_count if max_length is None else min(max_length, csr.node_count)
+        if size < 2:
+            return
+        
+        # Explicit DFS stack: path[i] is the node at depth i and cursor[i] the
+        # CSR position of its next edge to try
+        path = array("i", [0]) * size
+        cursor = array("i", [0]) * size
+        # Indexed by node int: membership is a byte load, no hashing involved
+        visited = bytearray(csr.node_count)
+        # Enumeration revisits the same edges many times, so each edge's filter
+        # verdict is kept per CSR position (0 = unknown, 1 = pass, 2 = fail)
+        verdict = bytearray(len(indices)) if edge_filter else None
+        path[0] = source
+        cursor[0] = indptr[source]
+        visited[source] = 1
+        top = 0
+        
+        while top >= 0:
+            u = path[top]
+            j = cursor[top]
+            if j == indptr[u + 1]:
+                visited[u] = 0
+                top -= 1
+                continue
+            cursor[top] = j + 1
             
-            for neighbor, edge in self.neighbors_out(current, edge_filter=edge_filter):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    path.append(neighbor)
-                    
-                    yield from dfs_path(neighbor, path, visited)
-                    
-                    path.pop()
-                    visited.remove(neighbor)
+            v = indices[j]
+            if visited[v]:
+                continue
+            if verdict is not None:
+                ok = verdict[j]
+                if not ok:
+                    ok = verdict[j] = 1 if edge_filter(edges[j]) else 2
+                if ok == 2:
+                    continue
+            if v == target:
+                yield [int_to_id[path[i]] for i in range(top + 1)] + [end]
+                continue
+            # Only descend if the longer path could still reach the target
+            if top + 2 < size:
+                top += 1
+                path[top] = v
+                cursor[top] = indptr[v]
+                visited[v] = 1
+    
+    def _find_paths_adjacency(self, start: NodeId, end: NodeId, max_length: Optional[int],
+                              edge_filter: Optional[EdgeFilter]) -> Iterator[List[NodeId]]:
+        """find_paths over the adjacency dicts, for a stale snapshot."""
+        out_edges = self.graph._out_edges
+        node_count = len(self._nodes_view)
+        size = node_count if max_length is None else min(max_length, node_count)
+        if size < 2:
+            return
+        
+        # Explicit DFS stack of edge iterators, one per node on the path
+        path = [start]
+        cursors = [iter(out_edges.get(start, ()))]
+        on_path = {start}
+        # Each edge's filter verdict is kept, keyed by edge identity
+        verdict: Optional[Dict[int, bool]] = {} if edge_filter else None
         
-        yield from dfs_path(start, [start], {start})
+        while cursors:
+            edge = next(cursors[-1], None)
+            if edge is None:
+                cursors.pop()
+                on_path.discard(path.pop())
+                continue
+            
+            v = edge.dst
+            if v in on_path:
+                continue
+            if verdict is not None:
+                ok = verdict.get(id(edge))
+                if ok is None:
+                    ok = verdict[id(edge)] = bool(edge_filter(edge))
+                if not ok:
+                    continue
+            if v == end:
+                yield path + [end]
+                continue
+            # Only descend if the longer path could still reach the target
+            if len(path) + 1 < size:
+                path.append(v)
+                cursors.append(iter(out_edges.get(v, ())))
+                on_path.add(v)
     
     def __repr__(self) -> str:
         """String representation."""
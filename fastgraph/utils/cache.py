@@ -5,14 +5,24 @@ This module provides caching functionality including LRU caches,
 TTL-based caches, and cache management.
 """
 
+import random
 import time
 import threading
-from typing import Any, Dict, Optional, Callable, Tuple
+import weakref
+from typing import Any, Dict, List, Optional, Callable, Tuple
+from contextlib import nullcontext
 from functools import wraps, lru_cache
-from collections import OrderedDict
+from collections import Counter, OrderedDict
 from ..exceptions import CacheError
 
 
+# Returned by _get_impl on a miss, so that cached None values are hits
+_MISSING = object()
+
+# Separates positional from keyword arguments in cached() keys
+_KWD_MARK = object()
+
+
 class CacheManager:
     """
     Manages caching for FastGraph operations.
@@ -25,7 +35,7 @@ class CacheManager:
         """Initialize cache manager."""
         self._caches: Dict[str, 'BaseCache'] = {}
         self._stats: Dict[str, Dict[str, int]] = {}
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
     
     def get_cache(self, name: str, cache_type: str = "lru", **kwargs) -> 'BaseCache':
         """
@@ -33,24 +43,29 @@ class CacheManager:
         
         Args:
             name: Cache name
-            cache_type: Cache type (lru, ttl, simple)
-            **kwargs: Cache-specific parameters
+            cache_type: Cache type (lru, ttl, simple, sharded_lru)
+            **kwargs: Cache-specific parameters (size, ttl, shards, threadsafe)
             
         Returns:
             Cache instance
         """
         with self._lock:
             if name not in self._caches:
+                threadsafe = kwargs.get("threadsafe", True)
                 if cache_type == "lru":
                     size = kwargs.get("size", 128)
-                    self._caches[name] = LRUCache(size)
+                    self._caches[name] = LRUCache(size, threadsafe=threadsafe)
                 elif cache_type == "ttl":
                     size = kwargs.get("size", 128)
                     ttl = kwargs.get("ttl", 3600)
-                    self._caches[name] = TTLCache(size, ttl)
+                    self._caches[name] = TTLCache(size, ttl, threadsafe=threadsafe)
                 elif cache_type == "simple":
                     size = kwargs.get("size", 128)
-                    self._caches[name] = SimpleCache(size)
+                    self._caches[name] = SimpleCache(size, threadsafe=threadsafe)
+                elif cache_type == "sharded_lru":
+                    size = kwargs.get("size", 128)
+                    shards = kwargs.get("shards", 16)
+                    self._caches[name] = ShardedLRUCache(size, shards, threadsafe=threadsafe)
                 else:
                     raise CacheError(f"Unknown cache type: {cache_type}")
                 
@@ -96,24 +111,77 @@ class CacheManager:
 
 
 class BaseCache:
-    """Base cache class."""
+    """
+    Base cache class.
     
-    def __init__(self):
-        """Initialize base cache."""
-        self._lock = threading.RLock()
-        self._hits = 0
-        self._misses = 0
-        self._evictions = 0
+    Reads do not take the cache lock: each ``_get_impl`` only performs
+    lookups that are atomic under the GIL, so concurrent readers never
+    serialize on each other. Mutations still hold the lock. Hit/miss
+    counters are bumped without it and may undercount slightly under heavy
+    concurrent reads.
+    
+    The lock is a plain, non-reentrant Lock: the ``*_impl`` methods run
+    under it and must not call back into put/remove/clear.
+    """
+    
+    def __init__(self, threadsafe: bool = True):
+        """
+        Initialize base cache.
+        
+        Args:
+            threadsafe: Lock mutations; pass False for single-threaded use
+        """
+        self._lock = threading.Lock() if threadsafe else nullcontext()
+        self._stats = Counter(hits=0, misses=0, evictions=0)
     
     def get(self, key: Any) -> Optional[Any]:
-        """Get value from cache."""
-        with self._lock:
-            value = self._get_impl(key)
-            if value is not None:
-                self._hits += 1
-            else:
-                self._misses += 1
+        """Get value from cache, or None on a miss."""
+        value = self._get_impl(key)
+        if value is _MISSING:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return value
+    
+    def peek(self, key: Any) -> Optional[Any]:
+        """
+        Get value from cache without updating recency or statistics.
+        
+        Useful for inspecting a cache, e.g. while estimating its memory,
+        without disturbing what it would evict next.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value, or None on a miss
+        """
+        value = self._peek_impl(key)
+        return None if value is _MISSING else value
+    
+    def get_put(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+        
+        A hit is served without locking; a miss calls ``factory`` outside
+        the lock and stores its result with a single put. A cached None is
+        returned as a hit like any other value.
+        
+        Args:
+            key: Cache key
+            factory: Zero-argument callable producing the value on a miss
+            
+        Returns:
+            Cached or newly computed value
+        """
+        value = self._get_impl(key)
+        if value is not _MISSING:
+            self._stats["hits"] += 1
             return value
+        self._stats["misses"] += 1
+        value = factory()
+        self.put(key, value)
+        return value
     
     def put(self, key: Any, value: Any) -> None:
         """Put value in cache."""
@@ -132,14 +200,11 @@ class BaseCache:
     
     def get_stats(self) -> Dict[str, int]:
         """Get cache statistics."""
-        return {
-            "hits": self._hits,
-            "misses": self._misses,
-            "evictions": self._evictions
-        }
+        return dict(self._stats)
     
     # Abstract methods to be implemented by subclasses
-    def _get_impl(self, key: Any) -> Optional[Any]:
+    def _get_impl(self, key: Any) -> Any:
+        """Return the cached value, or _MISSING on a miss."""
         raise NotImplementedError
     
     def _put_impl(self, key: Any, value: Any) -> None:
@@ -151,15 +216,25 @@ class BaseCache:
     def _clear_impl(self) -> None:
         raise NotImplementedError
     
+    def _peek_impl(self, key: Any) -> Any:
+        """Return the cached value without side effects, or _MISSING."""
+        return self._get_impl(key)
+    
+    def _contains_impl(self, key: Any) -> bool:
+        """Check membership without touching recency or statistics."""
+        return self._peek_impl(key) is not _MISSING
+    
     def __contains__(self, key: Any) -> bool:
         """Check if key exists in cache."""
-        return self.get(key) is not None
+        return self._contains_impl(key)
     
     def __getitem__(self, key: Any) -> Any:
         """Get item using dictionary syntax."""
-        value = self.get(key)
-        if value is None:
+        value = self._get_impl(key)
+        if value is _MISSING:
+            self._stats["misses"] += 1
             raise KeyError(key)
+        self._stats["hits"] += 1
         return value
     
     def __setitem__(self, key: Any, value: Any) -> None:
@@ -171,45 +246,61 @@ class LRUCache(BaseCache):
     """
     Least Recently Used (LRU) cache implementation.
     
-    Evicts least recently used items when capacity is reached.
+    Evicts least recently used items when capacity is reached. Entries are
+    kept in an OrderedDict in recency order: hits move their key to the
+    end and evictions pop from the front. Reads stay lock-free, since the
+    lookup and the move are each atomic; a key evicted in between is
+    simply not promoted.
     """
     
-    def __init__(self, max_size: int):
+    def __init__(self, max_size: int, threadsafe: bool = True):
         """
         Initialize LRU cache.
         
         Args:
             max_size: Maximum number of items
+            threadsafe: Lock mutations; pass False for single-threaded use
         """
-        super().__init__()
+        super().__init__(threadsafe)
         self._max_size = max_size
-        self._cache = OrderedDict()
+        self._cache: 'OrderedDict[Any, Any]' = OrderedDict()
     
-    def _get_impl(self, key: Any) -> Optional[Any]:
+    def _get_impl(self, key: Any) -> Any:
         """Get value from LRU cache."""
-        if key in self._cache:
-            # Move to end (most recently used)
-            value = self._cache.pop(key)
-            self._cache[key] = value
-            return value
-        return None
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            try:
+                # Move to end (most recently used)
+                self._cache.move_to_end(key)
+            except KeyError:
+                pass
+        return value
     
     def _put_impl(self, key: Any, value: Any) -> None:
         """Put value in LRU cache."""
-        if key in self._cache:
+        cache = self._cache
+        if key in cache:
             # Update existing
-            self._cache.pop(key)
-        elif len(self._cache) >= self._max_size:
+            cache.move_to_end(key)
+        elif len(cache) >= self._max_size:
             # Evict least recently used
-            evicted_key, evicted_value = self._cache.popitem(last=False)
-            self._evictions += 1
+            cache.popitem(last=False)
+            self._stats["evictions"] += 1
         
-        self._cache[key] = value
+        cache[key] = value
     
     def _remove_impl(self, key: Any) -> Optional[Any]:
         """Remove value from LRU cache."""
         return self._cache.pop(key, None)
     
+    def _peek_impl(self, key: Any) -> Any:
+        """Get value without moving it to the end."""
+        return self._cache.get(key, _MISSING)
+    
+    def _contains_impl(self, key: Any) -> bool:
+        """Check membership without promoting the key."""
+        return key in self._cache
+    
     def _clear_impl(self) -> None:
         """Clear LRU cache."""
         self._cache.clear()
@@ -223,58 +314,164 @@ class LRUCache(BaseCache):
         return self._max_size
 
 
+class ShardedLRUCache(BaseCache):
+    """
+    LRU cache split into independently locked shards.
+    
+    Keys are dispatched to one of ``shards`` LRUCache instances by
+    ``hash(key) & (shards - 1)``, so writers to different shards never wait
+    on each other. Recency and eviction are tracked per shard, which makes
+    eviction order approximate across the whole cache.
+    """
+    
+    def __init__(self, max_size: int, shards: int = 16, threadsafe: bool = True):
+        """
+        Initialize sharded LRU cache.
+        
+        Args:
+            max_size: Maximum number of items across all shards
+            shards: Number of shards, a power of two
+            threadsafe: Lock mutations; pass False for single-threaded use
+            
+        Raises:
+            CacheError: If shards is not a positive power of two
+        """
+        if shards < 1 or shards & (shards - 1):
+            raise CacheError(f"Shard count must be a power of two, got {shards}")
+        
+        super().__init__(threadsafe)
+        self._mask = shards - 1
+        shard_size = max(1, max_size // shards)
+        self._shards = [LRUCache(shard_size, threadsafe=threadsafe) for _ in range(shards)]
+    
+    def _shard(self, key: Any) -> LRUCache:
+        """Return the shard responsible for ``key``."""
+        return self._shards[hash(key) & self._mask]
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Put value in cache, locking only the key's shard."""
+        self._shard(key).put(key, value)
+    
+    def remove(self, key: Any) -> Optional[Any]:
+        """Remove value from cache, locking only the key's shard."""
+        return self._shard(key).remove(key)
+    
+    def clear(self) -> None:
+        """Clear cache one shard at a time."""
+        for shard in self._shards:
+            shard.clear()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics, with evictions summed across shards."""
+        stats = super().get_stats()
+        stats["evictions"] = sum(shard._stats["evictions"] for shard in self._shards)
+        return stats
+    
+    def _get_impl(self, key: Any) -> Any:
+        """Get value from the key's shard."""
+        return self._shard(key)._get_impl(key)
+    
+    def _put_impl(self, key: Any, value: Any) -> None:
+        """Put value in the key's shard."""
+        self._shard(key)._put_impl(key, value)
+    
+    def _remove_impl(self, key: Any) -> Optional[Any]:
+        """Remove value from the key's shard."""
+        return self._shard(key)._remove_impl(key)
+    
+    def _clear_impl(self) -> None:
+        """Clear every shard."""
+        for shard in self._shards:
+            shard._clear_impl()
+    
+    def _peek_impl(self, key: Any) -> Any:
+        """Peek into the key's shard."""
+        return self._shard(key)._peek_impl(key)
+    
+    def _contains_impl(self, key: Any) -> bool:
+        """Check membership in the key's shard."""
+        return self._shard(key)._contains_impl(key)
+    
+    def get_size(self) -> int:
+        """Get current cache size."""
+        return sum(shard.get_size() for shard in self._shards)
+    
+    def get_capacity(self) -> int:
+        """Get cache capacity."""
+        return sum(shard.get_capacity() for shard in self._shards)
+
+
 class TTLCache(BaseCache):
     """
     Time-To-Live (TTL) cache implementation.
     
-    Items expire after specified time period.
+    Items expire after specified time period. Expiry times are integer
+    ``time.monotonic_ns()`` stamps, so they are cheap to compare and
+    unaffected by wall-clock adjustments.
+    
+    Every entry shares the same TTL, so insertion order is expiry order:
+    entries are kept in an OrderedDict with updates moved to the end, and
+    both capacity eviction and expiry cleanup work from the front. Puts
+    only sweep expired entries once every eighth of the TTL, or when the
+    cache is full; gets still never return an expired value.
     """
     
-    def __init__(self, max_size: int, ttl: int):
+    def __init__(self, max_size: int, ttl: int, threadsafe: bool = True):
         """
         Initialize TTL cache.
         
         Args:
             max_size: Maximum number of items
             ttl: Time-to-live in seconds
+            threadsafe: Lock mutations; pass False for single-threaded use
         """
-        super().__init__()
+        super().__init__(threadsafe)
         self._max_size = max_size
         self._ttl = ttl
-        self._cache: Dict[Any, Tuple[Any, float]] = {}
+        self._ttl_ns = int(ttl * 1_000_000_000)
+        self._cleanup_interval_ns = self._ttl_ns // 8
+        self._last_cleanup_ns = time.monotonic_ns()
+        self._cache: 'OrderedDict[Any, Tuple[Any, int]]' = OrderedDict()
     
-    def _get_impl(self, key: Any) -> Optional[Any]:
+    def _get_impl(self, key: Any) -> Any:
         """Get value from TTL cache."""
-        current_time = time.time()
+        current_time = time.monotonic_ns()
         
-        if key in self._cache:
-            value, expiry_time = self._cache[key]
+        item = self._cache.get(key)
+        if item is not None:
+            value, expiry_time = item
             
             if expiry_time > current_time:
                 return value
             else:
-                # Expired item
-                del self._cache[key]
-                self._evictions += 1
+                # Expired item; only this slow path takes the lock
+                with self._lock:
+                    if self._cache.get(key) is item:
+                        del self._cache[key]
+                        self._stats["evictions"] += 1
         
-        return None
+        return _MISSING
     
     def _put_impl(self, key: Any, value: Any) -> None:
         """Put value in TTL cache."""
-        current_time = time.time()
-        expiry_time = current_time + self._ttl
+        now = time.monotonic_ns()
+        expiry_time = now + self._ttl_ns
+        cache = self._cache
         
         # Clean expired items if needed
-        self._cleanup_expired()
+        if (now - self._last_cleanup_ns > self._cleanup_interval_ns
+                or len(cache) >= self._max_size):
+            self._cleanup_expired(now)
         
-        if key not in self._cache and len(self._cache) >= self._max_size:
+        if key in cache:
+            # Keep insertion order matching expiry order
+            cache.move_to_end(key)
+        elif len(cache) >= self._max_size:
             # Remove oldest item
-            oldest_key = min(self._cache.keys(), 
-                           key=lambda k: self._cache[k][1])
-            del self._cache[oldest_key]
-            self._evictions += 1
+            cache.popitem(last=False)
+            self._stats["evictions"] += 1
         
-        self._cache[key] = (value, expiry_time)
+        cache[key] = (value, expiry_time)
     
     def _remove_impl(self, key: Any) -> Optional[Any]:
         """Remove value from TTL cache."""
@@ -287,17 +484,32 @@ class TTLCache(BaseCache):
         """Clear TTL cache."""
         self._cache.clear()
     
-    def _cleanup_expired(self) -> None:
-        """Remove expired items."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, expiry) in self._cache.items()
-            if expiry <= current_time
-        ]
+    def _peek_impl(self, key: Any) -> Any:
+        """Get an unexpired value without removing expired entries."""
+        item = self._cache.get(key)
+        if item is None or item[1] <= time.monotonic_ns():
+            return _MISSING
+        return item[0]
+    
+    def _cleanup_expired(self, current_time: Optional[int] = None) -> None:
+        """
+        Remove expired items.
         
-        for key in expired_keys:
-            del self._cache[key]
-            self._evictions += 1
+        Args:
+            current_time: Current monotonic_ns() reading, if already taken
+        """
+        if current_time is None:
+            current_time = time.monotonic_ns()
+        self._last_cleanup_ns = current_time
+        expired = 0
+        for _, expiry in self._cache.values():
+            if expiry > current_time:
+                break
+            expired += 1
+        
+        for _ in range(expired):
+            self._cache.popitem(last=False)
+        self._stats["evictions"] += expired
     
     def get_size(self) -> int:
         """Get current cache size."""
@@ -308,42 +520,69 @@ class SimpleCache(BaseCache):
     """
     Simple fixed-size cache implementation.
     
-    Uses random replacement when capacity is reached.
+    Uses random replacement when capacity is reached. A list of keys with
+    a key-to-position map is kept alongside the values, so a random victim
+    is picked and swap-deleted in O(1) without copying the key set.
     """
     
-    def __init__(self, max_size: int):
+    def __init__(self, max_size: int, threadsafe: bool = True):
         """
         Initialize simple cache.
         
         Args:
             max_size: Maximum number of items
+            threadsafe: Lock mutations; pass False for single-threaded use
         """
-        super().__init__()
+        super().__init__(threadsafe)
         self._max_size = max_size
+        # Not presized: dict.clear() frees the table, so a fromkeys()+clear()
+        # presize is lost immediately, and growth is amortized O(1) anyway
         self._cache: Dict[Any, Any] = {}
+        self._keys: List[Any] = []
+        self._positions: Dict[Any, int] = {}
     
-    def _get_impl(self, key: Any) -> Optional[Any]:
+    def _get_impl(self, key: Any) -> Any:
         """Get value from simple cache."""
-        return self._cache.get(key)
+        return self._cache.get(key, _MISSING)
     
     def _put_impl(self, key: Any, value: Any) -> None:
         """Put value in simple cache."""
-        if key not in self._cache and len(self._cache) >= self._max_size:
-            # Remove a random item
-            import random
-            random_key = random.choice(list(self._cache.keys()))
-            del self._cache[random_key]
-            self._evictions += 1
+        if key not in self._cache:
+            if len(self._cache) >= self._max_size:
+                # Remove a random item
+                random_key = self._keys[random.randrange(len(self._keys))]
+                del self._cache[random_key]
+                self._forget(random_key)
+                self._stats["evictions"] += 1
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
         
         self._cache[key] = value
     
     def _remove_impl(self, key: Any) -> Optional[Any]:
         """Remove value from simple cache."""
-        return self._cache.pop(key, None)
+        if key not in self._cache:
+            return None
+        self._forget(key)
+        return self._cache.pop(key)
+    
+    def _forget(self, key: Any) -> None:
+        """Swap-delete ``key`` from the key list."""
+        position = self._positions.pop(key)
+        last = self._keys.pop()
+        if position < len(self._keys):
+            self._keys[position] = last
+            self._positions[last] = position
     
     def _clear_impl(self) -> None:
         """Clear simple cache."""
         self._cache.clear()
+        self._keys.clear()
+        self._positions.clear()
+    
+    def _contains_impl(self, key: Any) -> bool:
+        """Check membership without touching statistics."""
+        return key in self._cache
     
     def get_size(self) -> int:
         """Get current cache size."""
@@ -351,10 +590,46 @@ class SimpleCache(BaseCache):
 
 
 # Decorators for easy caching
+def _caching_wrapper(func: Callable, resolve_cache: Callable[[], BaseCache]) -> Callable:
+    """
+    Wrap ``func`` so its results are stored in a cache.
+    
+    Args:
+        func: Function to wrap
+        resolve_cache: Returns the cache to use; called on the first call only
+        
+    Returns:
+        Wrapped function
+    """
+    # Keeps functions sharing a named cache apart
+    namespace = (func.__name__,)
+    cache_box: List[Optional[BaseCache]] = [None]
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = cache_box[0]
+        if cache is None:
+            cache = resolve_cache()
+            cache_box[0] = cache
+        
+        # Create cache key as one flat tuple, like functools.lru_cache
+        if kwargs:
+            cache_key = namespace + args + (_KWD_MARK,) + tuple(sorted(kwargs.items()))
+        else:
+            cache_key = namespace + args
+        
+        return cache.get_put(cache_key, lambda: func(*args, **kwargs))
+    
+    return wrapper
+
+
 def cached(cache_name: str = "default", cache_type: str = "lru", **cache_kwargs):
     """
     Decorator for caching function results.
     
+    The named cache is looked up in the global manager on the first call
+    and then kept by the decorated function.
+    
     Args:
         cache_name: Cache name
         cache_type: Cache type
@@ -364,27 +639,10 @@ def cached(cache_name: str = "default", cache_type: str = "lru", **cache_kwargs)
         Decorated function
     """
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Get cache manager
-            cache_manager = get_global_cache_manager()
-            cache = cache_manager.get_cache(cache_name, cache_type, **cache_kwargs)
-            
-            # Create cache key
-            cache_key = (func.__name__, args, frozenset(kwargs.items()))
-            
-            # Try to get from cache
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
-            
-            # Compute and cache result
-            result = func(*args, **kwargs)
-            cache.put(cache_key, result)
-            
-            return result
-        
-        return wrapper
+        return _caching_wrapper(
+            func,
+            lambda: get_global_cache_manager().get_cache(cache_name, cache_type, **cache_kwargs)
+        )
     return decorator
 
 
@@ -392,6 +650,10 @@ def cached_result(ttl: Optional[int] = None, size: int = 128):
     """
     Decorator for caching results with TTL support.
     
+    With a TTL, each decorated function gets its own TTLCache instead of an
+    entry in the global manager, and the cache is cleared once the function
+    is garbage collected.
+    
     Args:
         ttl: Time-to-live in seconds
         size: Maximum cache size
@@ -401,9 +663,10 @@ def cached_result(ttl: Optional[int] = None, size: int = 128):
     """
     def decorator(func: Callable) -> Callable:
         if ttl:
-            # Use TTL cache
-            cache_key = f"{func.__name__}_ttl"
-            return cached(cache_key, "ttl", ttl=ttl, size=size)(func)
+            # Use a TTL cache private to this function
+            cache = TTLCache(size, ttl)
+            weakref.finalize(func, cache.clear)
+            return _caching_wrapper(func, lambda: cache)
         else:
             # Use LRU cache
             return lru_cache(maxsize=size)(func)
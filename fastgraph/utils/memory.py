@@ -7,12 +7,33 @@ utilities for efficient graph operations.
 
 import sys
 import gc
-import psutil
+import random
 import time
-from typing import Any, Dict, List, Optional, Union
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 from ..exceptions import MemoryError
 
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is in the "performance" extra
+    psutil = None
+
+
+# Field order of process and system memory readings and snapshot rows
+_MEM_KEYS = ("rss", "vms", "shared", "text", "data", "libs", "heap")
+_SYS_KEYS = ("total", "available", "used", "free", "percentage")
+
+# Readings reported when psutil is missing or unusable on this platform
+_ZERO_MEM = (0,) * len(_MEM_KEYS)
+_ZERO_SYS = (0,) * len(_SYS_KEYS)
+
+# Exact types estimate_object_size treats as leaves or walks as sequences
+_SIMPLE_TYPES = frozenset({int, float, str, bool, type(None), bytes, bytearray})
+_SEQ_TYPES = frozenset({list, tuple, set, frozenset})
+
+_sys_getsizeof = sys.getsizeof
+
 
 class MemoryUtils:
     """
@@ -22,109 +43,229 @@ class MemoryUtils:
     functionality for FastGraph operations.
     """
     
+    # How long a process memory reading is reused, in nanoseconds
+    MEMORY_USAGE_TTL_NS = 100_000_000
+    
+    # How long a system memory reading is reused, in nanoseconds
+    SYSTEM_MEMORY_TTL_NS = 500_000_000
+    
+    # Items measured per graph component before extrapolating
+    GRAPH_SAMPLE_SIZE = 1000
+    
+    # Snapshots kept; older ones are overwritten as new ones are taken
+    MAX_SNAPSHOTS = 128
+    
     def __init__(self):
         """Initialize memory utils."""
         self._baseline_memory = None
-        self._memory_snapshots: List[Dict[str, Any]] = []
-        self._process = psutil.Process()
+        
+        # Probe psutil once; the readers below skip it entirely if unusable
+        self._mem_info_fn: Optional[Callable[[], Any]] = None
+        self._virtual_memory_fn: Optional[Callable[[], Any]] = None
+        if psutil is not None:
+            try:
+                process = psutil.Process()
+                process.memory_info()
+                self._mem_info_fn = process.memory_info
+            except Exception:
+                pass
+            try:
+                psutil.virtual_memory()
+                self._virtual_memory_fn = psutil.virtual_memory
+            except Exception:
+                pass
+        
+        self._mem_cache_ns = 0
+        self._mem_cache_val: Optional[Tuple[int, ...]] = None
+        self._sys_mem_cache: Tuple[int, Optional[Tuple[float, ...]]] = (0, None)
+        
+        # Snapshot ring buffer, allocated on the first snapshot: one row per
+        # slot in flat typed arrays, laid out in _MEM_KEYS/_SYS_KEYS order
+        self._snapshot_count = 0
+        self._snap_times: Optional[array] = None
+        self._snap_mem: Optional[array] = None
+        self._snap_sys: Optional[array] = None
+        self._snap_labels: List[str] = []
+    
+    def _memory_values(self) -> Tuple[int, ...]:
+        """Read process memory as a tuple ordered like _MEM_KEYS, reusing a recent reading."""
+        now = time.monotonic_ns()
+        if self._mem_cache_val is not None and now - self._mem_cache_ns < self.MEMORY_USAGE_TTL_NS:
+            return self._mem_cache_val
+        return self._read_memory(now)
+    
+    def _read_memory(self, now: Optional[int] = None) -> Tuple[int, ...]:
+        """
+        Read process memory as a tuple ordered like _MEM_KEYS.
+        
+        Always takes a fresh reading, which also refreshes the cache used by
+        _memory_values.
+        
+        Args:
+            now: Current monotonic_ns() reading, if already taken
+            
+        Returns:
+            Memory values in bytes
+        """
+        if self._mem_info_fn is None:
+            return _ZERO_MEM
+        
+        memory_info = self._mem_info_fn()
+        values = (
+            memory_info.rss,  # Resident Set Size
+            memory_info.vms,  # Virtual Memory Size
+            getattr(memory_info, 'shared', 0) or 0,
+            getattr(memory_info, 'text', 0),
+            getattr(memory_info, 'data', 0),
+            getattr(memory_info, 'lib', 0),
+            0
+        )
+        
+        self._mem_cache_ns = time.monotonic_ns() if now is None else now
+        self._mem_cache_val = values
+        return values
     
     def get_memory_usage(self) -> Dict[str, int]:
         """
         Get current memory usage information.
         
+        Readings are reused for MEMORY_USAGE_TTL_NS, so callers polling in a
+        loop do not pay for a /proc read on every call.
+        
         Returns:
             Dictionary with memory usage statistics in bytes
         """
-        try:
-            memory_info = self._process.memory_info()
-            memory_stats = self._process.memory_stats()
-            
-            return {
-                "rss": memory_info.rss,  # Resident Set Size
-                "vms": memory_info.vms,  # Virtual Memory Size
-                "shared": memory_info.shared or 0,
-                "text": getattr(memory_stats, 'text', 0),
-                "data": getattr(memory_stats, 'data', 0),
-                "libs": getattr(memory_stats, 'libs', 0),
-                "heap": getattr(memory_stats, 'heap', 0)
-            }
-        except Exception:
-            # Fallback to sys methods
-            return {
-                "rss": 0,
-                "vms": 0,
-                "shared": 0,
-                "text": 0,
-                "data": 0,
-                "libs": 0,
-                "heap": 0
-            }
+        return dict(zip(_MEM_KEYS, self._memory_values()))
+    
+    def _system_values(self) -> Tuple[float, ...]:
+        """Read system memory as a tuple ordered like _SYS_KEYS."""
+        now = time.monotonic_ns()
+        cached_at, values = self._sys_mem_cache
+        if values is not None and now - cached_at < self.SYSTEM_MEMORY_TTL_NS:
+            return values
+        
+        if self._virtual_memory_fn is None:
+            return _ZERO_SYS
+        
+        virtual_memory = self._virtual_memory_fn()
+        values = (
+            virtual_memory.total,
+            virtual_memory.available,
+            virtual_memory.used,
+            virtual_memory.free,
+            virtual_memory.percent
+        )
+        
+        self._sys_mem_cache = (now, values)
+        return values
     
     def get_system_memory(self) -> Dict[str, int]:
         """
         Get system-wide memory information.
         
+        Readings are reused for SYSTEM_MEMORY_TTL_NS, which also covers
+        get_memory_pressure and is_memory_low.
+        
         Returns:
             Dictionary with system memory statistics
         """
-        try:
-            virtual_memory = psutil.virtual_memory()
-            return {
-                "total": virtual_memory.total,
-                "available": virtual_memory.available,
-                "used": virtual_memory.used,
-                "free": virtual_memory.free,
-                "percentage": virtual_memory.percent
-            }
-        except Exception:
-            return {
-                "total": 0,
-                "available": 0,
-                "used": 0,
-                "free": 0,
-                "percentage": 0
-            }
+        return dict(zip(_SYS_KEYS, self._system_values()))
     
     def estimate_object_size(self, obj: Any) -> int:
         """
         Estimate memory usage of an object.
         
+        Containers are walked iteratively, and every object is counted once
+        by identity, so shared substructures are not double-counted and
+        cyclic structures terminate.
+        
         Args:
             obj: Object to measure
             
         Returns:
             Estimated size in bytes
         """
-        try:
-            # For basic objects
-            if isinstance(obj, (int, float, str, bool, type(None))):
-                return sys.getsizeof(obj)
-            
-            # For containers, estimate recursively
-            elif isinstance(obj, (list, tuple, set)):
-                size = sys.getsizeof(obj)
-                for item in obj:
-                    size += self.estimate_object_size(item)
-                return size
+        if type(obj) in _SIMPLE_TYPES:
+            return _sys_getsizeof(obj)
+        
+        seen = set()
+        stack = [obj]
+        total = 0
+        getsizeof = _sys_getsizeof
+        seq_types = _SEQ_TYPES
+        
+        while stack:
+            item = stack.pop()
+            item_id = id(item)
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+            total += getsizeof(item, 0)
             
-            elif isinstance(obj, dict):
-                size = sys.getsizeof(obj)
-                for key, value in obj.items():
-                    size += self.estimate_object_size(key)
-                    size += self.estimate_object_size(value)
-                return size
+            item_type = type(item)
+            if item_type in seq_types:
+                stack.extend(item)
+            elif item_type is dict:
+                stack.extend(item.keys())
+                stack.extend(item.values())
+        
+        return total
+    
+    def _sampled_size(self, items: Sequence[Any], measure: Callable[[Any], int]) -> int:
+        """
+        Estimate the total size of ``items`` from a random sample.
+        
+        Args:
+            items: Items to measure
+            measure: Function returning the size of one item
             
-            # For custom objects
-            else:
-                return sys.getsizeof(obj)
+        Returns:
+            Exact total for small inputs, otherwise the sample mean
+            extrapolated to all items
+        """
+        count = len(items)
+        if count <= self.GRAPH_SAMPLE_SIZE:
+            return sum(map(measure, items))
+        sample = random.sample(items, self.GRAPH_SAMPLE_SIZE)
+        return sum(map(measure, sample)) * count // self.GRAPH_SAMPLE_SIZE
+    
+    def _estimate_graph_data(self, graph) -> Dict[str, int]:
+        """Estimate node, edge, adjacency and relation-index memory."""
+        estimates = {}
+        size = self.estimate_object_size
         
-        except Exception:
-            return sys.getsizeof(obj)
+        # Nodes memory
+        if hasattr(graph, 'graph') and 'nodes' in graph.graph:
+            estimates['nodes'] = self._sampled_size(
+                list(graph.graph['nodes'].items()),
+                lambda item: size(item[0]) + size(item[1]))
+        
+        # Edges memory
+        if hasattr(graph, '_edges'):
+            estimates['edges'] = self._sampled_size(list(graph._edges.values()), size)
+        
+        # Adjacency lists
+        if hasattr(graph, '_out_edges'):
+            estimates['out_edges'] = self._sampled_size(list(graph._out_edges.values()), size)
+        
+        if hasattr(graph, '_in_edges'):
+            estimates['in_edges'] = self._sampled_size(list(graph._in_edges.values()), size)
+        
+        # Relation index
+        if hasattr(graph, '_rel_index'):
+            estimates['rel_index'] = self._sampled_size(list(graph._rel_index.values()), size)
+        
+        return estimates
     
     def estimate_graph_memory(self, graph) -> Dict[str, int]:
         """
         Estimate memory usage of a FastGraph instance.
         
+        Nodes, edges, adjacency lists and the relation index are estimated
+        from up to GRAPH_SAMPLE_SIZE random items each, and that part of the
+        estimate is cached on the graph until its next structural change.
+        Indexes and metadata are always measured in full.
+        
         Args:
             graph: FastGraph instance
             
@@ -134,19 +275,15 @@ class MemoryUtils:
         estimates = {}
         
         try:
-            # Nodes memory
-            if hasattr(graph, 'graph') and 'nodes' in graph.graph:
-                nodes_size = 0
-                for node_id, attrs in graph.graph['nodes'].items():
-                    nodes_size += self.estimate_object_size(node_id)
-                    nodes_size += self.estimate_object_size(attrs)
-                estimates['nodes'] = nodes_size
-            
-            # Edges memory
-            if hasattr(graph, '_edges'):
-                edges_size = sum(self.estimate_object_size(edge) 
-                               for edge in graph._edges.values())
-                estimates['edges'] = edges_size
+            version = getattr(graph, '_mutation_version', None)
+            cached = getattr(graph, '_cached_mem_estimate', None)
+            if version is not None and cached is not None and cached[0] == version:
+                estimates.update(cached[1])
+            else:
+                data_estimates = self._estimate_graph_data(graph)
+                if version is not None:
+                    graph._cached_mem_estimate = (version, data_estimates)
+                estimates.update(data_estimates)
             
             # Indexes memory
             if hasattr(graph, 'index_manager'):
@@ -155,23 +292,6 @@ class MemoryUtils:
                     indexes_size += self.estimate_object_size(index)
                 estimates['indexes'] = indexes_size
             
-            # Adjacency lists
-            if hasattr(graph, '_out_edges'):
-                out_edges_size = sum(self.estimate_object_size(edges) 
-                                   for edges in graph._out_edges.values())
-                estimates['out_edges'] = out_edges_size
-            
-            if hasattr(graph, '_in_edges'):
-                in_edges_size = sum(self.estimate_object_size(edges) 
-                                  for edges in graph._in_edges.values())
-                estimates['in_edges'] = in_edges_size
-            
-            # Relation index
-            if hasattr(graph, '_rel_index'):
-                rel_index_size = sum(self.estimate_object_size(edges) 
-                                   for edges in graph._rel_index.values())
-                estimates['rel_index'] = rel_index_size
-            
             # Metadata
             if hasattr(graph, 'graph') and 'metadata' in graph.graph:
                 estimates['metadata'] = self.estimate_object_size(graph.graph['metadata'])
@@ -189,26 +309,77 @@ class MemoryUtils:
         """
         Take a memory snapshot for comparison.
         
+        Snapshots are stored in preallocated typed arrays rather than as
+        dictionaries, so keeping them creates no long-lived objects for the
+        garbage collector to track; the returned dictionary is a view built
+        for the caller.
+        
         Args:
             label: Label for the snapshot
             
         Returns:
             Snapshot data
         """
-        snapshot = {
-            "timestamp": time.time(),
-            "label": label,
-            "memory_usage": self.get_memory_usage(),
-            "system_memory": self.get_system_memory()
-        }
+        capacity = self.MAX_SNAPSHOTS
+        if self._snap_times is None:
+            self._snap_times = array('d', bytes(8 * capacity))
+            self._snap_mem = array('q', bytes(8 * capacity * len(_MEM_KEYS)))
+            self._snap_sys = array('d', bytes(8 * capacity * len(_SYS_KEYS)))
+            self._snap_labels = [""] * capacity
+        
+        slot = self._snapshot_count % capacity
+        self._snapshot_count += 1
+        
+        mem_width = len(_MEM_KEYS)
+        sys_width = len(_SYS_KEYS)
+        self._snap_times[slot] = time.time()
+        self._snap_labels[slot] = label
+        # Snapshots bracket operations, so they must not reuse a cached reading
+        self._snap_mem[slot * mem_width:(slot + 1) * mem_width] = array('q', self._read_memory())
+        self._snap_sys[slot * sys_width:(slot + 1) * sys_width] = array('d', self._system_values())
+        return self._snapshot_view(slot)
+    
+    def _snapshot_slot(self, index: int) -> Optional[int]:
+        """
+        Map a snapshot index to its ring buffer slot.
         
-        self._memory_snapshots.append(snapshot)
-        return snapshot
+        Args:
+            index: Index counted from the oldest retained snapshot; negative
+                values count back from the newest
+            
+        Returns:
+            Slot number, or None if the index is out of range
+        """
+        retained = min(self._snapshot_count, self.MAX_SNAPSHOTS)
+        if index < 0:
+            index += retained
+        if not 0 <= index < retained:
+            return None
+        return (self._snapshot_count - retained + index) % self.MAX_SNAPSHOTS
+    
+    def _snapshot_view(self, slot: int) -> Dict[str, Any]:
+        """Build the dictionary form of the snapshot stored in ``slot``."""
+        mem_width = len(_MEM_KEYS)
+        sys_width = len(_SYS_KEYS)
+        system = self._snap_sys[slot * sys_width:(slot + 1) * sys_width]
+        # Byte counts are stored as doubles, which hold them exactly
+        system_values = [int(value) for value in system[:-1]]
+        system_values.append(system[-1])
+        
+        return {
+            "timestamp": self._snap_times[slot],
+            "label": self._snap_labels[slot],
+            "memory_usage": dict(zip(_MEM_KEYS, self._snap_mem[slot * mem_width:(slot + 1) * mem_width])),
+            "system_memory": dict(zip(_SYS_KEYS, system_values))
+        }
     
     def get_memory_increase(self, from_snapshot: int = 0, to_snapshot: int = -1) -> Dict[str, int]:
         """
         Calculate memory increase between snapshots.
         
+        Only the last MAX_SNAPSHOTS snapshots are kept; indexes count from
+        the oldest one still retained.
+        
         Args:
             from_snapshot: Starting snapshot index
             to_snapshot: Ending snapshot index
@@ -216,23 +387,20 @@ class MemoryUtils:
         Returns:
             Memory increase by component
         """
-        if len(self._memory_snapshots) < 2:
+        if min(self._snapshot_count, self.MAX_SNAPSHOTS) < 2:
             return {}
         
-        if to_snapshot == -1:
-            to_snapshot = len(self._memory_snapshots) - 1
-        
-        if from_snapshot >= len(self._memory_snapshots) or to_snapshot >= len(self._memory_snapshots):
+        start = self._snapshot_slot(from_snapshot)
+        end = self._snapshot_slot(to_snapshot)
+        if start is None or end is None:
             return {}
         
-        start_memory = self._memory_snapshots[from_snapshot]['memory_usage']
-        end_memory = self._memory_snapshots[to_snapshot]['memory_usage']
-        
-        increase = {}
-        for key in start_memory:
-            increase[key] = end_memory.get(key, 0) - start_memory.get(key, 0)
-        
-        return increase
+        width = len(_MEM_KEYS)
+        memory = self._snap_mem
+        return {
+            key: memory[end * width + i] - memory[start * width + i]
+            for i, key in enumerate(_MEM_KEYS)
+        }
     
     def monitor_memory_limit(self, limit_mb: int, check_interval: float = 1.0):
         """
@@ -279,11 +447,6 @@ class MemoryUtils:
         # Force garbage collection
         results['garbage_collection'] = self.force_garbage_collection()
         
-        # Clear memory snapshots if too many
-        if len(self._memory_snapshots) > 100:
-            results['snapshots_cleared'] = len(self._memory_snapshots)
-            self._memory_snapshots = self._memory_snapshots[-10:]  # Keep last 10
-        
         results['current_memory'] = self.get_memory_usage()
         return results
     
@@ -6,17 +6,109 @@ capabilities for automatic graph file discovery and management.
 """
 
 import os
-import gzip
+import time
+import zlib
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Union, Dict, Any, Tuple
+from typing import Iterator, List, Optional, Sequence, Union, Dict, Any, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from msgpack import unpackb as _msgpack_unpackb
+except ImportError:  # pragma: no cover - depends on the environment
+    _msgpack_unpackb = None
 
 from ..types import FormatType, PersistenceFormat
 from ..exceptions import PersistenceError, ValidationError
+from .cache import LRUCache
 
 
 logger = logging.getLogger(__name__)
 
+# Directories and files modified this recently are never served from a
+# cache: their mtime may not tick for a change made right after caching
+_RACY_MTIME_NS = 2_000_000_000
+
+# The user's home directory, resolved once at import
+_HOME_STR = os.path.expanduser("~")
+
+# Number of detect_format results kept per resolver
+_DETECT_CACHE_SIZE = 1024
+
+# Compressed bytes read to sniff gzip content; covers the member header
+_GZIP_PEEK_BYTES = 256
+
+
+@lru_cache(maxsize=256)
+def _scan_dir(path_str: str, mtime_ns: int) -> Dict[str, os.DirEntry]:
+    """
+    Scan a directory's entries, cached per directory mtime.
+    
+    The DirEntry objects carry the file type from the directory listing,
+    so ``is_file()`` on them needs no further stat on most platforms.
+    The returned dict is shared between callers and must not be modified.
+    
+    Args:
+        path_str: Directory path
+        mtime_ns: Directory modification time; a change invalidates the entry
+        
+    Returns:
+        Dict of entry name to DirEntry (empty if the directory cannot be read)
+    """
+    try:
+        with os.scandir(path_str) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+
+def _directory_entries(path_str: str) -> Optional[Dict[str, os.DirEntry]]:
+    """Return the entries of a directory, or None if it does not exist."""
+    try:
+        mtime_ns = os.stat(path_str).st_mtime_ns
+    except OSError:
+        return None
+    if time.time_ns() - mtime_ns < _RACY_MTIME_NS:
+        return _scan_dir.__wrapped__(path_str, mtime_ns)
+    return _scan_dir(path_str, mtime_ns)
+
+
+def _existing_search_paths(home: str, cwd: str, data_dir: str) -> Tuple[str, ...]:
+    """
+    Default search locations whose parent directory exists.
+    
+    A location qualifies if it or its parent exists, which reduces to the
+    parent existing, so each distinct parent is stat-ed once. Not memoized:
+    a directory created after one resolver was built must still be seen by
+    the next.
+    
+    Args:
+        home: User home directory
+        cwd: Current working directory
+        data_dir: Expanded configured data directory
+        
+    Returns:
+        Tuple of search path strings in priority order
+    """
+    candidates = (
+        data_dir,
+        cwd,
+        os.path.join(home, ".fastgraph"),
+        os.path.join(home, ".cache", "fastgraph"),
+        os.path.join(home, ".local", "share", "fastgraph"),
+    )
+    parent_exists: Dict[str, bool] = {}
+    paths = []
+    for candidate in candidates:
+        parent = os.path.dirname(candidate)
+        exists = parent_exists.get(parent)
+        if exists is None:
+            exists = parent_exists[parent] = os.path.exists(parent)
+        if exists:
+            paths.append(candidate)
+    return tuple(paths)
+
 
 class PathResolver:
     """
@@ -27,25 +119,70 @@ class PathResolver:
     and configuration.
     """
     
+    # File extension to format
+    _EXT_TO_FORMAT: Dict[str, str] = {
+        ".json": "json",
+        ".msgpack": "msgpack",
+        ".mp": "msgpack",
+        ".pickle": "pickle",
+        ".pkl": "pickle",
+    }
+    
+    # Format signatures for content-based detection
+    _FORMAT_SIGNATURES: Dict[str, Tuple[bytes, ...]] = {
+        "json": (b'{', b'['),  # JSON starts with { or [
+        "msgpack": (),  # msgpack is binary, harder to detect
+        "pickle": (b'\x80', b'\x00'),  # pickle protocol markers
+    }
+    
+    # Every signature is a single leading byte and no two formats share
+    # one, so content detection is a single dict lookup
+    _SIG_BY_BYTE: Dict[bytes, str] = {
+        signature: format
+        for format, signatures in _FORMAT_SIGNATURES.items()
+        for signature in signatures
+    }
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize PathResolver with configuration.
         
+        Storage settings and the current working directory are read once
+        here (the home directory once per process); a later ``os.chdir``
+        does not change where this resolver searches.
+        
         Args:
             config: Configuration dictionary containing path settings
         """
         self.config = config or {}
-        self._supported_formats = {"msgpack", "pickle", "json"}
+        # Ordered by lookup priority; msgpack is the default format
+        self._supported_formats: Tuple[str, ...] = ("msgpack", "pickle", "json")
+        
+        # Filename suffixes tried by find_graph_file, grouped per format
+        self._candidate_suffixes: Tuple[Tuple[str, ...], ...] = tuple(
+            (f".{format}", f".graph.{format}", f"_graph.{format}", f"-graph.{format}")
+            for format in self._supported_formats
+        )
+        
+        # Storage settings are invariant for the lifetime of the resolver
+        storage = self.config.get("storage", {})
+        self._default_format = storage.get("default_format", "msgpack")
+        self._default_dir_str = os.path.expanduser(storage.get("data_dir", "~/.cache/fastgraph/data"))
+        self._default_dir = Path(self._default_dir_str)
+        self._trust_extension = storage.get("trust_extension", True)
+        
+        # Threads used to list search directories and read file headers
+        # concurrently (1 = inline); worth raising only for slow or network
+        # mounts
+        self._search_workers = storage.get("search_workers", 1)
+        self._search_executor: Optional[ThreadPoolExecutor] = None
+        self._cwd_str = os.getcwd()
         
         # Default search paths for graph files
         self._default_search_paths = self._get_default_search_paths()
         
-        # Format signatures for content-based detection
-        self._format_signatures = {
-            "json": [b'{', b'['],  # JSON starts with { or [
-            "msgpack": [],  # msgpack is binary, harder to detect
-            "pickle": [b'\x80', b'\x00'],  # pickle protocol markers
-        }
+        # detect_format results keyed by (path, mtime_ns, size)
+        self._detect_cache = LRUCache(max_size=_DETECT_CACHE_SIZE)
     
     def resolve_path(self, path_hint: Optional[Union[str, Path]] = None, 
                     graph_name: Optional[str] = None, 
@@ -62,40 +199,50 @@ class PathResolver:
             Resolved absolute Path object
             
         Raises:
-            ValidationError: If parameters are invalid
-            PersistenceError: If path resolution fails
+            ValidationError: If path_hint is not a path
         """
+        # Fast path: an existing absolute path that already has the extension
+        if (isinstance(path_hint, str) and format and path_hint.endswith("." + format)
+                and os.path.isabs(path_hint) and os.path.lexists(path_hint)):
+            return Path(path_hint)
+        
+        # No path hint provided, create default path
+        if not path_hint:
+            return self._create_default_path(None, graph_name, format)
+        
         try:
-            # Handle different input scenarios
-            if path_hint:
-                path = Path(path_hint)
-                
-                # If it's already an absolute path that exists, return it
-                if path.is_absolute() and (path.exists() or path.parent.exists()):
-                    return self._ensure_format_extension(path, format)
-                
-                # If it's a relative path, try to resolve it
-                if not path.is_absolute():
-                    resolved_path = self._resolve_relative_path(path, graph_name, format)
-                    if resolved_path:
-                        return resolved_path
-                
-                # If path doesn't exist, treat as a filename to be created in default location
-                if not path.exists():
-                    return self._create_default_path(path.name, graph_name, format)
-            
-            # No path hint provided, create default path
+            path_str = os.fspath(path_hint)
+        except TypeError:
+            raise ValidationError(f"Invalid path hint: {path_hint!r}",
+                                field="path_hint", value=path_hint)
+        
+        if os.path.isabs(path_str):
+            # An absolute path is used as-is when it or its directory exists
+            if os.path.lexists(path_str) or os.path.lexists(os.path.dirname(path_str)):
+                fixed = self._with_format_extension(path_str, format)
+                if fixed is path_str and isinstance(path_hint, Path):
+                    return path_hint
+                return Path(fixed)
+            return self._create_default_path(path_str, graph_name, format)
+        
+        # A relative path is tried against the search locations
+        resolved_path = self._resolve_relative_path(path_str, graph_name, format)
+        if resolved_path:
+            return resolved_path
+        
+        # Otherwise treat it as a filename to be created in default location
+        if os.path.lexists(path_str):
             return self._create_default_path(None, graph_name, format)
-            
-        except Exception as e:
-            raise PersistenceError(f"Failed to resolve path: {e}", 
-                                operation="resolve_path", 
-                                file_path=str(path_hint))
+        return self._create_default_path(path_str, graph_name, format)
     
     def detect_format(self, path: Union[str, Path]) -> Optional[str]:
         """
         Detect file format from path extension and content.
         
+        With ``storage.trust_extension`` enabled (the default) a known
+        extension is returned without opening the file; otherwise the
+        content decides and the extension is only a fallback.
+        
         Args:
             path: File path to analyze
             
@@ -107,24 +254,45 @@ class PathResolver:
         """
         path = Path(path)
         
-        if not path.exists():
-            # Try to detect from extension only for non-existent files
-            return self._detect_format_from_extension(path)
-        
-        try:
-            # First try to detect from extension
+        if self._trust_extension:
             format_from_ext = self._detect_format_from_extension(path)
             if format_from_ext:
-                # Verify with content inspection
-                if self._verify_format_with_content(path, format_from_ext):
-                    return format_from_ext
-            
-            # If extension detection fails, try content inspection
-            return self._detect_format_from_content(path)
-            
-        except Exception as e:
+                return format_from_ext
+        
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            # Non-existent files can only be detected from their extension
+            return self._detect_format_from_extension(path)
+        except OSError as e:
             logger.warning(f"Format detection failed for {path}: {e}")
             return None
+        
+        # Results are reused until the file's mtime or size changes
+        if time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+            return self._detect_existing_format(path)
+        key = (os.fspath(path), st.st_mtime_ns, st.st_size)
+        return self._detect_cache.get_put(key, lambda: self._detect_existing_format(path))
+    
+    def detect_formats(self, paths: Sequence[Union[str, Path]]) -> Dict[Path, Optional[str]]:
+        """
+        Detect the formats of many files at once.
+        
+        Equivalent to calling detect_format on each path; with more than
+        one search worker the files are inspected concurrently.
+        
+        Args:
+            paths: File paths to analyze
+            
+        Returns:
+            Dictionary mapping each path to its detected format or None
+        """
+        paths = [Path(path) for path in paths]
+        if self._search_workers > 1 and len(paths) > 1:
+            formats = self._get_search_executor().map(self.detect_format, paths)
+        else:
+            formats = map(self.detect_format, paths)
+        return dict(zip(paths, formats))
     
     def ensure_directory(self, path: Union[str, Path]) -> Path:
         """
@@ -150,7 +318,7 @@ class PathResolver:
             directory.mkdir(parents=True, exist_ok=True)
             return path
             
-        except Exception as e:
+        except OSError as e:
             raise PersistenceError(f"Failed to create directory for {path}: {e}",
                                 operation="ensure_directory",
                                 file_path=str(path))
@@ -166,29 +334,63 @@ class PathResolver:
         Returns:
             Path to found graph file or None if not found
         """
+        return next(self._iter_matches(name, search_paths), None)
+    
+    def _iter_matches(self, name: str, search_paths: Optional[List[Path]] = None) -> Iterator[Path]:
+        """
+        Yield every graph file matching a name, best match first.
+        
+        Args:
+            name: Graph name to search for
+            search_paths: List of paths to search in (uses defaults if None)
+            
+        Yields:
+            Paths of matching files in priority order
+        """
         search_paths = search_paths or self._default_search_paths
         
-        # Try different format combinations
-        for format in self._supported_formats:
-            for search_path in search_paths:
-                # Try with format extension
-                file_path = search_path / f"{name}.{format}"
-                if file_path.exists():
-                    return file_path
-                
-                # Try with common variations
-                variations = [
-                    f"{name}.graph.{format}",
-                    f"{name}_graph.{format}",
-                    f"{name}-graph.{format}",
-                ]
-                
-                for variation in variations:
-                    file_path = search_path / variation
-                    if file_path.exists():
-                        return file_path
+        # List each directory once (cached by mtime), then match in memory
+        listings = self._list_search_paths(search_paths)
         
-        return None
+        # Try different format combinations: exact name, then common variations
+        for suffixes in self._candidate_suffixes:
+            candidates = [name + suffix for suffix in suffixes]
+            for search_path, entries in listings:
+                for candidate in candidates:
+                    entry = entries.get(candidate)
+                    if entry is not None and entry.is_file():
+                        yield Path(entry.path)
+    
+    def _list_search_paths(self, search_paths: List[Path]) -> List[Tuple[Path, Dict[str, os.DirEntry]]]:
+        """
+        Get the entries of each existing, non-empty search directory.
+        
+        With more than one search worker the directories are listed
+        concurrently, so the latency is that of the slowest mount rather
+        than the sum. Results keep the order of ``search_paths``.
+        
+        Args:
+            search_paths: Directories to list
+            
+        Returns:
+            List of (search path, entries) pairs
+        """
+        path_strs = [os.fspath(search_path) for search_path in search_paths]
+        if self._search_workers > 1 and len(path_strs) > 1:
+            all_entries = self._get_search_executor().map(_directory_entries, path_strs)
+        else:
+            all_entries = map(_directory_entries, path_strs)
+        
+        return [(search_path, entries)
+                for search_path, entries in zip(search_paths, all_entries) if entries]
+    
+    def _get_search_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool for concurrent I/O, creating it on first use."""
+        if self._search_executor is None:
+            self._search_executor = ThreadPoolExecutor(
+                max_workers=self._search_workers,
+                thread_name_prefix="fastgraph-search")
+        return self._search_executor
     
     def get_default_path(self, graph_name: str, format: Optional[str] = None) -> Path:
         """
@@ -201,155 +403,123 @@ class PathResolver:
         Returns:
             Default Path object for graph storage
         """
-        format = format or self.config.get("storage", {}).get("default_format", "msgpack")
-        default_dir = Path(self.config.get("storage", {}).get("data_dir", "~/.cache/fastgraph/data"))
-        default_dir = default_dir.expanduser()
-        
-        return default_dir / f"{graph_name}.{format}"
+        format = format or self._default_format
+        return Path(os.path.join(self._default_dir_str, f"{graph_name}.{format}"))
     
     def _get_default_search_paths(self) -> List[Path]:
         """Get default search paths for graph files."""
-        paths = []
-        
-        # Add configured data directory
-        data_dir = self.config.get("storage", {}).get("data_dir", "~/.cache/fastgraph/data")
-        paths.append(Path(data_dir).expanduser())
-        
-        # Add current working directory
-        paths.append(Path.cwd())
-        
-        # Add user home directory
-        paths.append(Path.home() / ".fastgraph")
-        
-        # Add common locations
-        common_locations = [
-            Path.home() / ".cache" / "fastgraph",
-            Path.home() / ".local" / "share" / "fastgraph",
-        ]
-        paths.extend(common_locations)
-        
-        return [p for p in paths if p.exists() or p.parent.exists()]
+        # Configured data directory, current working directory, user home
+        # directory, then common locations
+        paths = _existing_search_paths(_HOME_STR, self._cwd_str, self._default_dir_str)
+        return [Path(p) for p in paths]
     
-    def _resolve_relative_path(self, path: Path, graph_name: Optional[str], 
+    def _resolve_relative_path(self, path: str, graph_name: Optional[str], 
                               format: Optional[str]) -> Optional[Path]:
         """Resolve relative path against search locations."""
         # Try against each search path
         for search_path in self._default_search_paths:
-            resolved = search_path / path
-            if resolved.exists() or resolved.parent.exists():
-                return self._ensure_format_extension(resolved, format)
+            resolved = os.path.join(search_path, path)
+            if os.path.lexists(resolved) or os.path.lexists(os.path.dirname(resolved)):
+                return Path(self._with_format_extension(resolved, format))
         
         return None
     
     def _create_default_path(self, filename: Optional[str], graph_name: Optional[str], 
                            format: Optional[str]) -> Path:
         """Create default path for graph storage."""
+        # Clean filename: keep the last component and remove any extension
+        if filename:
+            filename = self._file_stem(filename)
         if not filename:
-            filename = graph_name or "graph"
-        
-        # Clean filename
-        filename = Path(filename).stem  # Remove any extension
+            filename = self._file_stem(graph_name or "graph")
         
-        format = format or self.config.get("storage", {}).get("default_format", "msgpack")
-        default_dir = Path(self.config.get("storage", {}).get("data_dir", "~/.cache/fastgraph/data"))
-        default_dir = default_dir.expanduser()
-        
-        return default_dir / f"{filename}.{format}"
+        format = format or self._default_format
+        return Path(os.path.join(self._default_dir_str, f"{filename}.{format}"))
     
     def _ensure_format_extension(self, path: Path, format: Optional[str]) -> Path:
         """Ensure path has correct format extension."""
-        if not format:
+        path_str = os.fspath(path)
+        fixed = self._with_format_extension(path_str, format)
+        if fixed is path_str and isinstance(path, Path):
+            # Already correct: no new Path to build
             return path
-        
-        # Remove existing extension if it doesn't match format
-        if path.suffix and path.suffix.lower() != f".{format.lower()}":
-            path = path.with_suffix("")
-        
-        # Add correct extension
-        if path.suffix != f".{format}":
-            path = path.with_suffix(f".{format}")
-        
-        return path
+        return Path(fixed)
+    
+    @staticmethod
+    def _with_format_extension(path_str: str, format: Optional[str]) -> str:
+        """Replace or add the extension of a path string to match format."""
+        if not format:
+            return path_str
+        root, ext = os.path.splitext(path_str)
+        extension = "." + format
+        if ext == extension:
+            return path_str
+        return root + extension
+    
+    @staticmethod
+    def _file_stem(path_str: str) -> str:
+        """Return the last path component without its extension."""
+        return os.path.splitext(os.path.basename(path_str.rstrip("/" + os.sep)))[0]
     
     def _detect_format_from_extension(self, path: Path) -> Optional[str]:
         """Detect format from file extension."""
-        extension = path.suffix.lower()
-        
-        format_map = {
-            ".json": "json",
-            ".msgpack": "msgpack", 
-            ".mp": "msgpack",
-            ".pickle": "pickle",
-            ".pkl": "pickle",
-        }
-        
-        return format_map.get(extension)
+        return self._EXT_TO_FORMAT.get(path.suffix.lower())
     
-    def _detect_format_from_content(self, path: Path) -> Optional[str]:
-        """Detect format by inspecting file content."""
-        try:
-            with open(path, "rb") as f:
-                # Read first few bytes for signature detection
-                header = f.read(16)
-                
-                # Check for gzip compression
-                if header.startswith(b'\x1f\x8b'):
-                    # File is compressed, try to read first bytes after decompression
-                    f.seek(0)
-                    with gzip.open(f, 'rb') as gz_file:
-                        header = gz_file.read(16)
-                
-                # Check against format signatures
-                for format, signatures in self._format_signatures.items():
-                    for signature in signatures:
-                        if header.startswith(signature):
-                            return format
-                
-                # Additional content-based checks
-                if self._is_json_content(header):
-                    return "json"
-                elif self._is_pickle_content(header):
-                    return "pickle"
-                elif self._is_msgpack_content(header):
-                    return "msgpack"
-        
-        except Exception as e:
-            logger.warning(f"Content inspection failed for {path}: {e}")
+    def _detect_existing_format(self, path: Path) -> Optional[str]:
+        """Detect the format of an existing file from its content and extension."""
+        format_from_ext = self._detect_format_from_extension(path)
         
-        return None
-    
-    def _verify_format_with_content(self, path: Path, expected_format: str) -> bool:
-        """Verify detected format matches content."""
         try:
-            actual_format = self._detect_format_from_content(path)
-            return actual_format == expected_format
-        except Exception:
-            return False
+            header = self._read_header(path)
+        except FileNotFoundError:
+            # Removed since it was stat-ed
+            return format_from_ext
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Format detection failed for {path}: {e}")
+            return None
+        
+        # Content wins when recognized; the extension covers formats without
+        # a reliable signature such as msgpack
+        return self._classify_header(header) or format_from_ext
     
-    def _is_json_content(self, header: bytes) -> bool:
-        """Check if content appears to be JSON."""
-        try:
-            # JSON should start with { or [
-            return header.startswith(b'{') or header.startswith(b'[')
-        except Exception:
-            return False
+    def _read_header(self, path: Path) -> bytes:
+        """Read the first bytes of a file, looking inside gzip compression."""
+        with open(path, "rb") as f:
+            # Read first few bytes for signature detection
+            header = f.read(16)
+            
+            # Check for gzip compression
+            if header.startswith(b'\x1f\x8b'):
+                # File is compressed: inflate just enough of the member's
+                # start to produce the first bytes of the content
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                header = inflater.decompress(header + f.read(_GZIP_PEEK_BYTES), 16)
+        
+        return header
     
-    def _is_pickle_content(self, header: bytes) -> bool:
-        """Check if content appears to be pickle."""
-        try:
-            # Pickle protocol markers
-            return header.startswith(b'\x80') or header.startswith(b'\x00')
-        except Exception:
-            return False
+    def _classify_header(self, header: bytes) -> Optional[str]:
+        """Detect format from the first bytes of a file's content."""
+        # Check against format signatures
+        format = self._SIG_BY_BYTE.get(header[:1])
+        if format:
+            return format
+        
+        # msgpack has no fixed signature, so try to decode it
+        if self._is_msgpack_content(header):
+            return "msgpack"
+        
+        return None
     
     def _is_msgpack_content(self, bytes_data: bytes) -> bool:
         """Check if content appears to be msgpack."""
+        if _msgpack_unpackb is None:
+            return False
         try:
-            import msgpack
             # Try to unpack first few bytes as msgpack
-            msgpack.unpackb(bytes_data[:min(16, len(bytes_data))], raw=False)
+            _msgpack_unpackb(bytes_data[:16], raw=False)
             return True
-        except Exception:
+        except ValueError:
+            # All msgpack decode errors, including bad UTF-8, are ValueErrors
             return False
     
     def get_supported_formats(self) -> List[str]:
@@ -5,31 +5,90 @@ This module provides performance monitoring, profiling, and
 benchmarking capabilities for FastGraph operations.
 """
 
+import io
+import csv
+import heapq
+import inspect
+import sys
+import json
+import math
 import time
 import contextlib
+import itertools
 import threading
-import statistics
-from typing import Any, Dict, List, Optional, Callable, Union
-from functools import wraps
-from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from typing import Any, Dict, Iterator, List, Optional, Callable, TextIO, Tuple, Union
+from functools import partial, wraps
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
 
 from ..exceptions import FastGraphError
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
 
-@dataclass
+# The metric hot paths rely on the GIL: next() on a counter, dict item
+# assignment and dict.pop are each atomic, so recording takes no lock.
+# Shard locks only guard creating the metrics of a new operation and
+# taking consistent snapshots of a shard's operation table.
+
+# Timing uses the monotonic perf_counter_ns clock; adding this offset turns
+# a counter reading into an approximate wall-clock time in nanoseconds
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+# Bound once so recording skips the threading attribute lookup. Caching the
+# ident in a threading.local costs more than calling this C function.
+_get_ident = threading.get_ident
+
+# Whether the global monitor is enabled. The decorators and
+# performance_context test this flag before touching the monitor, so
+# disabled instrumentation costs one global lookup per call.
+_MONITORING_ENABLED = True
+
+# dataclass(slots=True) needs Python 3.10; older versions keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class PerformanceMetric:
-    """Single performance metric."""
+    """
+    Single performance metric.
+    
+    Durations and timestamps are stored as integer nanoseconds; the
+    ``duration`` and ``timestamp`` properties give them in seconds.
+    ``metadata`` is None when the metric carries none. PerformanceMonitor
+    keeps metrics in columnar ring buffers and builds these objects only
+    when metrics are read back. Instances are immutable, though the
+    metadata dict itself is not copied.
+    """
     operation: str
-    duration: float
-    timestamp: float
+    duration_ns: int
+    timestamp_ns: int
     thread_id: int
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
+    
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return self.duration_ns / 1e9
+    
+    @property
+    def timestamp(self) -> float:
+        """Wall-clock start time in seconds since the epoch."""
+        return self.timestamp_ns / 1e9
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class PerformanceStats:
-    """Performance statistics summary."""
+    """
+    Performance statistics summary; all durations are in seconds.
+    
+    Every figure covers all metrics recorded since the operation was last
+    cleared. The median and percentiles come from a log-bucketed histogram
+    and are accurate to within about 6%.
+    """
     operation: str
     count: int
     total_duration: float
@@ -39,6 +98,309 @@ class PerformanceStats:
     median_duration: float
     std_deviation: float
     last_duration: float
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+
+
+# Duration histogram: values below 2**_SUB_BUCKET_BITS ns get a bucket each,
+# every larger power of two is split into 2**_SUB_BUCKET_BITS linear buckets
+# (worst-case relative error 1/16). Durations of 2**(_MAX_BUCKET_EXPONENT + 1)
+# ns (about 37 minutes) and longer share the last bucket.
+_SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_MAX_BUCKET_EXPONENT = 40
+
+
+def _bucket_index(duration_ns: int) -> int:
+    """Histogram bucket of a duration in nanoseconds."""
+    if duration_ns < _SUB_BUCKETS:
+        return duration_ns if duration_ns > 0 else 0
+    shift = duration_ns.bit_length() - 1 - _SUB_BUCKET_BITS
+    if shift > _MAX_BUCKET_EXPONENT - _SUB_BUCKET_BITS:
+        return (_MAX_BUCKET_EXPONENT - _SUB_BUCKET_BITS + 2) * _SUB_BUCKETS - 1
+    return (shift + 1) * _SUB_BUCKETS + ((duration_ns >> shift) & (_SUB_BUCKETS - 1))
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint, in nanoseconds, of a histogram bucket."""
+    if index < _SUB_BUCKETS:
+        return float(index)
+    shift = index // _SUB_BUCKETS - 1
+    lower = (_SUB_BUCKETS + index % _SUB_BUCKETS) << shift
+    return lower + (1 << shift) / 2
+
+
+class _RunningStat:
+    """
+    Incremental count, sum, extrema, variance (Welford) and histogram of
+    durations.
+    """
+    
+    __slots__ = ("count", "sum_ns", "min_ns", "max_ns", "mean", "m2", "buckets")
+    
+    def __init__(self):
+        self.count = 0
+        self.sum_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # Sparse histogram: bucket index -> count
+        self.buckets: Dict[int, int] = {}
+    
+    def add(self, duration_ns: int) -> None:
+        """Add one duration."""
+        count = self.count + 1
+        if count == 1 or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.sum_ns += duration_ns
+        delta = duration_ns - self.mean
+        self.mean += delta / count
+        self.m2 += delta * (duration_ns - self.mean)
+        index = _bucket_index(duration_ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count = count
+    
+    @classmethod
+    def combine(cls, stats: List["_RunningStat"]) -> "_RunningStat":
+        """Merge partial statistics (Chan et al. parallel variance)."""
+        total = cls()
+        for stat in stats:
+            if not stat.count:
+                continue
+            count = total.count + stat.count
+            delta = stat.mean - total.mean
+            total.m2 += stat.m2 + delta * delta * total.count * stat.count / count
+            total.mean += delta * stat.count / count
+            total.min_ns = stat.min_ns if not total.count else min(total.min_ns, stat.min_ns)
+            total.max_ns = max(total.max_ns, stat.max_ns)
+            total.sum_ns += stat.sum_ns
+            total.count = count
+            for index, bucket_count in list(stat.buckets.items()):
+                total.buckets[index] = total.buckets.get(index, 0) + bucket_count
+        return total
+    
+    def quantiles(self, *qs: float) -> List[float]:
+        """
+        Estimate quantiles from the histogram.
+        
+        Args:
+            *qs: Quantiles in ascending order, each in [0, 1]
+            
+        Returns:
+            Nearest-rank estimate in nanoseconds for each quantile, clamped
+            to the observed minimum and maximum
+        """
+        results = []
+        if not self.count:
+            return [0.0] * len(qs)
+        
+        buckets = sorted(self.buckets.items())
+        position = 0
+        seen = buckets[0][1]
+        for q in qs:
+            rank = max(1, math.ceil(q * self.count))
+            while seen < rank and position + 1 < len(buckets):
+                position += 1
+                seen += buckets[position][1]
+            value = _bucket_value(buckets[position][0])
+            results.append(min(max(value, self.min_ns), self.max_ns))
+        return results
+
+
+class _RingBuffer:
+    """
+    Fixed-capacity ring of metrics stored column-wise.
+    
+    Durations, timestamps and thread IDs live in primitive arrays and
+    metadata dicts (usually None) in a list. The columns start small and
+    double until they reach the capacity, so rarely seen operations stay
+    cheap; after that appending allocates nothing. Writers claim slots from
+    an atomic counter and never share one; while the columns are still
+    growing, writes take a lock so none is lost to a resize. A reader may
+    see a row that is still being written.
+    """
+    
+    INITIAL_ROWS = 16
+    
+    __slots__ = ("capacity", "_columns", "size", "_slots", "_grow_lock")
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._columns = self._allocate(min(capacity, self.INITIAL_ROWS))
+        # Number of rows appended since the last clear
+        self.size = 0
+        self._slots = itertools.count()
+        self._grow_lock = threading.Lock()
+    
+    @staticmethod
+    def _allocate(rows: int) -> Tuple[array, array, array, list]:
+        """Create zeroed (durations, timestamps, thread IDs, metadata) columns."""
+        return (array("q", bytes(8 * rows)), array("q", bytes(8 * rows)),
+                array("Q", bytes(8 * rows)), [None] * rows)
+    
+    def append(self, duration_ns: int, timestamp_ns: int, thread_id: int,
+               metadata: Optional[Dict[str, Any]]) -> None:
+        """Write a row, overwriting the oldest once the buffer is full."""
+        slot = next(self._slots)
+        index = slot % self.capacity
+        durations, timestamps, thread_ids, metadata_column = self._columns
+        if len(durations) < self.capacity:
+            self._append_growing(index, duration_ns, timestamp_ns, thread_id, metadata)
+        else:
+            durations[index] = duration_ns
+            timestamps[index] = timestamp_ns
+            thread_ids[index] = thread_id
+            metadata_column[index] = metadata
+        if slot >= self.size:
+            self.size = slot + 1
+    
+    def _append_growing(self, index: int, duration_ns: int, timestamp_ns: int,
+                        thread_id: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Write a row under the lock, doubling the columns to fit ``index``."""
+        with self._grow_lock:
+            columns = self._columns
+            rows = len(columns[0])
+            if index >= rows:
+                while index >= rows:
+                    rows = min(rows * 2, self.capacity)
+                grown = self._allocate(rows - len(columns[0]))
+                columns = self._columns = tuple(
+                    column + extra for column, extra in zip(columns, grown))
+            durations, timestamps, thread_ids, metadata_column = columns
+            durations[index] = duration_ns
+            timestamps[index] = timestamp_ns
+            thread_ids[index] = thread_id
+            metadata_column[index] = metadata
+    
+    def __len__(self) -> int:
+        return min(self.size, self.capacity)
+    
+    def columns(self, count: Optional[int] = None) -> Tuple[array, array, array, list]:
+        """
+        Copy the newest rows, oldest first.
+        
+        Args:
+            count: Maximum number of rows, or None for all retained rows
+            
+        Returns:
+            Tuple of (durations, timestamps, thread IDs, metadata)
+        """
+        columns = self._columns
+        end = self.size
+        n = min(end, self.capacity)
+        if count is not None:
+            n = min(n, max(count, 0))
+        start = (end - n) % self.capacity if self.capacity else 0
+        
+        if start + n <= self.capacity:
+            return tuple(column[start:start + n] for column in columns)
+        wrapped = start + n - self.capacity
+        return tuple(column[start:] + column[:wrapped] for column in columns)
+    
+    def clear(self) -> None:
+        """Drop every row."""
+        self._slots = itertools.count()
+        self.size = 0
+        metadata = self._columns[3]
+        metadata[:] = [None] * len(metadata)
+
+
+class _OperationMetrics:
+    """Retained metrics and running statistics of one operation."""
+    
+    __slots__ = ("ring", "stats", "last_ns")
+    
+    def __init__(self, max_metrics: int):
+        # A zero max_metrics keeps no raw metrics, only the statistics
+        self.ring = _RingBuffer(max_metrics) if max_metrics > 0 else None
+        self.last_ns = 0
+        # Running statistics per recording thread, so each is only ever
+        # updated by one thread without a lock; merged when read
+        self.stats: Dict[int, _RunningStat] = {}
+    
+    def add(self, duration_ns: int, timestamp_ns: int, thread_id: int,
+            metadata: Optional[Dict[str, Any]]) -> None:
+        """Retain a metric and fold it into the running statistics."""
+        if self.ring is not None:
+            self.ring.append(duration_ns, timestamp_ns, thread_id, metadata)
+        self.last_ns = duration_ns
+        stat = self.stats.get(thread_id)
+        if stat is None:
+            stat = self.stats[thread_id] = _RunningStat()
+        stat.add(duration_ns)
+    
+    def export_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the retained metrics as export dicts, oldest first.
+        
+        Rows are built straight from the ring buffer columns; metadata
+        dicts are referenced, not copied.
+        """
+        if self.ring is None:
+            return
+        durations, timestamps, thread_ids, metadata = self.ring.columns()
+        for i in range(len(durations)):
+            yield {
+                "duration": durations[i] / 1e9,
+                "timestamp": timestamps[i] / 1e9,
+                "thread_id": thread_ids[i],
+                "metadata": metadata[i] or {}
+            }
+    
+    def metrics(self, operation: str, count: Optional[int] = None,
+                min_duration_ns: int = -1) -> List["PerformanceMetric"]:
+        """
+        Build PerformanceMetric views of the retained metrics.
+        
+        Args:
+            operation: Operation name to put in the views
+            count: Only consider the newest ``count`` metrics
+            min_duration_ns: Only include metrics slower than this
+            
+        Returns:
+            Metrics, oldest first
+        """
+        if self.ring is None:
+            return []
+        durations, timestamps, thread_ids, metadata = self.ring.columns(count)
+        if min_duration_ns < 0:
+            rows = range(len(durations))
+        elif np is not None:
+            # Compare the whole duration column in one vectorized pass
+            rows = np.flatnonzero(np.frombuffer(durations, dtype=np.int64) > min_duration_ns).tolist()
+        else:
+            rows = [i for i, duration_ns in enumerate(durations) if duration_ns > min_duration_ns]
+        return [
+            PerformanceMetric(operation, durations[i], timestamps[i], thread_ids[i], metadata[i])
+            for i in rows
+        ]
+    
+    def summary(self) -> _RunningStat:
+        """Running statistics over all recording threads."""
+        return _RunningStat.combine(list(self.stats.values()))
+    
+    def clear(self) -> None:
+        """Drop retained metrics and statistics."""
+        if self.ring is not None:
+            self.ring.clear()
+        self.stats.clear()
+        self.last_ns = 0
+
+
+class _MetricShard:
+    """One lock stripe of a PerformanceMonitor's metrics and in-flight operations."""
+    
+    __slots__ = ("lock", "metrics", "operations")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _OperationMetrics] = {}
+        # Operation ID -> (start_ns, operation, metadata), oldest first
+        self.operations: "OrderedDict[int, Tuple[int, str, Optional[Dict[str, Any]]]]" = OrderedDict()
 
 
 class PerformanceMonitor:
@@ -47,36 +409,166 @@ class PerformanceMonitor:
     
     Provides timing, profiling, and statistical analysis of
     graph operations for performance optimization.
+    
+    Metrics are striped over SHARDS shards, by operation name for
+    recorded metrics and by operation ID for in-flight operations. Each
+    shard's lock is taken only when an operation is seen for the first
+    time, a snapshot of its table is needed or its in-flight operations
+    are pruned; recording is lock-free.
     """
     
-    def __init__(self, max_metrics: int = 10000):
+    SHARDS = 16
+    
+    def __init__(self, max_metrics: int = 10000, keep_raw: bool = True,
+                 max_in_flight: int = 10000, in_flight_ttl: float = 60.0,
+                 batch_size: int = 1):
         """
         Initialize performance monitor.
         
         Args:
-            max_metrics: Maximum number of metrics to store
+            max_metrics: Maximum number of metrics to store per operation
+            keep_raw: Whether to retain individual metrics; statistics are
+                kept either way, but without raw metrics get_recent_metrics,
+                get_slow_operations and export_metrics return nothing
+            max_in_flight: Approximate number of started operations to track
+                before pruning; guards against operations that never end
+            in_flight_ttl: Age in seconds after which a started operation
+                is pruned once the in-flight limit is exceeded
+            batch_size: Number of metrics each thread buffers before adding
+                them to the shared tables; 1 adds every metric immediately.
+                Readers flush all buffers first.
         """
         self.max_metrics = max_metrics
-        self._metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_metrics))
-        self._current_operations: Dict[str, float] = {}
-        self._lock = threading.RLock()
+        self.keep_raw = keep_raw
+        self.max_in_flight = max_in_flight
+        self.in_flight_ttl = in_flight_ttl
+        self._shard_in_flight = max(1, max_in_flight // self.SHARDS)
+        self._in_flight_ttl_ns = int(in_flight_ttl * 1e9)
+        self._shards = [_MetricShard() for _ in range(self.SHARDS)]
+        self._shard_mask = self.SHARDS - 1
+        # Operation IDs; next() on a count is atomic under the GIL
+        self._operation_ids = itertools.count(1)
         self._enabled = True
+        # Bumped whenever the operation tables are dropped, so callers that
+        # cache an _OperationMetrics know to look it up again
+        self._tables_version = 0
+        self._batch_size = max(1, batch_size)
+        # Per-thread pending metrics, registered with their owning thread
+        # so flush() can drain them all, including those of exited threads
+        self._pending = threading.local()
+        self._pending_buffers: List[Tuple[threading.Thread, list]] = []
+        self._pending_lock = threading.Lock()
+    
+    def _shard(self, key: Union[str, int]) -> _MetricShard:
+        """Get the shard owning an operation name or operation ID."""
+        return self._shards[hash(key) & self._shard_mask]
+    
+    def _operation_metrics(self, operation: str) -> _OperationMetrics:
+        """Get the metrics of an operation, creating them on first use."""
+        shard = self._shard(operation)
+        metrics = shard.metrics.get(operation)
+        if metrics is None:
+            with shard.lock:
+                metrics = shard.metrics.get(operation)
+                if metrics is None:
+                    metrics = shard.metrics[operation] = _OperationMetrics(
+                        self.max_metrics if self.keep_raw else 0)
+        return metrics
+    
+    def _prune_operations(self, shard: _MetricShard) -> None:
+        """
+        Drop a shard's stale in-flight operations.
+        
+        Removes, oldest first, operations older than the TTL and then as
+        many more as needed to get back under the shard's limit. Ending a
+        pruned operation returns None.
+        """
+        operations = shard.operations
+        cutoff_ns = time.perf_counter_ns() - self._in_flight_ttl_ns
+        with shard.lock:
+            while operations:
+                try:
+                    operation_id, start_info = next(iter(operations.items()))
+                except (RuntimeError, StopIteration):
+                    # Changed concurrently; the next start prunes again
+                    break
+                if start_info[0] > cutoff_ns and len(operations) <= self._shard_in_flight:
+                    break
+                operations.pop(operation_id, None)
+    
+    def _buffer_metric(self, operation: str, duration_ns: int, timestamp_ns: int,
+                       thread_id: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Queue a metric in the calling thread's buffer, flushing it when full."""
+        buffer = getattr(self._pending, "metrics", None)
+        if buffer is None:
+            buffer = self._pending.metrics = []
+            with self._pending_lock:
+                self._pending_buffers.append((threading.current_thread(), buffer))
+        buffer.append((operation, duration_ns, timestamp_ns, thread_id, metadata))
+        if len(buffer) >= self._batch_size:
+            with self._pending_lock:
+                self._drain(buffer)
+    
+    def _drain(self, buffer: list) -> None:
+        """Add a pending buffer's metrics to the tables; needs _pending_lock."""
+        # Only the owning thread appends, and only at the end, so taking a
+        # prefix and deleting it never loses a concurrent append
+        count = len(buffer)
+        batch = buffer[:count]
+        del buffer[:count]
+        metrics_by_op: Dict[str, _OperationMetrics] = {}
+        for operation, duration_ns, timestamp_ns, thread_id, metadata in batch:
+            metrics = metrics_by_op.get(operation)
+            if metrics is None:
+                metrics = metrics_by_op[operation] = self._operation_metrics(operation)
+            metrics.add(duration_ns, timestamp_ns, thread_id, metadata)
+    
+    def _metric_sink(self, operation: str) -> Callable[[int, int, int, Optional[Dict[str, Any]]], None]:
+        """Get the function that records metrics of an operation."""
+        if self._batch_size > 1:
+            return partial(self._buffer_metric, operation)
+        return self._operation_metrics(operation).add
+    
+    def flush(self) -> None:
+        """Add every thread's buffered metrics to the shared tables."""
+        if self._batch_size == 1:
+            return
+        with self._pending_lock:
+            for _, buffer in self._pending_buffers:
+                self._drain(buffer)
+            self._pending_buffers = [
+                (thread, buffer) for thread, buffer in self._pending_buffers
+                if thread.is_alive()
+            ]
+    
+    def _metric_tables(self) -> List[Tuple[str, _OperationMetrics]]:
+        """Snapshot the (operation, metrics) pairs of every shard."""
+        tables = []
+        for shard in self._shards:
+            with shard.lock:
+                tables.extend(shard.metrics.items())
+        return tables
     
     def enable(self) -> None:
         """Enable performance monitoring."""
-        with self._lock:
-            self._enabled = True
+        self._set_enabled(True)
     
     def disable(self) -> None:
         """Disable performance monitoring."""
-        with self._lock:
-            self._enabled = False
+        self._set_enabled(False)
+    
+    def _set_enabled(self, enabled: bool) -> None:
+        """Set the enabled flag, mirroring it for the global monitor."""
+        global _MONITORING_ENABLED
+        self._enabled = enabled
+        if self is _global_performance_monitor:
+            _MONITORING_ENABLED = enabled
     
     def is_enabled(self) -> bool:
         """Check if monitoring is enabled."""
         return self._enabled
     
-    def start_operation(self, operation: str, **metadata) -> str:
+    def start_operation(self, operation: str, **metadata) -> int:
         """
         Start timing an operation.
         
@@ -85,23 +577,42 @@ class PerformanceMonitor:
             **metadata: Additional metadata
             
         Returns:
-            Operation ID for later tracking
+            Operation ID for later tracking (0 when monitoring is disabled)
         """
         if not self._enabled:
-            return ""
+            return 0
         
-        operation_id = f"{operation}_{threading.get_ident()}_{time.time()}"
+        operation_id = next(self._operation_ids)
+        shard = self._shard(operation_id)
+        shard.operations[operation_id] = (time.perf_counter_ns(), operation, metadata)
+        if len(shard.operations) > self._shard_in_flight:
+            self._prune_operations(shard)
         
-        with self._lock:
-            self._current_operations[operation_id] = {
-                "start_time": time.time(),
-                "operation": operation,
-                "metadata": metadata
-            }
+        return operation_id
+    
+    def start_operation_fast(self, operation: str) -> int:
+        """
+        Start timing an operation that carries no metadata.
+        
+        Same as start_operation without building a keyword-argument dict.
+        
+        Args:
+            operation: Operation name
+            
+        Returns:
+            Operation ID for later tracking (0 when monitoring is disabled)
+        """
+        if not self._enabled:
+            return 0
         
+        operation_id = next(self._operation_ids)
+        shard = self._shard(operation_id)
+        shard.operations[operation_id] = (time.perf_counter_ns(), operation, None)
+        if len(shard.operations) > self._shard_in_flight:
+            self._prune_operations(shard)
         return operation_id
     
-    def end_operation(self, operation_id: str, **metadata) -> Optional[float]:
+    def end_operation(self, operation_id: int, **metadata) -> Optional[float]:
         """
         End timing an operation.
         
@@ -112,32 +623,44 @@ class PerformanceMonitor:
         Returns:
             Operation duration in seconds
         """
+        duration_ns = self._end_operation(operation_id, metadata)
+        return None if duration_ns is None else duration_ns / 1e9
+    
+    def end_operation_fast(self, operation_id: int) -> Optional[int]:
+        """
+        End timing an operation without adding metadata.
+        
+        Args:
+            operation_id: Operation ID from start_operation(_fast)
+            
+        Returns:
+            Operation duration in nanoseconds
+        """
+        return self._end_operation(operation_id, None)
+    
+    def _end_operation(self, operation_id: int, metadata: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Store the metric of a finished operation and return its duration in ns."""
         if not self._enabled or not operation_id:
             return None
         
-        with self._lock:
-            if operation_id not in self._current_operations:
-                return None
-            
-            start_info = self._current_operations.pop(operation_id)
-            duration = time.time() - start_info["start_time"]
-            
-            # Merge metadata
-            merged_metadata = start_info["metadata"].copy()
-            merged_metadata.update(metadata)
-            
-            # Store metric
-            metric = PerformanceMetric(
-                operation=start_info["operation"],
-                duration=duration,
-                timestamp=start_info["start_time"],
-                thread_id=threading.get_ident(),
-                metadata=merged_metadata
-            )
-            
-            self._metrics[metric.operation].append(metric)
-            
-            return duration
+        start_info = self._shard(operation_id).operations.pop(operation_id, None)
+        if start_info is None:
+            return None
+        
+        start_ns, operation, start_metadata = start_info
+        duration_ns = time.perf_counter_ns() - start_ns
+        
+        # Merge metadata; start_operation's kwargs dict is owned by us
+        if metadata:
+            if start_metadata:
+                start_metadata.update(metadata)
+            else:
+                start_metadata = metadata
+        
+        self._metric_sink(operation)(
+            duration_ns, start_ns + _WALL_CLOCK_OFFSET_NS, _get_ident(), start_metadata or None)
+        
+        return duration_ns
     
     def record_metric(self, operation: str, duration: float, **metadata) -> None:
         """
@@ -151,16 +674,24 @@ class PerformanceMonitor:
         if not self._enabled:
             return
         
-        metric = PerformanceMetric(
-            operation=operation,
-            duration=duration,
-            timestamp=time.time(),
-            thread_id=threading.get_ident(),
-            metadata=metadata
-        )
+        self._metric_sink(operation)(
+            round(duration * 1e9), time.perf_counter_ns() + _WALL_CLOCK_OFFSET_NS,
+            _get_ident(), metadata or None)
+    
+    def record_metric_fast(self, operation: str, duration_ns: int) -> None:
+        """
+        Record a metric without metadata from a nanosecond duration.
         
-        with self._lock:
-            self._metrics[operation].append(metric)
+        Args:
+            operation: Operation name
+            duration_ns: Duration in nanoseconds
+        """
+        if not self._enabled:
+            return
+        
+        self._metric_sink(operation)(
+            duration_ns, time.perf_counter_ns() + _WALL_CLOCK_OFFSET_NS,
+            _get_ident(), None)
     
     def get_stats(self, operation: Optional[str] = None) -> Union[PerformanceStats, Dict[str, PerformanceStats]]:
         """
@@ -172,17 +703,18 @@ class PerformanceMonitor:
         Returns:
             PerformanceStats or dict of stats
         """
-        with self._lock:
-            if operation:
-                return self._calculate_stats(operation)
-            else:
-                return {op: self._calculate_stats(op) for op in self._metrics.keys()}
+        self.flush()
+        if operation:
+            return self._calculate_stats(operation)
+        
+        return {op: self._calculate_stats(op) for op, _ in self._metric_tables()}
     
     def _calculate_stats(self, operation: str) -> PerformanceStats:
         """Calculate statistics for an operation."""
-        metrics = list(self._metrics[operation])
+        metrics = self._shard(operation).metrics.get(operation)
+        stat = metrics.summary() if metrics else None
         
-        if not metrics:
+        if not stat or not stat.count:
             return PerformanceStats(
                 operation=operation,
                 count=0, total_duration=0, avg_duration=0,
@@ -190,18 +722,22 @@ class PerformanceMonitor:
                 std_deviation=0, last_duration=0
             )
         
-        durations = [m.duration for m in metrics]
+        p50, p95, p99 = stat.quantiles(0.5, 0.95, 0.99)
         
+        # Integer nanoseconds throughout; converted to seconds once here
         return PerformanceStats(
             operation=operation,
-            count=len(metrics),
-            total_duration=sum(durations),
-            avg_duration=statistics.mean(durations),
-            min_duration=min(durations),
-            max_duration=max(durations),
-            median_duration=statistics.median(durations),
-            std_deviation=statistics.stdev(durations) if len(durations) > 1 else 0,
-            last_duration=durations[-1]
+            count=stat.count,
+            total_duration=stat.sum_ns / 1e9,
+            avg_duration=stat.mean / 1e9,
+            min_duration=stat.min_ns / 1e9,
+            max_duration=stat.max_ns / 1e9,
+            median_duration=p50 / 1e9,
+            std_deviation=math.sqrt(stat.m2 / (stat.count - 1)) / 1e9 if stat.count > 1 else 0,
+            last_duration=metrics.last_ns / 1e9,
+            p50=p50 / 1e9,
+            p95=p95 / 1e9,
+            p99=p99 / 1e9
         )
     
     def get_recent_metrics(self, operation: str, count: int = 100) -> List[PerformanceMetric]:
@@ -215,9 +751,9 @@ class PerformanceMonitor:
         Returns:
             List of recent metrics
         """
-        with self._lock:
-            metrics = list(self._metrics[operation])
-            return metrics[-count:] if metrics else []
+        self.flush()
+        metrics = self._shard(operation).metrics.get(operation)
+        return metrics.metrics(operation, count) if metrics else []
     
     def clear_metrics(self, operation: Optional[str] = None) -> None:
         """
@@ -226,62 +762,103 @@ class PerformanceMonitor:
         Args:
             operation: Specific operation to clear, or None for all
         """
-        with self._lock:
-            if operation:
-                self._metrics[operation].clear()
-            else:
-                self._metrics.clear()
-            self._current_operations.clear()
+        self.flush()
+        if operation:
+            metrics = self._shard(operation).metrics.get(operation)
+            if metrics is not None:
+                metrics.clear()
+        for shard in self._shards:
+            with shard.lock:
+                if not operation:
+                    shard.metrics.clear()
+                shard.operations.clear()
+        if not operation:
+            self._tables_version += 1
     
-    def get_slow_operations(self, threshold: float = 1.0) -> List[PerformanceMetric]:
+    def get_slow_operations(self, threshold: float = 1.0,
+                            limit: Optional[int] = None) -> List[PerformanceMetric]:
         """
         Get operations slower than threshold.
         
         Args:
             threshold: Threshold in seconds
+            limit: Maximum number of operations to return, or None for all
             
         Returns:
-            List of slow operations
+            List of slow operations, slowest first
         """
-        slow_ops = []
+        self.flush()
+        threshold_ns = threshold * 1e9
         
-        with self._lock:
-            for metrics in self._metrics.values():
-                slow_ops.extend([m for m in metrics if m.duration > threshold])
+        # Filter on the duration column before building metric views
+        slow_ops = (
+            metric
+            for op, metrics in self._metric_tables()
+            for metric in metrics.metrics(op, min_duration_ns=threshold_ns)
+        )
         
-        return sorted(slow_ops, key=lambda m: m.duration, reverse=True)
+        if limit is None:
+            return sorted(slow_ops, key=lambda m: m.duration_ns, reverse=True)
+        # Keeps a heap of ``limit`` entries instead of sorting every match
+        return heapq.nlargest(limit, slow_ops, key=lambda m: m.duration_ns)
     
-    def export_metrics(self, format: str = "dict") -> Any:
+    def export_metrics(self, format: str = "dict", output: Optional[TextIO] = None) -> Any:
         """
         Export metrics in various formats.
         
         Args:
             format: Export format (dict, json, csv)
+            output: Text stream to write json or csv output to instead of
+                returning it as a string
             
         Returns:
-            Exported metrics
-        """
-        import json
-        
-        with self._lock:
-            data = {}
-            for op, metrics in self._metrics.items():
-                data[op] = [
-                    {
-                        "duration": m.duration,
-                        "timestamp": m.timestamp,
-                        "thread_id": m.thread_id,
-                        "metadata": m.metadata
-                    }
-                    for m in metrics
-                ]
-        
-        if format == "json":
-            return json.dumps(data, indent=2)
-        elif format == "dict":
-            return data
+            Exported metrics, or None when written to ``output``
+        """
+        self.flush()
+        if format == "dict":
+            return {op: list(metrics.export_rows()) for op, metrics in self._metric_tables()}
+        elif format == "json":
+            if output is not None:
+                self._write_json(output)
+                return None
+            buffer = io.StringIO()
+            self._write_json(buffer)
+            return buffer.getvalue()
+        elif format == "csv":
+            if output is not None:
+                self._write_csv(output)
+                return None
+            buffer = io.StringIO(newline="")
+            self._write_csv(buffer)
+            return buffer.getvalue()
         else:
             raise ValueError(f"Unsupported format: {format}")
+    
+    def _write_csv(self, output: TextIO) -> None:
+        """Stream metrics as CSV rows; metadata is a JSON object or empty."""
+        writer = csv.writer(output)
+        writer.writerow(["operation", "duration", "timestamp", "thread_id", "metadata"])
+        for op, metrics in self._metric_tables():
+            writer.writerows(
+                (op, row["duration"], row["timestamp"], row["thread_id"],
+                 json.dumps(row["metadata"]) if row["metadata"] else "")
+                for row in metrics.export_rows()
+            )
+    
+    def _write_json(self, output: TextIO) -> None:
+        """Stream metrics as a JSON object of per-operation arrays, one metric per line."""
+        output.write("{")
+        separator = "\n"
+        for op, metrics in self._metric_tables():
+            output.write(f"{separator}  {json.dumps(op)}: [")
+            row_separator = "\n    "
+            for row in metrics.export_rows():
+                output.write(row_separator)
+                output.write(json.dumps(row))
+                row_separator = ",\n    "
+            output.write("\n  ]" if row_separator != "\n    " else "]")
+            separator = ",\n"
+        output.write("\n}" if separator != "\n" else "}")
 
 
 # Decorators for performance monitoring
@@ -298,36 +875,149 @@ def performance_monitor(operation: Optional[str] = None, include_args: bool = Fa
     """
     def decorator(func: Callable) -> Callable:
         op_name = operation or f"{func.__module__}.{func.__name__}"
+        # (monitor, tables version, metric sink) from the last call
+        cache: List[Optional[Tuple[PerformanceMonitor, int, Callable]]] = [None]
+        
+        def refresh() -> Tuple[PerformanceMonitor, int, Callable]:
+            """Look up the operation's metric sink on the current global monitor."""
+            monitor = get_global_performance_monitor()
+            cache[0] = (monitor, monitor._tables_version, monitor._metric_sink(op_name))
+            return cache[0]
+        
+        if not include_args:
+            specialized = _specialized_wrapper(func, cache, refresh)
+            if specialized is not None:
+                return wraps(func)(specialized)
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            monitor = get_global_performance_monitor()
+            if not _MONITORING_ENABLED:
+                return func(*args, **kwargs)
             
-            # Start timing
-            operation_id = monitor.start_operation(op_name)
+            # Reuse the operation's metric sink while the global monitor and
+            # its tables are unchanged
+            cached = cache[0]
+            if (cached is None or cached[0] is not _global_performance_monitor
+                    or cached[1] != cached[0]._tables_version):
+                cached = refresh()
+            record = cached[2]
             
+            # The call is timed here rather than through start_operation,
+            # so it never enters the in-flight table
+            start_ns = time.perf_counter_ns()
             try:
                 # Execute function
                 result = func(*args, **kwargs)
-                
-                # End timing
-                metadata = {}
-                if include_args:
-                    metadata["args_count"] = len(args)
-                    metadata["kwargs_count"] = len(kwargs)
-                
-                monitor.end_operation(operation_id, **metadata)
-                return result
-                
             except Exception as e:
-                # End timing with error metadata
-                monitor.end_operation(operation_id, error=str(e))
+                # Record with error metadata
+                record(time.perf_counter_ns() - start_ns, start_ns + _WALL_CLOCK_OFFSET_NS,
+                       _get_ident(), {"error": str(e)})
                 raise
+            
+            record(time.perf_counter_ns() - start_ns, start_ns + _WALL_CLOCK_OFFSET_NS,
+                   _get_ident(),
+                   {"args_count": len(args), "kwargs_count": len(kwargs)} if include_args else None)
+            return result
         
         return wrapper
     return decorator
 
 
+# Body of a performance_monitor wrapper specialized to the wrapped
+# function's signature; mirrors the generic wrapper without include_args
+_SPECIALIZED_WRAPPER_TEMPLATE = """\
+def _factory(_func, _cache, _refresh{factory_params}):
+    def wrapper({params}):
+        if not _MONITORING_ENABLED:
+            return _func({call})
+        _cached = _cache[0]
+        if (_cached is None or _cached[0] is not _global_performance_monitor
+                or _cached[1] != _cached[0]._tables_version):
+            _cached = _refresh()
+        _record = _cached[2]
+        _start_ns = time.perf_counter_ns()
+        try:
+            _result = _func({call})
+        except Exception as _error:
+            _record(time.perf_counter_ns() - _start_ns, _start_ns + _WALL_CLOCK_OFFSET_NS,
+                    _get_ident(), {{"error": str(_error)}})
+            raise
+        _record(time.perf_counter_ns() - _start_ns, _start_ns + _WALL_CLOCK_OFFSET_NS,
+                _get_ident(), None)
+        return _result
+    return wrapper
+"""
+
+# Names the generated code uses; parameters with these names are not specialized
+_SPECIALIZED_RESERVED = frozenset({
+    "_func", "_cache", "_refresh", "_cached", "_record", "_start_ns", "_result", "_error",
+    "time", "str", "Exception", "_MONITORING_ENABLED", "_global_performance_monitor",
+    "_WALL_CLOCK_OFFSET_NS", "_get_ident",
+})
+
+
+def _specialized_wrapper(func: Callable, cache: list, refresh: Callable) -> Optional[Callable]:
+    """
+    Generate a performance_monitor wrapper with the same signature as ``func``.
+    
+    Calling ``func`` with its own parameters avoids packing and unpacking
+    ``*args, **kwargs`` on every call. Defaults are passed into the
+    generated code as the same objects, so omitted arguments behave as
+    before.
+    
+    Args:
+        func: Function to wrap
+        cache: Metric sink cache shared with the generic wrapper
+        refresh: Function that refills ``cache``
+        
+    Returns:
+        Wrapper function, or None when the signature has *args, **kwargs
+        or cannot be inspected
+    """
+    try:
+        # The function's own parameters, not those of a function it wraps:
+        # a wraps() decorator may take different arguments than it forwards
+        signature = inspect.signature(func, follow_wrapped=False)
+    except (TypeError, ValueError):
+        return None
+    
+    params, call, defaults = [], [], []
+    kinds = inspect.Parameter
+    positional_only = keyword_only = False
+    for parameter in signature.parameters.values():
+        name = parameter.name
+        if (parameter.kind in (kinds.VAR_POSITIONAL, kinds.VAR_KEYWORD)
+                or name in _SPECIALIZED_RESERVED or name.startswith("_default")):
+            return None
+        if parameter.kind is kinds.POSITIONAL_ONLY:
+            positional_only = True
+        elif positional_only:
+            positional_only = False
+            params.append("/")
+        if parameter.kind is kinds.KEYWORD_ONLY and not keyword_only:
+            keyword_only = True
+            params.append("*")
+        
+        if parameter.default is kinds.empty:
+            params.append(name)
+        else:
+            params.append(f"{name}=_default{len(defaults)}")
+            defaults.append(parameter.default)
+        call.append(f"{name}={name}" if keyword_only else name)
+    if positional_only:
+        params.append("/")
+    
+    source = _SPECIALIZED_WRAPPER_TEMPLATE.format(
+        factory_params="".join(f", _default{i}" for i in range(len(defaults))),
+        params=", ".join(params),
+        call=", ".join(call),
+    )
+    namespace: Dict[str, Any] = {}
+    # Module globals keep the enabled flag and global monitor lookups live
+    exec(source, globals(), namespace)
+    return namespace["_factory"](func, cache, refresh, *defaults)
+
+
 def timed(operation: Optional[str] = None):
     """
     Simple timing decorator.
@@ -343,14 +1033,16 @@ def timed(operation: Optional[str] = None):
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            if not _MONITORING_ENABLED:
+                return func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
             try:
                 result = func(*args, **kwargs)
                 return result
             finally:
-                duration = time.time() - start_time
+                duration_ns = time.perf_counter_ns() - start_ns
                 monitor = get_global_performance_monitor()
-                monitor.record_metric(op_name, duration)
+                monitor.record_metric_fast(op_name, duration_ns)
         
         return wrapper
     return decorator
@@ -365,62 +1057,126 @@ def performance_context(operation: str, **metadata):
         operation: Operation name
         **metadata: Additional metadata
     """
+    if not _MONITORING_ENABLED:
+        yield
+        return
+    
     monitor = get_global_performance_monitor()
-    operation_id = monitor.start_operation(operation, **metadata)
+    if metadata:
+        operation_id = monitor.start_operation(operation, **metadata)
+    else:
+        operation_id = monitor.start_operation_fast(operation)
     
     try:
         yield
     finally:
-        monitor.end_operation(operation_id)
+        monitor.end_operation_fast(operation_id)
 
 
 class BenchmarkRunner:
     """Utility for running performance benchmarks."""
     
+    # With automatic inner loops, each sample runs at least this long so the
+    # clock's resolution and call overhead (tens of ns) are negligible
+    MIN_SAMPLE_NS = 20_000
+    MAX_INNER_LOOPS = 1 << 20
+    
     def __init__(self):
         """Initialize benchmark runner."""
         self.results: List[Dict[str, Any]] = []
     
     def run_benchmark(self, func: Callable, iterations: int = 100, 
-                     warmup_iterations: int = 10, **func_kwargs) -> Dict[str, Any]:
+                     warmup_iterations: int = 10, inner_loops: Optional[int] = 1,
+                     timer: Callable[[], int] = time.perf_counter_ns,
+                     **func_kwargs) -> Dict[str, Any]:
         """
         Run a benchmark function.
         
         Args:
             func: Function to benchmark
-            iterations: Number of iterations
+            iterations: Number of timed samples
             warmup_iterations: Number of warmup iterations
+            inner_loops: Calls per sample; the sample time is divided by
+                this, which amortizes clock overhead for very fast functions.
+                None picks the smallest power of two whose sample takes at
+                least MIN_SAMPLE_NS.
+            timer: Monotonic clock returning integer nanoseconds
             **func_kwargs: Function arguments
             
         Returns:
-            Benchmark results
+            Benchmark results, with times in seconds per call
         """
         # Warmup
         for _ in range(warmup_iterations):
             func(**func_kwargs)
         
-        # Benchmark
-        durations = []
-        for _ in range(iterations):
-            start_time = time.time()
-            func(**func_kwargs)
-            durations.append(time.time() - start_time)
+        if inner_loops is None:
+            inner_loops = self._calibrate_inner_loops(func, timer, func_kwargs)
+        
+        # Benchmark into a preallocated int64 buffer of nanosecond samples
+        if np is not None:
+            samples = np.empty(iterations, dtype=np.int64)
+        else:
+            samples = array("q", bytes(8 * iterations))
+        loops = range(inner_loops)
+        for i in range(iterations):
+            start_ns = timer()
+            for _ in loops:
+                func(**func_kwargs)
+            samples[i] = timer() - start_ns
+        
+        # Per-call seconds
+        scale = 1e9 * inner_loops
+        if np is not None:
+            total_ns = int(samples.sum())
+            mean_ns = float(samples.mean())
+            min_ns, max_ns = int(samples.min()), int(samples.max())
+            median_ns = float(np.median(samples))
+            std_ns = float(samples.std(ddof=1)) if iterations > 1 else 0
+        else:
+            # One sort gives the extrema and median, one pass the sums.
+            # Integer sums are exact, so the variance has no cancellation.
+            ordered = sorted(samples)
+            total_ns = squares_ns = 0
+            for sample in ordered:
+                total_ns += sample
+                squares_ns += sample * sample
+            n = iterations
+            mean_ns = total_ns / n
+            min_ns, max_ns = ordered[0], ordered[-1]
+            middle = n // 2
+            median_ns = ordered[middle] if n % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+            std_ns = math.sqrt((n * squares_ns - total_ns * total_ns) / (n * (n - 1))) if n > 1 else 0
         
         results = {
             "function": func.__name__,
             "iterations": iterations,
-            "total_time": sum(durations),
-            "avg_time": statistics.mean(durations),
-            "min_time": min(durations),
-            "max_time": max(durations),
-            "median_time": statistics.median(durations),
-            "std_dev": statistics.stdev(durations) if len(durations) > 1 else 0,
-            "throughput": iterations / sum(durations)
+            "inner_loops": inner_loops,
+            "total_time": total_ns / 1e9,
+            "avg_time": mean_ns / scale,
+            "min_time": min_ns / scale,
+            "max_time": max_ns / scale,
+            "median_time": median_ns / scale,
+            "std_dev": std_ns / scale,
+            "throughput": iterations * inner_loops * 1e9 / total_ns if total_ns else 0.0
         }
         
         self.results.append(results)
         return results
     
+    def _calibrate_inner_loops(self, func: Callable, timer: Callable[[], int],
+                               func_kwargs: Dict[str, Any]) -> int:
+        """Double the calls per sample until a sample reaches MIN_SAMPLE_NS."""
+        loops = 1
+        while loops < self.MAX_INNER_LOOPS:
+            start_ns = timer()
+            for _ in range(loops):
+                func(**func_kwargs)
+            if timer() - start_ns >= self.MIN_SAMPLE_NS:
+                break
+            loops *= 2
+        return loops
+    
     def compare_functions(self, funcs: List[Callable], iterations: int = 100,
                          **func_kwargs) -> Dict[str, Dict[str, Any]]:
         """
@@ -485,8 +1241,9 @@ def set_global_performance_monitor(monitor: PerformanceMonitor) -> None:
     Args:
         monitor: PerformanceMonitor instance
     """
-    global _global_performance_monitor
+    global _global_performance_monitor, _MONITORING_ENABLED
     _global_performance_monitor = monitor
+    _MONITORING_ENABLED = monitor.is_enabled()
 
 
 def profile_memory(operation: Callable, **kwargs) -> Dict[str, Any]:
@@ -508,15 +1265,15 @@ def profile_memory(operation: Callable, **kwargs) -> Dict[str, Any]:
     baseline = memory_utils.memory_snapshot("baseline")
     
     # Run operation
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     result = operation(**kwargs)
-    duration = time.time() - start_time
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
     
     # Take after snapshot
     after = memory_utils.memory_snapshot("after")
     
     # Calculate increase
-    increase = memory_utils.get_memory_increase(0, 1)
+    increase = memory_utils.get_memory_increase(-2, -1)
     
     return {
         "result": result,
@@ -550,10 +1307,10 @@ def performance_report() -> str:
         report_lines.append(f"  Std Dev: {stat.std_deviation:.3f}s")
     
     # Slow operations
-    slow_ops = monitor.get_slow_operations(threshold=0.1)
+    slow_ops = monitor.get_slow_operations(threshold=0.1, limit=10)
     if slow_ops:
         report_lines.append(f"\nSlow Operations (>0.1s):")
-        for op in slow_ops[:10]:  # Top 10
+        for op in slow_ops:  # Top 10
             report_lines.append(f"  {op.operation}: {op.duration:.3f}s")
     
     return "\n".join(report_lines)
\ No newline at end of file
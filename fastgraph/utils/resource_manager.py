@@ -6,19 +6,233 @@ cleanup capabilities for FastGraph instances.
 """
 
 import gc
+import os
+import re
 import time
 import threading
 import weakref
-from typing import Dict, List, Optional, Any, Set
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
 from pathlib import Path
 import logging
 
 from ..types import MemoryStats, PerformanceMetrics
 from ..exceptions import MemoryError, ConcurrencyError
+from .threading import ReadWriteLock
 
 
 logger = logging.getLogger(__name__)
 
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is in the "performance" extra
+    psutil = None
+
+
+def _current_process() -> Optional[Any]:
+    """Create the psutil handle of this process, or None if unavailable."""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(os.getpid())
+    except Exception:
+        return None
+
+
+def _detect_pss(process: Optional[Any]) -> bool:
+    """Check whether memory_full_info reports PSS/USS (Linux only)."""
+    if process is None:
+        return False
+    try:
+        return hasattr(process.memory_full_info(), "pss")
+    except Exception:
+        return False
+
+
+# Shared handle of the current process, so memory readings do not build a
+# new psutil.Process each time; recreated in forked children
+_PROC = _current_process()
+
+# Whether proportional (PSS) and unique (USS) set sizes can be read. Unlike
+# RSS they do not count copy-on-write pages shared with forked workers in
+# full, so they reflect the process's real share of memory.
+_HAS_PSS = _detect_pss(_PROC)
+
+
+def _reset_process() -> None:
+    """Point _PROC at the current process after a fork."""
+    global _PROC, _HAS_PSS
+    _PROC = _current_process()
+    _HAS_PSS = _detect_pss(_PROC)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_process)
+
+
+# Memory limit strings such as "100MB", "1.5 gb" or "1024"
+_LIMIT_RE = re.compile(r"^\s*(\d+(?:\.\d*)?|\.\d+)\s*([KMGT]?B)?\s*$", re.IGNORECASE)
+_UNIT_TABLE = {
+    "B": 1,
+    "KB": 1024,
+    "MB": 1024 ** 2,
+    "GB": 1024 ** 3,
+    "TB": 1024 ** 4,
+}
+
+
+class _GraphTable:
+    """
+    Graph ID -> value map striped over SHARDS dicts, each with its own lock.
+    
+    Operations on one graph lock only that graph's shard; whole-table reads
+    lock each shard briefly in turn. The entry count is kept separately so
+    len() is O(1). Shard locks are reentrant because weakref callbacks may
+    remove entries from inside another table operation.
+    
+    Each shard is kept in least-recently-used order (see touch()), so the
+    oldest entry overall is one of the SHARDS shard heads.
+    """
+    
+    SHARDS = 16
+    
+    __slots__ = ("_shards", "_mask", "_count", "_count_lock")
+    
+    def __init__(self):
+        self._shards: List[Tuple[threading.RLock, "OrderedDict[str, Any]"]] = [
+            (threading.RLock(), OrderedDict()) for _ in range(self.SHARDS)
+        ]
+        self._mask = self.SHARDS - 1
+        self._count = 0
+        self._count_lock = threading.Lock()
+    
+    def _shard(self, key: str) -> Tuple[threading.RLock, "OrderedDict[str, Any]"]:
+        """Get the (lock, dict) shard owning a graph ID."""
+        return self._shards[hash(key) & self._mask]
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._shard(key)[1]
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._shard(key)[1][key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the value of a graph ID, or ``default``."""
+        return self._shard(key)[1].get(key, default)
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.insert(key, value)
+    
+    def insert(self, key: str, value: Any, limit: Optional[int] = None) -> bool:
+        """
+        Add or replace an entry.
+        
+        Args:
+            key: Graph ID
+            value: Value to store
+            limit: Refuse to add a new entry once the table holds this many
+            
+        Returns:
+            False if the entry was refused because of ``limit``
+        """
+        lock, table = self._shard(key)
+        with lock:
+            if key not in table:
+                with self._count_lock:
+                    if limit is not None and self._count >= limit:
+                        return False
+                    self._count += 1
+            table[key] = value
+        return True
+    
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove an entry and return its value, or ``default``."""
+        lock, table = self._shard(key)
+        with lock:
+            if key not in table:
+                return default
+            with self._count_lock:
+                self._count -= 1
+            return table.pop(key)
+    
+    def touch(self, key: str) -> Any:
+        """
+        Mark an entry as most recently used.
+        
+        Args:
+            key: Graph ID
+            
+        Returns:
+            The entry's value, or None if it is not in the table
+        """
+        lock, table = self._shard(key)
+        with lock:
+            value = table.get(key)
+            if value is not None:
+                table.move_to_end(key)
+            return value
+    
+    def oldest(self, key: Any) -> Optional[str]:
+        """
+        Get the least recently used graph ID.
+        
+        Args:
+            key: Function of a value giving its last use time, used to order
+                the shard heads against each other
+            
+        Returns:
+            The graph ID, or None if the table is empty
+        """
+        oldest_key = None
+        oldest_time = None
+        for lock, table in self._shards:
+            with lock:
+                if not table:
+                    continue
+                head = next(iter(table))
+                head_time = key(table[head])
+            if oldest_time is None or head_time < oldest_time:
+                oldest_key, oldest_time = head, head_time
+        return oldest_key
+    
+    def __delitem__(self, key: str) -> None:
+        lock, table = self._shard(key)
+        with lock:
+            if key not in table:
+                raise KeyError(key)
+            self.pop(key)
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        """Snapshot of all (graph ID, value) pairs."""
+        items = []
+        for lock, table in self._shards:
+            with lock:
+                items.extend(table.items())
+        return items
+    
+    def keys(self) -> List[str]:
+        """Snapshot of all graph IDs."""
+        return [key for key, _ in self.items()]
+    
+    def values(self) -> List[Any]:
+        """Snapshot of all values."""
+        return [value for _, value in self.items()]
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        for lock, table in self._shards:
+            with lock:
+                with self._count_lock:
+                    self._count -= len(table)
+                table.clear()
+
 
 class ResourceManager:
     """
@@ -37,10 +251,13 @@ class ResourceManager:
         """
         self.config = config or {}
         
-        # Resource tracking
-        self._active_graphs: Dict[str, Dict[str, Any]] = {}
-        self._graph_references: Dict[str, weakref.ref] = {}
-        self._lock = threading.RLock()
+        # Resource tracking, striped so per-graph operations on different
+        # graphs do not contend
+        self._active_graphs = _GraphTable()
+        self._graph_references = _GraphTable()
+        # Per-graph operations and queries take the read side (the tables
+        # lock their own shards); whole-manager sweeps take the write side
+        self._lock = ReadWriteLock()
         
         # Configuration
         self._max_open_graphs = self.config.get("resource_management", {}).get("max_open_graphs", 10)
@@ -55,6 +272,9 @@ class ResourceManager:
         self._last_cleanup = time.time()
         self._cleanup_thread = None
         self._stop_cleanup = threading.Event()
+        # IDs of garbage collected graphs, logged later by the cleanup thread
+        # since logging from a weakref callback can reenter the import system
+        self._collected_ids: deque = deque(maxlen=1024)
         
         # Start cleanup thread if auto-cleanup is enabled
         if self._auto_cleanup:
@@ -76,33 +296,37 @@ class ResourceManager:
             ConcurrencyError: If graph registration fails
         """
         try:
-            with self._lock:
-                # Generate ID if not provided
-                if not graph_id:
-                    graph_id = f"graph_{len(self._active_graphs)}_{int(time.time())}"
-                
-                # Check if we're at the limit
-                if len(self._active_graphs) >= self._max_open_graphs:
-                    # Try to cleanup first
+            # Generate ID if not provided
+            if not graph_id:
+                graph_id = f"graph_{len(self._active_graphs)}_{int(time.time())}"
+            
+            graph_info = {
+                "created_at": time.time(),
+                "last_accessed": time.time(),
+                "memory_usage": self._estimate_graph_memory(graph),
+                "graph_object": graph,
+            }
+            
+            # Register the graph unless we're at the limit; the limit check
+            # and insert are one atomic step
+            with self._lock.read_lock():
+                registered = self._active_graphs.insert(graph_id, graph_info, self._max_open_graphs)
+            if not registered:
+                # Try to cleanup first
+                with self._lock.write_lock():
                     self._cleanup_dead_references()
-                    if len(self._active_graphs) >= self._max_open_graphs:
+                    if not self._active_graphs.insert(graph_id, graph_info, self._max_open_graphs):
                         raise MemoryError(f"Maximum open graphs limit ({self._max_open_graphs}) reached",
                                        operation="register_graph")
-                
-                # Register the graph
-                self._active_graphs[graph_id] = {
-                    "created_at": time.time(),
-                    "last_accessed": time.time(),
-                    "memory_usage": self._estimate_graph_memory(graph),
-                    "graph_object": graph,
-                }
-                
-                # Store weak reference
-                self._graph_references[graph_id] = weakref.ref(graph, self._graph_deleted_callback)
-                
-                logger.info(f"Registered graph {graph_id}")
-                return graph_id
-                
+            
+            # Store weak reference
+            self._graph_references[graph_id] = weakref.ref(
+                graph, lambda ref, gid=graph_id: self._graph_deleted(gid, ref)
+            )
+            
+            logger.info(f"Registered graph {graph_id}")
+            return graph_id
+            
         except Exception as e:
             if isinstance(e, (MemoryError, ConcurrencyError)):
                 raise
@@ -119,10 +343,9 @@ class ResourceManager:
             ConcurrencyError: If unregistration fails
         """
         try:
-            with self._lock:
-                if graph_id in self._active_graphs:
-                    graph_info = self._active_graphs[graph_id]
-                    
+            with self._lock.read_lock():
+                graph_info = self._active_graphs.get(graph_id)
+                if graph_info is not None:
                     # Perform backup if enabled
                     if self._backup_on_close and hasattr(graph_info["graph_object"], 'backup'):
                         try:
@@ -131,9 +354,8 @@ class ResourceManager:
                             logger.warning(f"Backup failed for graph {graph_id}: {e}")
                     
                     # Remove from tracking
-                    del self._active_graphs[graph_id]
-                    if graph_id in self._graph_references:
-                        del self._graph_references[graph_id]
+                    self._active_graphs.pop(graph_id)
+                    self._graph_references.pop(graph_id)
                     
                     logger.info(f"Unregistered graph {graph_id}")
                 else:
@@ -154,48 +376,32 @@ class ResourceManager:
             MemoryError: If cleanup fails
         """
         try:
-            with self._lock:
-                if graph_id:
+            if graph_id:
+                with self._lock.read_lock():
                     self._cleanup_graph_resources(graph_id)
-                else:
+            else:
+                with self._lock.write_lock():
                     self._cleanup_all_resources()
                     
         except Exception as e:
             raise MemoryError(f"Resource cleanup failed: {e}", operation="cleanup_resources")
     
-    def get_memory_usage(self) -> MemoryStats:
+    def get_memory_usage(self, detailed: bool = False) -> MemoryStats:
         """
         Get current memory usage statistics.
         
+        Args:
+            detailed: Also report the process PSS and USS where the platform
+                supports it (Linux). Reading them parses the process's
+                memory maps and costs around a millisecond, so it is off by
+                default; process_memory_mb is the PSS when reported and the
+                RSS otherwise.
+        
         Returns:
             Dictionary with memory usage information
         """
-        try:
-            import psutil
-            process = psutil.Process()
-            
-            # Get system memory info
-            memory_info = process.memory_info()
-            memory_percent = process.memory_percent()
-            
-            # Calculate graph-specific memory
-            total_graph_memory = sum(
-                info["memory_usage"] for info in self._active_graphs.values()
-            )
-            
-            return {
-                "process_rss_mb": memory_info.rss / 1024 / 1024,
-                "process_vms_mb": memory_info.vms / 1024 / 1024,
-                "memory_percent": memory_percent,
-                "active_graphs": len(self._active_graphs),
-                "total_graph_memory_mb": total_graph_memory / 1024 / 1024,
-                "avg_graph_memory_mb": (total_graph_memory / len(self._active_graphs) / 1024 / 1024) 
-                                    if self._active_graphs else 0,
-                "max_graphs_allowed": self._max_open_graphs,
-                "memory_limit_per_graph_mb": self._memory_limit_per_graph / 1024 / 1024,
-            }
-            
-        except ImportError:
+        process = _PROC
+        if process is None:
             # Fallback if psutil not available
             logger.warning("psutil not available, limited memory information")
             return {
@@ -204,6 +410,34 @@ class ResourceManager:
                 "max_graphs_allowed": self._max_open_graphs,
                 "memory_limit_per_graph_mb": self._memory_limit_per_graph / 1024 / 1024,
             }
+        
+        # Get system memory info; memory_full_info is a superset of memory_info
+        with_pss = detailed and _HAS_PSS
+        memory_info = process.memory_full_info() if with_pss else process.memory_info()
+        memory_percent = process.memory_percent()
+        
+        # Calculate graph-specific memory
+        with self._lock.read_lock():
+            total_graph_memory = sum(
+                info["memory_usage"] for info in self._active_graphs.values()
+            )
+        
+        stats = {
+            "process_rss_mb": memory_info.rss / 1024 / 1024,
+            "process_vms_mb": memory_info.vms / 1024 / 1024,
+            "process_memory_mb": (memory_info.pss if with_pss else memory_info.rss) / 1024 / 1024,
+            "memory_percent": memory_percent,
+            "active_graphs": len(self._active_graphs),
+            "total_graph_memory_mb": total_graph_memory / 1024 / 1024,
+            "avg_graph_memory_mb": (total_graph_memory / len(self._active_graphs) / 1024 / 1024) 
+                                if self._active_graphs else 0,
+            "max_graphs_allowed": self._max_open_graphs,
+            "memory_limit_per_graph_mb": self._memory_limit_per_graph / 1024 / 1024,
+        }
+        if with_pss:
+            stats["process_pss_mb"] = memory_info.pss / 1024 / 1024
+            stats["process_uss_mb"] = memory_info.uss / 1024 / 1024
+        return stats
     
     def enforce_limits(self) -> None:
         """
@@ -213,7 +447,7 @@ class ResourceManager:
             MemoryError: If limits are exceeded and cannot be resolved
         """
         try:
-            with self._lock:
+            with self._lock.write_lock():
                 # Check graph count limit
                 if len(self._active_graphs) > self._max_open_graphs:
                     logger.warning(f"Graph count limit exceeded: {len(self._active_graphs)}/{self._max_open_graphs}")
@@ -246,7 +480,7 @@ class ResourceManager:
         Returns:
             Resource information dictionary
         """
-        with self._lock:
+        with self._lock.read_lock():
             if graph_id:
                 if graph_id in self._active_graphs:
                     return self._active_graphs[graph_id].copy()
@@ -268,23 +502,31 @@ class ResourceManager:
     
     def update_access_time(self, graph_id: str) -> None:
         """Update the last accessed time for a graph."""
-        with self._lock:
-            if graph_id in self._active_graphs:
-                self._active_graphs[graph_id]["last_accessed"] = time.time()
+        # Only the graph's shard is locked, to move it to the LRU tail
+        graph_info = self._active_graphs.touch(graph_id)
+        if graph_info is not None:
+            graph_info["last_accessed"] = time.time()
     
-    def _parse_memory_limit(self, limit_str: str) -> int:
-        """Parse memory limit string to bytes."""
-        limit_str = limit_str.upper().strip()
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _parse_memory_limit(limit_str: str) -> int:
+        """
+        Parse memory limit string to bytes.
         
-        if limit_str.endswith('KB'):
-            return int(limit_str[:-2]) * 1024
-        elif limit_str.endswith('MB'):
-            return int(limit_str[:-2]) * 1024 * 1024
-        elif limit_str.endswith('GB'):
-            return int(limit_str[:-2]) * 1024 * 1024 * 1024
-        else:
-            # Assume bytes if no unit
-            return int(limit_str)
+        Args:
+            limit_str: Size with an optional B/KB/MB/GB/TB unit (case and
+                whitespace insensitive, fractions allowed); bytes if no unit
+            
+        Returns:
+            Limit in bytes
+            
+        Raises:
+            ValueError: If the string is not a valid size
+        """
+        match = _LIMIT_RE.match(limit_str)
+        if match is None:
+            raise ValueError(f"Invalid memory limit: {limit_str!r}")
+        return int(float(match.group(1)) * _UNIT_TABLE[(match.group(2) or "B").upper()])
     
     def _estimate_graph_memory(self, graph: Any) -> int:
         """Estimate memory usage of a graph."""
@@ -315,15 +557,13 @@ class ResourceManager:
         
         for graph_id in dead_ids:
             logger.debug(f"Cleaning up dead reference for {graph_id}")
-            if graph_id in self._active_graphs:
-                del self._active_graphs[graph_id]
-            if graph_id in self._graph_references:
-                del self._graph_references[graph_id]
+            self._active_graphs.pop(graph_id)
+            self._graph_references.pop(graph_id)
     
     def _cleanup_graph_resources(self, graph_id: str) -> None:
         """Cleanup resources for a specific graph."""
-        if graph_id in self._active_graphs:
-            graph_info = self._active_graphs[graph_id]
+        graph_info = self._active_graphs.get(graph_id)
+        if graph_info is not None:
             graph = graph_info.get("graph_object")
             
             # Trigger graph-specific cleanup if available
@@ -347,38 +587,36 @@ class ResourceManager:
     
     def _force_cleanup_lru(self) -> None:
         """Force cleanup of least recently used graphs."""
-        if not self._active_graphs:
-            return
-        
-        # Sort by last accessed time
-        sorted_graphs = sorted(
-            self._active_graphs.items(),
-            key=lambda x: x[1]["last_accessed"]
-        )
-        
         # Remove oldest graphs until under limit
         to_remove = len(self._active_graphs) - self._max_open_graphs + 1
-        for i in range(min(to_remove, len(sorted_graphs))):
-            graph_id = sorted_graphs[i][0]
+        for _ in range(to_remove):
+            graph_id = self._active_graphs.oldest(lambda info: info["last_accessed"])
+            if graph_id is None:
+                break
             logger.warning(f"Force cleanup of LRU graph: {graph_id}")
             self.unregister_graph(graph_id)
     
-    def _graph_deleted_callback(self, ref: weakref.ref) -> None:
-        """Callback when a graph is garbage collected."""
-        # Find the graph ID by reference
-        graph_id = None
-        for gid, graph_ref in self._graph_references.items():
-            if graph_ref is ref:
-                graph_id = gid
-                break
+    def _graph_deleted(self, graph_id: str, ref: weakref.ref) -> None:
+        """
+        Callback when a graph is garbage collected.
         
-        if graph_id:
-            logger.debug(f"Graph {graph_id} garbage collected")
-            with self._lock:
-                if graph_id in self._active_graphs:
-                    del self._active_graphs[graph_id]
-                if graph_id in self._graph_references:
-                    del self._graph_references[graph_id]
+        Args:
+            graph_id: ID the graph was registered under
+            ref: The graph's dead weak reference
+        """
+        # Runs inside garbage collection, possibly in a thread that already
+        # holds the read lock, so it must not wait for the write lock; the
+        # table pops below lock only their own shard. The ID may have been
+        # re-registered for another graph since, which must be kept.
+        if self._graph_references.get(graph_id) is ref:
+            self._active_graphs.pop(graph_id)
+            self._graph_references.pop(graph_id)
+            self._collected_ids.append(graph_id)
+    
+    def _log_collected(self) -> None:
+        """Log graphs reported by _graph_deleted since the last call."""
+        while self._collected_ids:
+            logger.debug(f"Graph {self._collected_ids.popleft()} garbage collected")
     
     def _start_cleanup_thread(self) -> None:
         """Start background cleanup thread."""
@@ -394,7 +632,9 @@ class ResourceManager:
         """Background cleanup worker thread."""
         while not self._stop_cleanup.wait(self._cleanup_interval):
             try:
-                self._cleanup_dead_references()
+                self._log_collected()
+                with self._lock.write_lock():
+                    self._cleanup_dead_references()
                 self.enforce_limits()
             except Exception as e:
                 logger.error(f"Cleanup worker error: {e}")
@@ -415,7 +655,7 @@ class ResourceManager:
             logger.error(f"Final cleanup failed: {e}")
         
         # Clear all tracking
-        with self._lock:
+        with self._lock.write_lock():
             self._active_graphs.clear()
             self._graph_references.clear()
     
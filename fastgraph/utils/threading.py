@@ -260,41 +260,76 @@ class ReadWriteLock:
     """
     Simple read-write lock implementation.
     
-    Allows multiple readers or a single writer.
+    Allows multiple readers or a single writer. Waiting writers block new
+    readers so a steady stream of reads cannot starve them. Both sides are
+    reentrant, and the writing thread may also take the read lock; a
+    reader cannot upgrade to the write lock.
     """
     
     def __init__(self):
         """Initialize read-write lock."""
-        self._read_ready = threading.Condition(threading.RLock())
+        self._read_ready = threading.Condition(threading.Lock())
         self._readers = 0
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        # Read locks held by the current thread, for reentrant reads
+        self._local = threading.local()
     
     def acquire_read(self):
         """Acquire read lock."""
-        self._read_ready.acquire()
-        try:
+        held = getattr(self._local, "reads", 0)
+        with self._read_ready:
+            # Nested reads and reads by the writer must not wait, or they
+            # would deadlock against a queued writer
+            if not held and self._writer != threading.get_ident():
+                while self._writer is not None or self._writers_waiting:
+                    self._read_ready.wait()
             self._readers += 1
-        finally:
-            self._read_ready.release()
+        self._local.reads = held + 1
     
     def release_read(self):
         """Release read lock."""
-        self._read_ready.acquire()
-        try:
+        self._local.reads -= 1
+        with self._read_ready:
             self._readers -= 1
             if self._readers == 0:
-                self._read_ready.notifyAll()
-        finally:
-            self._read_ready.release()
+                self._read_ready.notify_all()
     
     def acquire_write(self):
-        """Acquire write lock."""
-        self._read_ready.acquire()
-        while self._readers > 0:
-            self._read_ready.wait()
+        """
+        Acquire write lock.
+        
+        Raises:
+            ConcurrencyError: If the calling thread holds a read lock
+        """
+        me = threading.get_ident()
+        with self._read_ready:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if getattr(self._local, "reads", 0):
+                raise ConcurrencyError("Cannot upgrade a read lock to a write lock",
+                                       operation="acquire_write", thread_id=me)
+            
+            # The condition's lock is held throughout; wait() releases it
+            # only while blocked
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers > 0:
+                    self._read_ready.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
     
     def release_write(self):
         """Release write lock."""
-        self._read_ready.release()
+        with self._read_ready:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._read_ready.notify_all()
     
     @contextmanager
     def read_lock(self):
@@ -17,7 +17,8 @@ TEST_MODULES = [
     "test_foundation_components",
     "test_enhanced_fastgraph", 
     "test_integration",
-    "test_performance"
+    "test_performance",
+    "test_traversal"
 ]
 
 def run_test_module(module_name):
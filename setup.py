@@ -39,7 +39,8 @@ try:
         ],
         'performance': [
             'psutil>=5.9.0',
-            'memory-profiler>=0.60.0'
+            'memory-profiler>=0.60.0',
+            'numba>=0.56.0'
         ]
     }
     extras_require['all'] = [
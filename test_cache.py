@@ -0,0 +1,377 @@
+"""
+Test suite for FastGraph cache implementations.
+
+This module tests the LRU, TTL and simple caches in
+fastgraph.utils.cache and their shared statistics.
+"""
+
+import pytest
+import sys
+import threading
+
+# Add the fastgraph package to the path
+sys.path.insert(0, '.')
+
+from fastgraph.exceptions import CacheError
+from fastgraph.utils.cache import (
+    CacheManager, LRUCache, ShardedLRUCache, SimpleCache, TTLCache, cached,
+    cached_result, get_global_cache_manager, set_global_cache_manager
+)
+
+
+class TestLRUCache:
+    """Test suite for LRUCache."""
+    
+    def test_get_put_and_eviction_order(self):
+        """Test that the least recently used key is evicted first."""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_size() == 2
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_update_does_not_grow(self):
+        """Test that re-putting a key replaces its value in place."""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("a", 2)
+        assert cache.get("a") == 2
+        assert cache.get_size() == 1
+        assert cache.get_stats()["evictions"] == 0
+    
+    def test_miss_does_not_insert(self):
+        """Test that looking up a missing key leaves the cache untouched."""
+        cache = LRUCache(1)
+        cache.put("a", 1)
+        assert cache.get("missing") is None
+        assert cache.get_stats()["misses"] == 1
+        assert cache.get_size() == 1
+        assert cache.get("a") == 1
+    
+    def test_remove_and_reinsert(self):
+        """Test removing a key and putting it back."""
+        cache = LRUCache(3)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        
+        assert cache.remove("a") == 1
+        assert cache.remove("a") is None
+        assert cache.get("a") is None
+        assert cache.get_size() == 1
+        
+        cache.put("a", 3)
+        assert cache.get("a") == 3
+        assert cache.get_size() == 2
+    
+    def test_removed_keys_free_capacity(self):
+        """Test that removed keys no longer count toward capacity."""
+        cache = LRUCache(100)
+        for i in range(100):
+            cache.put(i, i)
+        for i in range(1, 100):
+            cache.remove(i)
+        cache.put("x", "x")
+        
+        assert cache.get_size() == 2
+        assert cache.get(0) == 0
+        assert cache.get("x") == "x"
+        assert cache.get_stats()["evictions"] == 0
+        
+        cache = LRUCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.remove("a")
+        cache.remove("b")
+        cache.put("d", "d")
+        assert cache.get("c") == "c"
+        assert cache.get_size() == 2
+    
+    def test_peek_and_contains_leave_recency_alone(self):
+        """Test that peek and membership do not promote keys or count stats."""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.peek("a") == 1
+        assert "a" in cache
+        assert cache.peek("missing") is None
+        cache.put("c", 3)
+        
+        assert cache.peek("a") is None
+        assert cache.peek("b") == 2
+        assert cache.get_stats() == {"hits": 0, "misses": 0, "evictions": 1}
+    
+    def test_clear(self):
+        """Test that clear empties the cache without counting evictions."""
+        cache = LRUCache(4)
+        for i in range(4):
+            cache.put(i, i)
+        cache.clear()
+        
+        assert cache.get_size() == 0
+        assert cache.get(0) is None
+        assert cache.get_stats()["evictions"] == 0
+        cache.put(0, "x")
+        assert cache.get(0) == "x"
+    
+    def test_unhashable_key(self):
+        """Test that unhashable keys are rejected."""
+        cache = LRUCache(2)
+        with pytest.raises(TypeError):
+            cache.put(["a"], 1)
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+    
+    def test_expiry(self, monkeypatch):
+        """Test that entries expire on the monotonic clock."""
+        now = [10_000_000_000]
+        monkeypatch.setattr("fastgraph.utils.cache.time.monotonic_ns", lambda: now[0])
+        cache = TTLCache(4, 2)
+        cache.put("a", 1)
+        
+        now[0] += 1_999_999_999
+        assert cache.get("a") == 1
+        now[0] += 1
+        assert "a" not in cache
+        assert cache.get("a") is None
+        assert cache.get_size() == 0
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_evicts_oldest_and_cleans_expired_prefix(self, monkeypatch):
+        """Test FIFO eviction by expiry and cleanup of expired entries."""
+        now = [0]
+        monkeypatch.setattr("fastgraph.utils.cache.time.monotonic_ns", lambda: now[0])
+        cache = TTLCache(3, 10)
+        for key in "abc":
+            cache.put(key, key)
+            now[0] += 1_000_000_000
+        
+        # Updating "a" makes "b" the oldest entry
+        cache.put("a", "A")
+        cache.put("d", "d")
+        assert "b" not in cache
+        assert [cache.get(k) for k in "acd"] == ["A", "c", "d"]
+        
+        # "c" expires; the later entries do not
+        now[0] = 12_000_000_000
+        cache.put("e", "e")
+        assert cache.get_size() == 3
+        assert [k in cache for k in "acde"] == [True, False, True, True]
+        assert cache.get_stats()["evictions"] == 2
+
+
+class TestSimpleCache:
+    """Test suite for SimpleCache."""
+    
+    def test_random_eviction_keeps_bookkeeping_consistent(self):
+        """Test that evictions and removals keep the key list in sync."""
+        cache = SimpleCache(8)
+        for i in range(200):
+            cache.put(i % 13, i)
+            if i % 5 == 0:
+                cache.remove((i * 7) % 13)
+            assert cache.get_size() <= 8
+            assert sorted(cache._keys) == sorted(cache._cache)
+            assert all(cache._keys[p] == k for k, p in cache._positions.items())
+        
+        cache.clear()
+        assert cache.get_size() == 0
+        assert cache._keys == []
+
+
+class TestShardedLRUCache:
+    """Test suite for ShardedLRUCache."""
+    
+    def test_basic_operations_and_stats(self):
+        """Test that operations route to shards and stats aggregate."""
+        cache = ShardedLRUCache(64, shards=4)
+        for i in range(40):
+            cache.put(i, i * 2)
+        
+        assert cache.get_capacity() == 64
+        assert cache.get_size() == 40
+        assert all(cache.get(i) == i * 2 for i in range(40))
+        assert cache.remove(3) == 6
+        assert 3 not in cache
+        assert cache.get(3) is None
+        assert cache.get_stats()["hits"] == 40
+        assert cache.get_stats()["misses"] == 1
+        
+        cache.clear()
+        assert cache.get_size() == 0
+    
+    def test_evictions_are_per_shard(self):
+        """Test that each shard evicts within its own capacity."""
+        cache = ShardedLRUCache(8, shards=2)
+        for i in range(100):
+            cache.put(i, i)
+        assert cache.get_size() == 8
+        assert cache.get_stats()["evictions"] == 92
+    
+    def test_rejects_bad_shard_count(self):
+        """Test that the shard count must be a power of two."""
+        with pytest.raises(CacheError):
+            ShardedLRUCache(16, shards=3)
+    
+    def test_registered_with_manager(self):
+        """Test that CacheManager builds sharded caches."""
+        cache = CacheManager().get_cache("sharded", "sharded_lru", size=32, shards=8)
+        assert isinstance(cache, ShardedLRUCache)
+        assert cache.get_capacity() == 32
+
+
+class TestBaseCache:
+    """Test suite for behaviour shared by all cache types."""
+    
+    @pytest.mark.parametrize("factory", [
+        lambda **kw: LRUCache(8, **kw),
+        lambda **kw: TTLCache(8, 60, **kw),
+        lambda **kw: SimpleCache(8, **kw),
+    ])
+    @pytest.mark.parametrize("threadsafe", [True, False])
+    def test_stats(self, factory, threadsafe):
+        """Test hit/miss accounting with and without locking."""
+        cache = factory(threadsafe=threadsafe)
+        cache["a"] = 1
+        assert cache["a"] == 1
+        assert cache.get("b") is None
+        assert cache.get_stats() == {"hits": 1, "misses": 1, "evictions": 0}
+    
+    @pytest.mark.parametrize("cache", [LRUCache(4), TTLCache(4, 60), SimpleCache(4)])
+    def test_cached_none_is_a_hit(self, cache):
+        """Test that a stored None is a hit and membership leaves stats alone."""
+        cache.put("a", None)
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache["a"] is None
+        assert cache.get("a") is None
+        with pytest.raises(KeyError):
+            cache["b"]
+        assert cache.get_stats() == {"hits": 2, "misses": 1, "evictions": 0}
+    
+    @pytest.mark.parametrize("cache", [
+        LRUCache(4), TTLCache(4, 60), SimpleCache(4), ShardedLRUCache(8, shards=2)])
+    def test_peek(self, cache):
+        """Test that peek returns values without counting them."""
+        cache.put("a", "value")
+        assert cache.peek("a") == "value"
+        assert cache.peek("b") is None
+        assert cache.get_stats()["hits"] == 0
+        assert cache.get_stats()["misses"] == 0
+    
+    def test_manager_passes_threadsafe(self):
+        """Test that CacheManager forwards the threadsafe flag."""
+        cache = CacheManager().get_cache("plain", "lru", size=4, threadsafe=False)
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+    
+    def test_concurrent_readers_and_writer(self):
+        """Test lock-free reads alongside a writer."""
+        cache = LRUCache(16)
+        errors = []
+        
+        def reader():
+            try:
+                for i in range(2000):
+                    value = cache.get(i % 32)
+                    assert value is None or value == i % 32
+            except Exception as exc:  # pragma: no cover - only on failure
+                errors.append(exc)
+        
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(2000):
+            cache.put(i % 32, i % 32)
+        for thread in threads:
+            thread.join()
+        
+        assert not errors
+        assert cache.get_size() <= 16
+
+
+class TestCachedDecorator:
+    """Test suite for the cached decorator."""
+    
+    def setup_method(self):
+        """Give each test a fresh global cache manager."""
+        set_global_cache_manager(CacheManager())
+    
+    def teardown_method(self):
+        """Restore a clean global cache manager."""
+        set_global_cache_manager(CacheManager())
+    
+    def test_keys_separate_functions_and_keywords(self):
+        """Test that keys distinguish functions, positions and keywords."""
+        calls = []
+        
+        @cached()
+        def first(*args, **kwargs):
+            calls.append(("first", args, kwargs))
+            return len(calls)
+        
+        @cached()
+        def second(*args, **kwargs):
+            calls.append(("second", args, kwargs))
+            return len(calls)
+        
+        assert first(1, 2) == 1
+        assert first(1, 2) == 1
+        assert second(1, 2) == 2
+        assert first(1, ("b", 2)) == 3
+        assert first(1, b=2) == 4
+        assert first(1, b=2, c=3) == 5
+        assert first(1, c=3, b=2) == 5
+        assert len(calls) == 5
+    
+    def test_cache_bound_once_and_none_cached(self):
+        """Test that the cache is resolved once and None results are kept."""
+        calls = []
+        
+        @cached("bound")
+        def lookup(x):
+            calls.append(x)
+            return None
+        
+        assert lookup(1) is None
+        assert lookup(1) is None
+        assert calls == [1]
+        
+        # Replacing the global manager does not rebind an already-used function
+        set_global_cache_manager(CacheManager())
+        assert lookup(1) is None
+        assert calls == [1]
+    
+    def test_cached_result_uses_private_caches(self):
+        """Test that TTL-cached functions neither share nor register caches."""
+        def make(offset):
+            @cached_result(ttl=60)
+            def compute(x):
+                return x + offset
+            return compute
+        
+        plus_one, plus_two = make(1), make(2)
+        assert plus_one(1) == 2
+        assert plus_two(1) == 3
+        assert plus_one(1) == 2
+        assert get_global_cache_manager().get_stats() == {}
+
+
+class TestGetPut:
+    """Test suite for BaseCache.get_put."""
+    
+    @pytest.mark.parametrize("cache", [LRUCache(4), TTLCache(4, 60), ShardedLRUCache(8, shards=2)])
+    def test_get_put(self, cache):
+        """Test lookup-or-insert accounting."""
+        assert cache.get_put("a", lambda: 1) == 1
+        assert cache.get_put("a", lambda: 2) == 1
+        assert cache.get("a") == 1
+        assert cache.get_stats()["hits"] == 2
+        assert cache.get_stats()["misses"] == 1
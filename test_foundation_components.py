@@ -21,6 +21,7 @@ sys.path.insert(0, '.')
 
 from fastgraph.utils.path_resolver import PathResolver
 from fastgraph.utils.resource_manager import ResourceManager
+from fastgraph.utils.threading import ReadWriteLock
 from fastgraph.exceptions import PersistenceError, ValidationError, MemoryError, ConcurrencyError
 
 
@@ -46,9 +47,9 @@ class TestPathResolver:
     def test_path_resolver_initialization(self):
         """Test PathResolver initialization."""
         resolver = PathResolver()
-        assert resolver._supported_formats == {"msgpack", "pickle", "json"}
+        assert resolver._supported_formats == ("msgpack", "pickle", "json")
         assert len(resolver._default_search_paths) > 0
-        assert resolver._format_signatures is not None
+        assert resolver._FORMAT_SIGNATURES is not None
     
     def test_path_resolver_with_config(self):
         """Test PathResolver with custom configuration."""
@@ -129,6 +130,56 @@ class TestPathResolver:
         # Should detect from extension first
         assert self.resolver.detect_format(gz_json_file) == "json"
     
+    def test_detect_format_falls_back_to_extension(self):
+        """Test that unrecognized content defers to the file extension."""
+        import msgpack
+        
+        msgpack_file = Path(self.temp_dir) / "test.msgpack"
+        with open(msgpack_file, 'wb') as f:
+            f.write(msgpack.packb({"nodes": list(range(50)), "edges": []}))
+        
+        resolver = PathResolver({"storage": {"data_dir": self.temp_dir, "trust_extension": False}})
+        assert resolver.detect_format(msgpack_file) == "msgpack"
+    
+    def test_detect_format_trust_extension(self):
+        """Test that a known extension is trusted unless disabled."""
+        mislabeled = Path(self.temp_dir) / "test.json"
+        mislabeled.write_bytes(b'\x80\x04\x95')  # Pickle header
+        
+        assert self.resolver.detect_format(mislabeled) == "json"
+        
+        resolver = PathResolver({"storage": {"data_dir": self.temp_dir, "trust_extension": False}})
+        assert resolver.detect_format(mislabeled) == "pickle"
+    
+    def test_detect_format_cached_until_file_changes(self):
+        """Test that detection results are reused until mtime or size change."""
+        data_file = Path(self.temp_dir) / "data.bin"
+        data_file.write_bytes(b'{"a": 1}')
+        past = time.time_ns() - 60 * 10**9
+        os.utime(data_file, ns=(past, past))
+        assert self.resolver.detect_format(data_file) == "json"
+        
+        # Same mtime and size: served from the cache
+        data_file.write_bytes(b'\x80"a": 1}')
+        os.utime(data_file, ns=(past, past))
+        assert self.resolver.detect_format(data_file) == "json"
+        
+        # A new mtime invalidates the entry
+        os.utime(data_file, ns=(past + 10**9, past + 10**9))
+        assert self.resolver.detect_format(data_file) == "pickle"
+    
+    def test_detect_formats_batch(self):
+        """Test batch format detection."""
+        json_file = Path(self.temp_dir) / "data.bin"
+        json_file.write_bytes(b'{"a": 1}')
+        paths = [json_file, Path(self.temp_dir) / "missing.pkl", Path(self.temp_dir) / "missing.txt"]
+        expected = {paths[0]: "json", paths[1]: "pickle", paths[2]: None}
+        
+        assert self.resolver.detect_formats(paths) == expected
+        
+        resolver = PathResolver({"storage": {"data_dir": self.temp_dir, "search_workers": 4}})
+        assert resolver.detect_formats([str(p) for p in paths]) == expected
+    
     def test_ensure_directory(self):
         """Test directory creation."""
         test_path = Path(self.temp_dir) / "subdir" / "test.msgpack"
@@ -155,6 +206,52 @@ class TestPathResolver:
         # Should not find non-existent file
         assert self.resolver.find_graph_file("nonexistent") is None
     
+    def test_find_graph_file_sees_new_files(self):
+        """Test that cached directory listings pick up newly created files."""
+        assert self.resolver.find_graph_file("late") is None
+        
+        (Path(self.temp_dir) / "late-graph.pickle").touch()
+        found = self.resolver.find_graph_file("late")
+        assert found == Path(self.temp_dir) / "late-graph.pickle"
+    
+    def test_new_resolver_sees_new_data_dir(self):
+        """Test that a data directory created later is searched by new resolvers."""
+        data_dir = Path(self.temp_dir) / "cache" / "fastgraph" / "data"
+        config = {"storage": {"data_dir": str(data_dir)}}
+        assert PathResolver(config).find_graph_file("alpha") is None
+        
+        data_dir.mkdir(parents=True)
+        (data_dir / "alpha.msgpack").touch()
+        assert PathResolver(config).find_graph_file("alpha") == data_dir / "alpha.msgpack"
+    
+    def test_iter_matches_priority_order(self):
+        """Test that all matches are produced in lookup priority order."""
+        for filename in ("test-graph.json", "test.pickle", "test.msgpack", "test.graph.msgpack"):
+            (Path(self.temp_dir) / filename).touch()
+        
+        matches = list(self.resolver._iter_matches("test", [Path(self.temp_dir)]))
+        assert [p.name for p in matches] == [
+            "test.msgpack", "test.graph.msgpack", "test.pickle", "test-graph.json"
+        ]
+    
+    def test_find_graph_file_concurrent_search(self):
+        """Test that concurrent listing keeps search path priority."""
+        first = Path(self.temp_dir) / "first"
+        second = Path(self.temp_dir) / "second"
+        first.mkdir()
+        second.mkdir()
+        (first / "test.graph.json").touch()
+        (second / "test.msgpack").touch()
+        (second / "test.json").touch()
+        
+        resolver = PathResolver({"storage": {"data_dir": self.temp_dir, "search_workers": 4}})
+        found = resolver.find_graph_file("test", [Path("/nonexistent"), first, second])
+        assert found == second / "test.msgpack"
+        
+        (second / "test.msgpack").unlink()
+        found = resolver.find_graph_file("test", [Path("/nonexistent"), first, second])
+        assert found == first / "test.graph.json"
+    
     def test_get_default_path(self):
         """Test getting default path for graph."""
         default_path = self.resolver.get_default_path("my_graph")
@@ -239,7 +336,7 @@ class TestResourceManager:
         assert manager._max_open_graphs == 10  # Default value
         assert manager._memory_limit_per_graph > 0
         assert manager._cleanup_interval > 0
-        assert isinstance(manager._lock, threading.RLock)
+        assert isinstance(manager._lock, ReadWriteLock)
     
     def test_resource_manager_with_config(self):
         """Test ResourceManager with custom configuration."""
@@ -290,6 +387,34 @@ class TestResourceManager:
         with pytest.raises(MemoryError):
             self.manager.register_graph(mock_graphs[3], "graph_3")
     
+    def test_register_graph_concurrent_limit(self):
+        """Test concurrent registrations never exceed the graph limit."""
+        mock_graphs = [Mock() for _ in range(20)]
+        for mg in mock_graphs:
+            mg.nodes = {}
+            mg._edges = {}
+        registered = []
+        
+        def register(i):
+            try:
+                registered.append(self.manager.register_graph(mock_graphs[i], f"graph_{i}"))
+            except MemoryError:
+                pass
+        
+        threads = [threading.Thread(target=register, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(registered) == 3
+        assert len(self.manager._active_graphs) == 3
+        assert sorted(self.manager._active_graphs.keys()) == sorted(registered)
+        
+        for graph_id in registered:
+            self.manager.unregister_graph(graph_id)
+        assert len(self.manager._active_graphs) == 0
+    
     def test_unregister_graph(self):
         """Test graph unregistration."""
         mock_graph = Mock()
@@ -355,11 +480,45 @@ class TestResourceManager:
     
     def test_get_memory_usage_without_psutil(self):
         """Test memory usage when psutil is not available."""
-        with patch.dict('sys.modules', {'psutil': None}):
+        with patch('fastgraph.utils.resource_manager._PROC', None):
             stats = self.manager.get_memory_usage()
             assert "active_graphs" in stats
             assert "process_rss_mb" not in stats
     
+    def test_get_memory_usage_reuses_process(self):
+        """Test that memory readings share one psutil process handle."""
+        from fastgraph.utils import resource_manager
+        if resource_manager._PROC is None:
+            pytest.skip("psutil not available")
+        
+        with patch('psutil.Process') as process_cls:
+            stats = self.manager.get_memory_usage()
+            self.manager.get_memory_usage()
+        process_cls.assert_not_called()
+        assert stats["process_rss_mb"] > 0
+    
+    def test_get_memory_usage_pss(self):
+        """Test PSS/USS reporting and the RSS fallback."""
+        from fastgraph.utils import resource_manager
+        if resource_manager._PROC is None:
+            pytest.skip("psutil not available")
+        
+        # Off by default, since reading PSS parses the memory maps
+        stats = self.manager.get_memory_usage()
+        assert "process_pss_mb" not in stats
+        assert stats["process_memory_mb"] == stats["process_rss_mb"]
+        
+        with patch('fastgraph.utils.resource_manager._HAS_PSS', False):
+            stats = self.manager.get_memory_usage(detailed=True)
+        assert "process_pss_mb" not in stats
+        assert stats["process_memory_mb"] == stats["process_rss_mb"]
+        
+        if not resource_manager._HAS_PSS:
+            pytest.skip("PSS not available on this platform")
+        stats = self.manager.get_memory_usage(detailed=True)
+        assert 0 < stats["process_uss_mb"] <= stats["process_pss_mb"]
+        assert stats["process_memory_mb"] == stats["process_pss_mb"]
+    
     def test_enforce_limits(self):
         """Test resource limit enforcement."""
         mock_graph = Mock()
@@ -420,6 +579,17 @@ class TestResourceManager:
         assert manager._parse_memory_limit("1GB") == 1024 * 1024 * 1024
         assert manager._parse_memory_limit("1024") == 1024  # Assume bytes
     
+    def test_parse_memory_limit_formats(self):
+        """Test memory limit parsing of fractions, case and spacing."""
+        assert ResourceManager._parse_memory_limit("1.5GB") == int(1.5 * 1024 ** 3)
+        assert ResourceManager._parse_memory_limit("100 mb") == 100 * 1024 ** 2
+        assert ResourceManager._parse_memory_limit(" 2TB ") == 2 * 1024 ** 4
+        assert ResourceManager._parse_memory_limit("512B") == 512
+        
+        for invalid in ("", "MB", "1.2.3GB", "10XB", "-5MB"):
+            with pytest.raises(ValueError):
+                ResourceManager._parse_memory_limit(invalid)
+    
     def test_estimate_graph_memory(self):
         """Test graph memory estimation."""
         manager = ResourceManager()
@@ -461,6 +631,31 @@ class TestResourceManager:
         assert graph_id not in self.manager._active_graphs
         assert graph_id not in self.manager._graph_references
     
+    def test_graph_deleted_callback(self):
+        """Test the weakref callback removes only the graph it was made for."""
+        graphs = [Mock(), Mock()]
+        for mg in graphs:
+            mg.nodes = {}
+            mg._edges = {}
+        
+        self.manager.register_graph(graphs[0], "test_graph")
+        stale_ref = self.manager._graph_references["test_graph"]
+        self.manager.unregister_graph("test_graph")
+        self.manager.register_graph(graphs[1], "test_graph")
+        
+        # A callback for the previous graph under the same ID is ignored
+        stale_ref.__callback__(stale_ref)
+        assert "test_graph" in self.manager._active_graphs
+        
+        ref = self.manager._graph_references["test_graph"]
+        ref.__callback__(ref)
+        assert "test_graph" not in self.manager._active_graphs
+        assert "test_graph" not in self.manager._graph_references
+        assert list(self.manager._collected_ids) == ["test_graph"]
+        
+        self.manager._log_collected()
+        assert len(self.manager._collected_ids) == 0
+    
     def test_backup_on_close(self):
         """Test backup functionality on close."""
         config = {
@@ -509,6 +704,23 @@ class TestResourceManager:
         # Should have removed at least one graph
         assert len(self.manager._active_graphs) < 3
     
+    def test_force_cleanup_lru_order(self):
+        """Test force cleanup evicts the least recently accessed graph."""
+        for i in range(3):
+            mg = Mock()
+            mg.nodes = {}
+            mg._edges = {}
+            self.manager.register_graph(mg, f"graph_{i}")
+            time.sleep(0.01)
+        
+        # graph_0 becomes the most recent, leaving graph_1 as the oldest
+        self.manager.update_access_time("graph_0")
+        self.manager._force_cleanup_lru()
+        
+        assert "graph_1" not in self.manager._active_graphs
+        assert "graph_0" in self.manager._active_graphs
+        assert "graph_2" in self.manager._active_graphs
+    
     def test_shutdown(self):
         """Test ResourceManager shutdown."""
         mock_graph = Mock()
@@ -566,6 +778,70 @@ class TestResourceManager:
             self.manager.cleanup_resources("invalid")
 
 
+class TestReadWriteLock:
+    """Test suite for the ReadWriteLock used by ResourceManager."""
+    
+    def test_concurrent_readers(self):
+        """Test that readers do not block each other."""
+        lock = ReadWriteLock()
+        inside = threading.Barrier(3, timeout=5)
+        
+        def reader():
+            with lock.read_lock():
+                inside.wait()
+        
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        inside.wait()
+        for thread in threads:
+            thread.join()
+    
+    def test_writer_excludes_readers(self):
+        """Test that a writer waits for readers and blocks new ones."""
+        lock = ReadWriteLock()
+        events = []
+        
+        lock.acquire_read()
+        writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"),
+                                                  lock.release_write()))
+        writer.start()
+        time.sleep(0.05)
+        assert events == []
+        
+        # A queued writer holds off new readers
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append("read"),
+                                                  lock.release_read()))
+        reader.start()
+        time.sleep(0.05)
+        assert events == []
+        
+        lock.release_read()
+        writer.join(timeout=5)
+        reader.join(timeout=5)
+        assert events == ["write", "read"]
+    
+    def test_reentrancy(self):
+        """Test nested reads, nested writes and reads by the writer."""
+        lock = ReadWriteLock()
+        with lock.write_lock():
+            with lock.write_lock():
+                with lock.read_lock():
+                    pass
+        with lock.read_lock():
+            with lock.read_lock():
+                with pytest.raises(ConcurrencyError):
+                    lock.acquire_write()
+        
+        # Fully released: another thread can write
+        acquired = []
+        thread = threading.Thread(target=lambda: (lock.acquire_write(), acquired.append(True),
+                                                  lock.release_write()))
+        thread.start()
+        thread.join(timeout=5)
+        assert acquired == [True]
+
+
 class TestIntegration:
     """Integration tests for foundation components working together."""
     
@@ -0,0 +1,186 @@
+"""
+Test suite for FastGraph memory utilities.
+
+This module tests MemoryUtils measurement, estimation and snapshot
+handling.
+"""
+
+import pytest
+import sys
+
+# Add the fastgraph package to the path
+sys.path.insert(0, '.')
+
+from fastgraph.core.graph import FastGraph
+from fastgraph.utils.memory import MemoryUtils
+
+
+class TestMemoryUsage:
+    """Test suite for process memory readings."""
+    
+    def test_reports_process_memory(self):
+        """Test that a real reading is returned."""
+        usage = MemoryUtils().get_memory_usage()
+        assert usage["rss"] > 0
+        assert set(usage) == {"rss", "vms", "shared", "text", "data", "libs", "heap"}
+    
+    def test_reading_is_reused_within_ttl(self, monkeypatch):
+        """Test that psutil is queried once per TTL window."""
+        utils = MemoryUtils()
+        calls = []
+        real_memory_info = utils._mem_info_fn
+        
+        def counting_memory_info():
+            calls.append(1)
+            return real_memory_info()
+        
+        now = [10 ** 12]
+        monkeypatch.setattr(utils, "_mem_info_fn", counting_memory_info)
+        monkeypatch.setattr("fastgraph.utils.memory.time.monotonic_ns", lambda: now[0])
+        
+        first = utils.get_memory_usage()
+        first["rss"] = -1
+        assert utils.get_memory_usage()["rss"] > 0
+        assert len(calls) == 1
+        
+        now[0] += MemoryUtils.MEMORY_USAGE_TTL_NS
+        utils.get_memory_usage()
+        assert len(calls) == 2
+    
+    def test_system_reading_is_reused_within_ttl(self, monkeypatch):
+        """Test that virtual_memory is queried once per TTL window."""
+        utils = MemoryUtils()
+        calls = []
+        real_virtual_memory = utils._virtual_memory_fn
+        
+        def counting_virtual_memory():
+            calls.append(1)
+            return real_virtual_memory()
+        
+        now = [10 ** 12]
+        monkeypatch.setattr(utils, "_virtual_memory_fn", counting_virtual_memory)
+        monkeypatch.setattr("fastgraph.utils.memory.time.monotonic_ns", lambda: now[0])
+        
+        assert utils.get_system_memory()["total"] > 0
+        utils.get_memory_pressure()
+        utils.is_memory_low()
+        assert len(calls) == 1
+        
+        now[0] += MemoryUtils.SYSTEM_MEMORY_TTL_NS
+        utils.get_system_memory()
+        assert len(calls) == 2
+    
+    def test_zero_readings_without_psutil(self, monkeypatch):
+        """Test that an unusable psutil yields zero readings."""
+        monkeypatch.setattr("fastgraph.utils.memory.psutil", None)
+        utils = MemoryUtils()
+        assert set(utils.get_memory_usage().values()) == {0}
+        assert set(utils.get_system_memory().values()) == {0}
+        assert utils.get_memory_pressure() == 0.0
+
+
+class TestSnapshots:
+    """Test suite for memory snapshots."""
+    
+    def test_snapshots_are_bounded(self, monkeypatch):
+        """Test that only the newest MAX_SNAPSHOTS snapshots are kept."""
+        monkeypatch.setattr(MemoryUtils, "MAX_SNAPSHOTS", 4)
+        utils = MemoryUtils()
+        for i in range(10):
+            utils.memory_snapshot(f"s{i}")
+        
+        labels = [utils._snapshot_view(utils._snapshot_slot(i))["label"] for i in range(4)]
+        assert labels == ["s6", "s7", "s8", "s9"]
+        assert utils._snapshot_slot(-1) == utils._snapshot_slot(3)
+        assert set(utils.get_memory_increase()) == {
+            "rss", "vms", "shared", "text", "data", "libs", "heap"}
+        assert utils.get_memory_increase(0, 4) == {}
+    
+    def test_snapshots_take_fresh_readings(self):
+        """Test that back-to-back snapshots see memory allocated between them."""
+        utils = MemoryUtils()
+        if utils._mem_info_fn is None:
+            pytest.skip("psutil not available")
+        
+        utils.memory_snapshot("before")
+        data = bytearray(b"\x01") * (64 << 20)
+        utils.memory_snapshot("after")
+        
+        assert utils.get_memory_increase()["rss"] >= 32 << 20
+        del data
+    
+    def test_snapshot_round_trip(self):
+        """Test that a stored snapshot reads back as it was returned."""
+        utils = MemoryUtils()
+        snapshot = utils.memory_snapshot("only")
+        
+        assert snapshot["label"] == "only"
+        assert snapshot["memory_usage"] == utils.get_memory_usage()
+        assert snapshot["system_memory"]["total"] > 0
+        assert isinstance(snapshot["system_memory"]["total"], int)
+        assert utils._snapshot_view(utils._snapshot_slot(0)) == snapshot
+        assert utils.get_memory_increase() == {}
+
+
+class TestObjectSize:
+    """Test suite for estimate_object_size."""
+    
+    def test_counts_containers_and_items(self):
+        """Test that nested container contents are included."""
+        utils = MemoryUtils()
+        value = {"a": [1.5, "text"], "b": (2.5,)}
+        expected = sum(sys.getsizeof(o) for o in (
+            value, "a", "b", value["a"], 1.5, "text", value["b"], 2.5))
+        assert utils.estimate_object_size(value) == expected
+    
+    def test_shared_and_cyclic_structures(self):
+        """Test that shared objects count once and cycles terminate."""
+        utils = MemoryUtils()
+        shared = list(range(1000, 1100))
+        pair = [shared, shared]
+        assert utils.estimate_object_size(pair) == (
+            sys.getsizeof(pair) + utils.estimate_object_size(shared))
+        
+        cycle = []
+        cycle.append(cycle)
+        assert utils.estimate_object_size(cycle) == sys.getsizeof(cycle)
+
+
+class TestGraphMemory:
+    """Test suite for estimate_graph_memory."""
+    
+    def build_graph(self, size):
+        """Create a chain graph with ``size`` nodes."""
+        graph = FastGraph("memory_test")
+        for i in range(size):
+            graph.add_node(f"n{i}", value=i, name="x" * (i % 20))
+        for i in range(size - 1):
+            graph.add_edge(f"n{i}", f"n{i + 1}", "next")
+        return graph
+    
+    def test_sampled_estimate_is_close_to_exact(self, monkeypatch):
+        """Test that sampling stays close to the full walk."""
+        graph = self.build_graph(2000)
+        utils = MemoryUtils()
+        monkeypatch.setattr(MemoryUtils, "GRAPH_SAMPLE_SIZE", 200)
+        sampled = utils.estimate_graph_memory(graph)
+        
+        monkeypatch.setattr(MemoryUtils, "GRAPH_SAMPLE_SIZE", 10 ** 9)
+        graph._cached_mem_estimate = None
+        exact = utils.estimate_graph_memory(graph)
+        
+        assert sampled["edges"] == exact["edges"]
+        assert abs(sampled["nodes"] - exact["nodes"]) < exact["nodes"] * 0.1
+    
+    def test_estimate_is_cached_until_mutation(self):
+        """Test that the graph data estimate is reused until the graph changes."""
+        graph = self.build_graph(50)
+        utils = MemoryUtils()
+        first = utils.estimate_graph_memory(graph)
+        cached = graph._cached_mem_estimate
+        
+        assert utils.estimate_graph_memory(graph) == first
+        assert graph._cached_mem_estimate is cached
+        
+        graph.add_node("extra", payload="y" * 1000)
+        assert utils.estimate_graph_memory(graph)["nodes"] > first["nodes"]
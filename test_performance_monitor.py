@@ -0,0 +1,573 @@
+"""
+Test suite for FastGraph performance monitoring utilities.
+
+This module tests PerformanceMonitor recording and statistics, and the
+timing decorators built on it.
+"""
+
+import io
+import csv
+import json
+import inspect
+from functools import wraps
+import threading
+import time
+import pytest
+import sys
+
+# Add the fastgraph package to the path
+sys.path.insert(0, '.')
+
+from fastgraph.utils import performance
+from fastgraph.utils.performance import (
+    BenchmarkRunner,
+    PerformanceMonitor,
+    performance_context,
+    performance_monitor,
+    set_global_performance_monitor,
+    timed,
+)
+
+
+class TestPerformanceMonitor:
+    """Test suite for PerformanceMonitor."""
+    
+    def test_start_end_operation(self):
+        """Test timing an operation with merged metadata."""
+        monitor = PerformanceMonitor()
+        operation_id = monitor.start_operation("load", source="disk")
+        duration = monitor.end_operation(operation_id, nodes=3)
+        
+        assert duration >= 0
+        metrics = monitor.get_recent_metrics("load")
+        assert len(metrics) == 1
+        assert metrics[0].metadata == {"source": "disk", "nodes": 3}
+        
+        # An operation can only be ended once
+        assert monitor.end_operation(operation_id) is None
+    
+    def test_results_are_immutable(self):
+        """Test that metrics and stats cannot be modified."""
+        monitor = PerformanceMonitor()
+        monitor.record_metric("op", 0.1)
+        
+        with pytest.raises(AttributeError):
+            monitor.get_recent_metrics("op")[0].duration_ns = 0
+        with pytest.raises(AttributeError):
+            monitor.get_stats("op").count = 0
+    
+    def test_metric_units(self):
+        """Test nanosecond storage with second-based accessors."""
+        monitor = PerformanceMonitor()
+        before = time.time()
+        monitor.record_metric("op", 0.25)
+        metric = monitor.get_recent_metrics("op")[0]
+        
+        assert metric.duration_ns == 250_000_000
+        assert metric.duration == pytest.approx(0.25)
+        assert before - 1 < metric.timestamp < time.time() + 1
+    
+    def test_record_metric_stats(self):
+        """Test statistics over recorded metrics."""
+        monitor = PerformanceMonitor()
+        for duration in (0.1, 0.2, 0.3, 0.6):
+            monitor.record_metric("query", duration)
+        
+        stats = monitor.get_stats("query")
+        assert stats.count == 4
+        assert stats.total_duration == pytest.approx(1.2)
+        assert stats.avg_duration == pytest.approx(0.3)
+        assert stats.min_duration == pytest.approx(0.1)
+        assert stats.max_duration == pytest.approx(0.6)
+        # Percentiles are histogram estimates within ~6%
+        assert stats.median_duration == pytest.approx(0.2, rel=0.07)
+        assert stats.p50 == stats.median_duration
+        assert stats.p99 == pytest.approx(0.6, rel=0.07)
+        assert stats.last_duration == pytest.approx(0.6)
+        
+        assert set(monitor.get_stats()) == {"query"}
+        assert monitor.get_stats("unknown").count == 0
+    
+    def test_stats_cover_evicted_metrics(self):
+        """Test that running stats outlive the retained metric window."""
+        monitor = PerformanceMonitor(max_metrics=2)
+        for duration in (0.4, 0.1, 0.2, 0.3):
+            monitor.record_metric("op", duration)
+        
+        stats = monitor.get_stats("op")
+        assert stats.count == 4
+        assert stats.total_duration == pytest.approx(1.0)
+        assert stats.min_duration == pytest.approx(0.1)
+        assert stats.max_duration == pytest.approx(0.4)
+        assert stats.std_deviation == pytest.approx(0.12909944)
+        assert stats.median_duration == pytest.approx(0.2, rel=0.07)
+        assert len(monitor.get_recent_metrics("op")) == 2
+    
+    def test_percentiles(self):
+        """Test histogram percentiles over a uniform spread of durations."""
+        monitor = PerformanceMonitor()
+        for i in range(1, 1001):
+            monitor.record_metric_fast("op", i * 1_000)
+        
+        stats = monitor.get_stats("op")
+        assert stats.p50 == pytest.approx(500e-6, rel=0.07)
+        assert stats.p95 == pytest.approx(950e-6, rel=0.07)
+        assert stats.p99 == pytest.approx(990e-6, rel=0.07)
+        assert stats.min_duration <= stats.p50 <= stats.p95 <= stats.p99 <= stats.max_duration
+    
+    def test_without_raw_metrics(self):
+        """Test that keep_raw=False keeps statistics but no metrics."""
+        monitor = PerformanceMonitor(keep_raw=False)
+        for duration in (0.1, 0.3, 0.2):
+            monitor.record_metric("op", duration)
+        
+        stats = monitor.get_stats("op")
+        assert stats.count == 3
+        assert stats.median_duration == pytest.approx(0.2, rel=0.07)
+        assert stats.last_duration == pytest.approx(0.2)
+        assert monitor.get_recent_metrics("op") == []
+        assert monitor.get_slow_operations(threshold=0.0) == []
+    
+    def test_retained_metrics_wrap_around(self):
+        """Test that the newest max_metrics metrics are kept in order."""
+        monitor = PerformanceMonitor(max_metrics=3)
+        for duration_ns in range(1, 6):
+            monitor.record_metric_fast("op", duration_ns)
+        monitor.record_metric("op", 6e-9, step=6)
+        
+        metrics = monitor.get_recent_metrics("op")
+        assert [m.duration_ns for m in metrics] == [4, 5, 6]
+        assert [m.metadata for m in metrics] == [None, None, {"step": 6}]
+        assert all(m.operation == "op" for m in metrics)
+        assert [m.duration_ns for m in monitor.get_recent_metrics("op", count=2)] == [5, 6]
+        
+        monitor.clear_metrics("op")
+        monitor.record_metric_fast("op", 7)
+        assert [m.duration_ns for m in monitor.get_recent_metrics("op")] == [7]
+    
+    def test_retained_metrics_grow_lazily(self):
+        """Test that raw metric columns grow with use up to max_metrics."""
+        monitor = PerformanceMonitor(max_metrics=40)
+        monitor.record_metric_fast("op", 1)
+        ring = monitor._operation_metrics("op").ring
+        assert len(ring._columns[0]) == performance._RingBuffer.INITIAL_ROWS
+        
+        for duration_ns in range(2, 101):
+            monitor.record_metric_fast("op", duration_ns)
+        assert len(ring._columns[0]) == 40
+        assert [m.duration_ns for m in monitor.get_recent_metrics("op")] == list(range(61, 101))
+        
+        # Writes racing with a resize are not lost
+        monitor = PerformanceMonitor(max_metrics=1000)
+        
+        def worker(offset):
+            for i in range(100):
+                monitor.record_metric_fast("shared", offset + i)
+        
+        threads = [threading.Thread(target=worker, args=(t * 100,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        durations = sorted(m.duration_ns for m in monitor.get_recent_metrics("shared", count=1000))
+        assert durations == list(range(800))
+    
+    def test_export_metrics(self):
+        """Test that export fills in empty metadata."""
+        monitor = PerformanceMonitor()
+        monitor.record_metric("op", 0.5)
+        monitor.record_metric("op", 0.25, rows=2)
+        
+        exported = monitor.export_metrics()["op"]
+        assert [row["metadata"] for row in exported] == [{}, {"rows": 2}]
+        assert exported[0]["duration"] == pytest.approx(0.5)
+    
+    def test_export_metrics_json(self):
+        """Test streamed JSON export to a string and to a file object."""
+        monitor = PerformanceMonitor()
+        assert json.loads(monitor.export_metrics("json")) == {}
+        
+        monitor.record_metric("a", 0.5, rows=2)
+        monitor.record_metric("b", 0.25)
+        monitor.clear_metrics("b")
+        exported = monitor.export_metrics("json")
+        assert json.loads(exported) == monitor.export_metrics()
+        
+        output = io.StringIO()
+        assert monitor.export_metrics("json", output=output) is None
+        assert output.getvalue() == exported
+        
+        with pytest.raises(ValueError):
+            monitor.export_metrics("xml")
+    
+    def test_export_metrics_csv(self):
+        """Test CSV export with one row per metric."""
+        monitor = PerformanceMonitor()
+        monitor.record_metric("a", 0.5, rows=2)
+        monitor.record_metric("b", 0.25)
+        
+        rows = list(csv.reader(io.StringIO(monitor.export_metrics("csv"))))
+        assert rows[0] == ["operation", "duration", "timestamp", "thread_id", "metadata"]
+        by_operation = {row[0]: row for row in rows[1:]}
+        assert len(rows) == 3
+        assert float(by_operation["a"][1]) == pytest.approx(0.5)
+        assert json.loads(by_operation["a"][4]) == {"rows": 2}
+        assert by_operation["b"][4] == ""
+    
+    def test_clear_metrics(self):
+        """Test clearing one operation or all of them."""
+        monitor = PerformanceMonitor()
+        monitor.record_metric("a", 0.1)
+        monitor.record_metric("b", 0.1)
+        
+        monitor.clear_metrics("a")
+        assert monitor.get_stats("a").count == 0
+        assert monitor.get_stats("b").count == 1
+        
+        monitor.clear_metrics()
+        assert monitor.get_stats() == {}
+    
+    def test_slow_operations(self):
+        """Test that slow operations are returned slowest first."""
+        monitor = PerformanceMonitor()
+        monitor.record_metric("fast", 0.01)
+        monitor.record_metric("slow", 2.0)
+        monitor.record_metric("slower", 3.0)
+        
+        slow = monitor.get_slow_operations(threshold=1.0)
+        assert [m.operation for m in slow] == ["slower", "slow"]
+        assert [m.operation for m in monitor.get_slow_operations(threshold=0.0, limit=2)] == ["slower", "slow"]
+    
+    def test_slow_operations_without_numpy(self, monkeypatch):
+        """Test the pure-Python duration filter."""
+        monkeypatch.setattr(performance, "np", None)
+        monitor = PerformanceMonitor()
+        for duration in (0.5, 2.0, 0.1, 1.5):
+            monitor.record_metric("op", duration)
+        
+        slow = monitor.get_slow_operations(threshold=1.0)
+        assert [m.duration for m in slow] == [2.0, 1.5]
+    
+    def test_concurrent_recording(self):
+        """Test that concurrent threads lose no metrics."""
+        monitor = PerformanceMonitor()
+        
+        def worker(name):
+            for _ in range(500):
+                operation_id = monitor.start_operation(name)
+                monitor.end_operation(operation_id)
+                monitor.record_metric("shared", 0.001)
+        
+        threads = [threading.Thread(target=worker, args=(f"op{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = monitor.get_stats()
+        assert stats["shared"].count == 4000
+        assert all(stats[f"op{i}"].count == 500 for i in range(8))
+    
+    def test_in_flight_operations_are_bounded(self):
+        """Test that operations that never end are pruned."""
+        monitor = PerformanceMonitor(max_in_flight=PerformanceMonitor.SHARDS * 4)
+        leaked = [monitor.start_operation_fast("leak") for _ in range(1000)]
+        
+        in_flight = sum(len(shard.operations) for shard in monitor._shards)
+        assert in_flight <= monitor.max_in_flight
+        # The oldest operations were pruned, the newest still end normally
+        assert monitor.end_operation_fast(leaked[0]) is None
+        assert monitor.end_operation_fast(leaked[-1]) is not None
+    
+    def test_stale_in_flight_operations_expire(self):
+        """Test that operations past the TTL are pruned first."""
+        monitor = PerformanceMonitor(max_in_flight=PerformanceMonitor.SHARDS * 4,
+                                     in_flight_ttl=0.0)
+        for _ in range(200):
+            monitor.start_operation_fast("leak")
+        
+        # Each overflow sweeps every expired operation of its shard
+        in_flight = sum(len(shard.operations) for shard in monitor._shards)
+        assert in_flight < monitor.max_in_flight
+    
+    def test_batched_recording(self):
+        """Test that buffered metrics are flushed when full and on read."""
+        monitor = PerformanceMonitor(batch_size=4)
+        for _ in range(5):
+            monitor.record_metric_fast("op", 1_000)
+        
+        # The first four were flushed when the buffer filled
+        assert sum(stat.count for stat in monitor._operation_metrics("op").stats.values()) == 4
+        assert monitor.get_stats("op").count == 5
+        assert len(monitor.get_recent_metrics("op")) == 5
+    
+    def test_batched_recording_across_threads(self):
+        """Test that buffers of finished threads are still flushed."""
+        monitor = PerformanceMonitor(batch_size=64)
+        
+        def worker():
+            for _ in range(100):
+                monitor.record_metric("op", 0.001)
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert monitor.get_stats("op").count == 400
+        assert monitor._pending_buffers == []
+    
+    def test_fast_operations(self):
+        """Test the metadata-free recording variants."""
+        monitor = PerformanceMonitor()
+        operation_id = monitor.start_operation_fast("scan")
+        duration_ns = monitor.end_operation_fast(operation_id)
+        monitor.record_metric_fast("scan", 5_000)
+        
+        metrics = monitor.get_recent_metrics("scan")
+        assert metrics[0].duration_ns == duration_ns
+        assert metrics[1].duration_ns == 5_000
+        assert all(m.metadata is None for m in metrics)
+        
+        monitor.disable()
+        assert monitor.start_operation_fast("scan") == 0
+        assert monitor.end_operation_fast(0) is None
+
+
+class TestDecorators:
+    """Test suite for the monitoring decorators and context manager."""
+    
+    def setup_method(self):
+        """Install a fresh global monitor."""
+        self.monitor = PerformanceMonitor()
+        set_global_performance_monitor(self.monitor)
+    
+    def teardown_method(self):
+        """Restore a default global monitor."""
+        set_global_performance_monitor(PerformanceMonitor())
+    
+    def test_performance_monitor_decorator(self):
+        """Test timing with and without argument metadata."""
+        @performance_monitor("plain")
+        def plain(x):
+            return x + 1
+        
+        @performance_monitor("with_args", include_args=True)
+        def with_args(x, y=0):
+            return x + y
+        
+        assert plain(1) == 2
+        assert with_args(1, y=2) == 3
+        assert self.monitor.get_recent_metrics("plain")[0].metadata is None
+        assert self.monitor.get_recent_metrics("with_args")[0].metadata == {
+            "args_count": 1, "kwargs_count": 1
+        }
+    
+    def test_performance_monitor_decorator_follows_monitor(self):
+        """Test that the decorator notices a new monitor or cleared tables."""
+        @performance_monitor("cached")
+        def cached():
+            return None
+        
+        cached()
+        self.monitor.clear_metrics()
+        cached()
+        assert self.monitor.get_stats("cached").count == 1
+        
+        replacement = PerformanceMonitor()
+        set_global_performance_monitor(replacement)
+        cached()
+        assert replacement.get_stats("cached").count == 1
+        assert self.monitor.get_stats("cached").count == 1
+    
+    def test_performance_monitor_decorator_batched(self):
+        """Test the decorator with a batching global monitor."""
+        batched = PerformanceMonitor(batch_size=8)
+        set_global_performance_monitor(batched)
+        
+        @performance_monitor("batched")
+        def batched_call():
+            return None
+        
+        for _ in range(3):
+            batched_call()
+        assert batched.get_stats("batched").count == 3
+    
+    def test_performance_monitor_decorator_signatures(self):
+        """Test that specialized wrappers keep every calling convention."""
+        @performance_monitor("mixed")
+        def mixed(a, b=None, /, c=2, *, d, e=()):
+            return a, b, c, d, e
+        
+        @performance_monitor("only_keywords")
+        def only_keywords(*, key):
+            return key
+        
+        @performance_monitor("variadic")
+        def variadic(*args, **kwargs):
+            return args, kwargs
+        
+        class Graph:
+            @performance_monitor("method")
+            def method(self, node):
+                return node
+        
+        assert mixed(1, d=4) == (1, None, 2, 4, ())
+        assert mixed(1, 2, c=3, d=4, e=5) == (1, 2, 3, 4, 5)
+        with pytest.raises(TypeError):
+            mixed(a=1, d=4)
+        assert only_keywords(key="k") == "k"
+        assert variadic(1, x=2) == ((1,), {"x": 2})
+        assert Graph().method("n") == "n"
+        
+        assert inspect.signature(mixed) == inspect.signature(mixed.__wrapped__)
+        # Generated with the real parameters rather than *args, **kwargs
+        assert mixed.__code__.co_argcount == 3
+        assert variadic.__code__.co_argcount == 0
+        assert mixed.__name__ == "mixed"
+        for name in ("mixed", "only_keywords", "variadic", "method"):
+            assert self.monitor.get_stats(name).count >= 1
+        # Failed binding never reached the function and records nothing extra
+        assert self.monitor.get_stats("mixed").count == 2
+    
+    def test_performance_monitor_decorator_wrapped_function(self):
+        """Test that a wraps() decorator's own signature is the one wrapped."""
+        def inject(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                return func("INJECTED", *args, **kwargs)
+            return wrapper
+        
+        @performance_monitor("handler")
+        @inject
+        def handler(context, x):
+            return context, x
+        
+        assert handler(1) == ("INJECTED", 1)
+        assert self.monitor.get_stats("handler").count == 1
+    
+    def test_performance_monitor_decorator_error(self):
+        """Test that failures are recorded with the error message."""
+        @performance_monitor("failing")
+        def failing():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError):
+            failing()
+        assert self.monitor.get_recent_metrics("failing")[0].metadata == {"error": "boom"}
+    
+    def test_timed_and_context(self):
+        """Test the timed decorator and performance_context."""
+        @timed("timed_op")
+        def work():
+            return 42
+        
+        assert work() == 42
+        with performance_context("ctx", phase="load"):
+            pass
+        with performance_context("ctx"):
+            pass
+        
+        assert self.monitor.get_stats("timed_op").count == 1
+        metrics = self.monitor.get_recent_metrics("ctx")
+        assert [m.metadata for m in metrics] == [{"phase": "load"}, None]
+    
+    def test_disabled_global_monitor(self):
+        """Test that disabling the global monitor skips instrumentation."""
+        @performance_monitor("decorated")
+        def decorated():
+            return 1
+        
+        @timed("timed_op")
+        def work():
+            return 2
+        
+        self.monitor.disable()
+        assert decorated() == 1
+        assert work() == 2
+        with performance_context("ctx", phase="load"):
+            pass
+        assert self.monitor.get_stats() == {}
+        
+        # Other monitors do not affect the global one
+        PerformanceMonitor().disable()
+        self.monitor.enable()
+        assert decorated() == 1
+        assert self.monitor.get_stats("decorated").count == 1
+        
+        # Installing a disabled monitor disables instrumentation too
+        disabled = PerformanceMonitor()
+        disabled.disable()
+        set_global_performance_monitor(disabled)
+        assert work() == 2
+        assert disabled.get_stats() == {}
+
+
+class TestBenchmarkRunner:
+    """Test suite for BenchmarkRunner."""
+    
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_run_benchmark(self, monkeypatch, use_numpy):
+        """Test per-call statistics with and without NumPy."""
+        if not use_numpy:
+            monkeypatch.setattr(performance, "np", None)
+        calls = []
+        
+        def work(value):
+            calls.append(value)
+        
+        runner = BenchmarkRunner()
+        results = runner.run_benchmark(work, iterations=20, warmup_iterations=2,
+                                       inner_loops=5, value=1)
+        
+        assert len(calls) == 2 + 20 * 5
+        assert results["function"] == "work"
+        assert results["iterations"] == 20
+        assert 0 < results["min_time"] <= results["median_time"] <= results["max_time"]
+        assert results["min_time"] <= results["avg_time"] <= results["max_time"]
+        assert results["avg_time"] * 100 == pytest.approx(results["total_time"])
+        assert results["throughput"] == pytest.approx(1 / results["avg_time"])
+        assert runner.results == [results]
+    
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_run_benchmark_statistics(self, monkeypatch, use_numpy):
+        """Test the sample statistics against known durations."""
+        if not use_numpy:
+            monkeypatch.setattr(performance, "np", None)
+        # Start/end readings giving samples of 10, 40, 20 and 30 ns
+        readings = iter([0, 10, 100, 140, 200, 220, 300, 330])
+        
+        results = BenchmarkRunner().run_benchmark(lambda: None, iterations=4, warmup_iterations=0,
+                                                  timer=lambda: next(readings))
+        assert results["total_time"] == pytest.approx(100e-9)
+        assert results["avg_time"] == pytest.approx(25e-9)
+        assert results["min_time"] == pytest.approx(10e-9)
+        assert results["max_time"] == pytest.approx(40e-9)
+        assert results["median_time"] == pytest.approx(25e-9)
+        assert results["std_dev"] == pytest.approx(12.909944e-9)
+    
+    def test_automatic_inner_loops(self):
+        """Test that fast functions are batched up to the minimum sample time."""
+        runner = BenchmarkRunner()
+        results = runner.run_benchmark(lambda: None, iterations=5, warmup_iterations=0,
+                                       inner_loops=None)
+        
+        assert results["inner_loops"] > 1
+        # Each sample lasted roughly MIN_SAMPLE_NS or more
+        assert results["avg_time"] * results["inner_loops"] * 1e9 >= runner.MIN_SAMPLE_NS / 4
+    
+    def test_get_speedup(self):
+        """Test the speedup between two recorded benchmarks."""
+        def slow():
+            return sum(range(1000))
+        
+        def fast():
+            return None
+        
+        runner = BenchmarkRunner()
+        results = runner.compare_functions([slow, fast], iterations=10)
+        assert set(results) == {"slow", "fast"}
+        assert runner.get_speedup("slow", "fast") > 0
+        assert runner.get_speedup("slow", "missing") == 0.0
@@ -0,0 +1,520 @@
+"""
+Test suite for FastGraph traversal operations.
+
+This module tests the CSR-backed traversal algorithms in
+TraversalOperations, including snapshot invalidation on graph mutation.
+"""
+
+import pytest
+import subprocess
+import sys
+
+# Add the fastgraph package to the path
+sys.path.insert(0, '.')
+
+from fastgraph.core import _traversal_kernels as kernels
+from fastgraph.core.graph import FastGraph
+from fastgraph.exceptions import NodeNotFoundError, TraversalError, ValidationError
+
+
+def build_graph(edges, extra_nodes=()):
+    """Create a graph from (src, dst, rel) tuples."""
+    graph = FastGraph("traversal_test")
+    names = set(extra_nodes)
+    for src, dst, _ in edges:
+        names.update((src, dst))
+    for name in sorted(names):
+        graph.add_node(name, label=name)
+    for src, dst, rel in edges:
+        graph.add_edge(src, dst, rel)
+    return graph
+
+
+class TestBreadthAndDepthFirst:
+    """Test suite for BFS and DFS traversal."""
+    
+    def setup_method(self):
+        """Set up a small diamond-with-tail graph."""
+        self.graph = build_graph([
+            ("A", "B", "knows"),
+            ("A", "C", "knows"),
+            ("B", "D", "knows"),
+            ("C", "D", "works_with"),
+            ("D", "E", "knows"),
+        ], extra_nodes=["Z"])
+        self.ops = self.graph.traversal_ops
+    
+    def test_bfs_visits_reachable_nodes(self):
+        """Test BFS visits every reachable node with correct depth."""
+        result = self.ops.bfs("A")
+        assert result.nodes == {"A", "B", "C", "D", "E"}
+        assert result.depth == 3
+        assert ["A", "B", "D", "E"] in result.paths
+        # Each discovered node is reached through exactly one tree edge
+        assert len(result.edges) == 4
+    
+    def test_bfs_max_depth(self):
+        """Test BFS stops expanding at max_depth."""
+        result = self.ops.bfs("A", max_depth=1)
+        assert result.nodes == {"A", "B", "C"}
+        assert result.depth == 1
+    
+    def test_bfs_filters(self):
+        """Test BFS honours edge and node filters."""
+        result = self.ops.bfs("A", edge_filter=lambda e: e.rel == "knows")
+        assert result.nodes == {"A", "B", "C", "D", "E"}
+        
+        result = self.ops.bfs("A", node_filter=lambda nid, attrs: nid != "B")
+        assert result.nodes == {"A", "C", "D", "E"}
+    
+    def test_dfs_order(self):
+        """Test DFS follows adjacency order depth-first."""
+        result = self.ops.dfs("A")
+        assert result.nodes == {"A", "B", "C", "D", "E"}
+        assert result.paths[0] == ["A"]
+        # D is first reached below B, the first neighbor popped
+        assert ["A", "B", "D", "E"] in result.paths
+    
+    def test_compact_results(self):
+        """Test compact results expose the same data with lazy paths."""
+        for traverse in (self.ops.bfs, self.ops.dfs):
+            for kwargs in ({}, {"max_depth": 1}, {"node_filter": lambda nid, attrs: nid != "B"}):
+                full = traverse("A", **kwargs)
+                compact = traverse("A", compact=True, **kwargs)
+                assert compact.nodes == full.nodes
+                assert compact.edges == full.edges
+                assert compact.depth == full.depth
+                assert compact.paths == full.paths
+                for path in full.paths:
+                    assert compact.get_path(path[-1]) == path
+        
+        compact = self.ops.bfs("A", compact=True)
+        assert compact.get_path("Z") is None
+        assert compact.get_path("missing") is None
+        assert compact.depths[compact.id_to_int["E"]] == 3
+    
+    def test_bfs_multi_matches_single_source(self):
+        """Test multi-source BFS agrees with one BFS per source."""
+        sources = ["A", "B", "D", "Z"]
+        reached = self.ops.bfs_multi(sources)
+        assert set(reached) == set(sources)
+        for source in sources:
+            assert reached[source] == self.ops.bfs(source).nodes
+        
+        reached = self.ops.bfs_multi(sources, max_depth=1)
+        assert reached["A"] == {"A", "B", "C"}
+        
+        with pytest.raises(NodeNotFoundError):
+            self.ops.bfs_multi(["A", "missing"])
+    
+    @pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_compiled_kernels_match_python(self, monkeypatch):
+        """Test the Numba kernels agree with the pure-Python loops."""
+        self.ops._ensure_csr()
+        compiled = [(self.ops.bfs(s), self.ops.dfs(s), self.ops.shortest_path(s, "E"))
+                    for s in ("A", "C", "Z")]
+        
+        monkeypatch.setattr(kernels, "NUMBA_AVAILABLE", False)
+        for source, (bfs, dfs, path) in zip(("A", "C", "Z"), compiled):
+            expected = self.ops.bfs(source)
+            assert bfs.nodes == expected.nodes and bfs.depth == expected.depth
+            assert len(bfs.edges) == len(expected.edges)
+            expected = self.ops.dfs(source)
+            assert (dfs.nodes, dfs.edges, dfs.paths) == (expected.nodes, expected.edges, expected.paths)
+            assert path == self.ops.shortest_path(source, "E")
+    
+    def test_numba_imported_lazily(self):
+        """Test importing the package does not import Numba until a kernel runs."""
+        code = ("import sys, fastgraph; loaded = 'numba' in sys.modules; "
+                "from fastgraph.core import _traversal_kernels as k; "
+                "print(loaded, k.enabled() == ('numba' in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, check=True).stdout.split()
+        assert output == ["False", "True"]
+    
+    @pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_parallel_bfs_matches_sequential(self, monkeypatch):
+        """Test the parallel frontier kernel gives the same traversal."""
+        self.ops._ensure_csr()
+        expected = [self.ops.bfs(s, max_depth=d) for s in ("A", "C") for d in (None, 1)]
+        
+        monkeypatch.setattr(self.ops, "_PARALLEL_BFS_MIN_EDGES", 0)
+        actual = [self.ops.bfs(s, max_depth=d) for s in ("A", "C") for d in (None, 1)]
+        for got, want in zip(actual, expected):
+            assert (got.nodes, got.edges, got.depth, got.paths) == (want.nodes, want.edges, want.depth, want.paths)
+    
+    def test_neighbors_by_relation(self):
+        """Test relation-filtered neighbors use up-to-date per-relation rows."""
+        assert [n for n, _ in self.ops.neighbors_out("A", rel="knows")] == ["B", "C"]
+        assert [n for n, _ in self.ops.neighbors_in("D", rel="works_with")] == ["C"]
+        assert self.ops.neighbors_out("A", rel="missing") == []
+        assert self.ops.neighbors_out("Z", rel="knows") == []
+        
+        self.graph.add_edge("A", "D", "works_with")
+        assert [n for n, _ in self.ops.neighbors_out("A", rel="works_with")] == ["D"]
+        assert [n for n, _ in self.ops.neighbors_in("D", rel="works_with",
+                                                    edge_filter=lambda e: e.src == "A")] == ["A"]
+    
+    def test_neighbors_by_relation_stale_snapshot(self):
+        """Test relation lookups after a mutation do not rebuild the snapshot."""
+        self.ops.bfs("A")
+        snapshot = self.ops._csr
+        
+        self.graph.add_edge("A", "E", "knows")
+        assert [n for n, _ in self.ops.neighbors_out("A", rel="knows")] == ["B", "C", "E"]
+        assert [n for n, _ in self.ops.neighbors_in("E", rel="knows")] == ["D", "A"]
+        assert self.ops._csr is snapshot
+    
+    def test_degrees(self):
+        """Test per-node and bulk degrees, with and without relation."""
+        assert self.ops.degree("D") == (1, 2, 3)
+        assert self.ops.degree("D", rel="knows") == (1, 1, 2)
+        assert self.ops.degree("Z", rel="knows") == (0, 0, 0)
+        assert self.ops.degree("A", rel="missing") == (0, 0, 0)
+        
+        degrees = self.ops.all_degrees()
+        assert degrees == {node_id: self.ops.degree(node_id) for node_id in self.graph.graph["nodes"]}
+        assert self.ops.all_degrees(rel="works_with")["C"] == (1, 0, 1)
+        
+        self.graph.add_edge("Z", "A", "knows")
+        assert self.ops.degree("A") == (2, 1, 3)
+        assert self.ops.all_degrees()["Z"] == (1, 0, 1)
+    
+    def test_relation_degree_stale_snapshot(self):
+        """Test relation degrees after a mutation do not rebuild the snapshot."""
+        self.ops.bfs("A")
+        snapshot = self.ops._csr
+        
+        self.graph.add_edge("E", "D", "knows")
+        assert self.ops.degree("D", rel="knows") == (1, 2, 3)
+        assert self.ops.degree("D", rel="missing") == (0, 0, 0)
+        assert self.ops._csr is snapshot
+    
+    def test_neighbors_iter_matches_neighbors(self):
+        """Test the lazy neighbor iterator yields what neighbors() returns."""
+        for node_id in ("A", "D", "Z"):
+            for rel in (None, "knows", "works_with"):
+                assert list(self.ops.neighbors_iter(node_id, rel)) == self.ops.neighbors(node_id, rel)
+        assert list(self.graph.neighbors_iter("D")) == self.graph.neighbors("D")
+        
+        with pytest.raises(NodeNotFoundError):
+            self.ops.neighbors_iter("missing")
+        
+        def broken_filter(edge):
+            raise RuntimeError("boom")
+        
+        for method in (self.ops.neighbors_out, self.ops.neighbors_in, self.ops.neighbors):
+            with pytest.raises(TraversalError):
+                method("D", edge_filter=broken_filter)
+    
+    def test_missing_start_node(self):
+        """Test traversal from an unknown node raises."""
+        with pytest.raises(NodeNotFoundError):
+            self.ops.bfs("missing")
+        with pytest.raises(NodeNotFoundError):
+            self.ops.dfs("missing")
+
+
+class TestPathsAndComponents:
+    """Test suite for shortest paths and connected components."""
+    
+    def setup_method(self):
+        """Set up a graph with two components."""
+        self.graph = build_graph([
+            ("A", "B", "r"),
+            ("B", "C", "r"),
+            ("A", "C", "s"),
+            ("X", "Y", "r"),
+        ])
+        self.ops = self.graph.traversal_ops
+    
+    def test_shortest_path(self):
+        """Test shortest path and unreachable targets."""
+        assert self.ops.shortest_path("A", "C") == ["A", "C"]
+        assert self.ops.shortest_path("A", "C", edge_filter=lambda e: e.rel == "r") == ["A", "B", "C"]
+        assert self.ops.shortest_path("C", "A") is None
+        assert self.ops.shortest_path("A", "A") == ["A"]
+        with pytest.raises(NodeNotFoundError):
+            self.ops.shortest_path("A", "missing")
+    
+    def test_all_shortest_paths(self):
+        """Test every shortest path is returned, not just the first."""
+        graph = build_graph([
+            ("A", "B", "r"),
+            ("A", "C", "r"),
+            ("B", "D", "r"),
+            ("C", "D", "r"),
+            ("A", "D", "long"),
+        ])
+        ops = graph.traversal_ops
+        assert ops.all_shortest_paths("A", "D") == [["A", "D"]]
+        
+        paths = ops.all_shortest_paths("A", "D", edge_filter=lambda e: e.rel == "r")
+        assert sorted(paths) == [["A", "B", "D"], ["A", "C", "D"]]
+        assert ops.all_shortest_paths("D", "A") == []
+    
+    def test_find_paths(self):
+        """Test simple path enumeration with length limits and filters."""
+        assert list(self.ops.find_paths("A", "C")) == [["A", "B", "C"], ["A", "C"]]
+        assert list(self.ops.find_paths("A", "C", max_length=2)) == [["A", "C"]]
+        assert list(self.ops.find_paths("A", "C", edge_filter=lambda e: e.rel == "r")) == [["A", "B", "C"]]
+        assert list(self.ops.find_paths("A", "X")) == []
+        assert list(self.ops.find_paths("A", "A")) == [["A"]]
+        
+        # Each edge's filter verdict is reused across enumerated paths
+        calls = []
+        
+        def counting_filter(edge):
+            calls.append(edge)
+            return True
+        
+        clique = build_graph([(a, b, "r") for a in "ABCDE" for b in "ABCDE" if a != b])
+        paths = list(clique.traversal_ops.find_paths("A", "E", edge_filter=counting_filter))
+        assert len(paths) == 16
+        assert len(calls) <= len(clique._edges)
+        
+        graph = FastGraph("chain")
+        depth = sys.getrecursionlimit() * 2
+        graph.add_nodes_batch([(f"n{i}", {}) for i in range(depth)])
+        graph.add_edges_batch([(f"n{i}", f"n{i + 1}", "next") for i in range(depth - 1)])
+        paths = list(graph.traversal_ops.find_paths("n0", f"n{depth - 1}"))
+        assert len(paths) == 1 and len(paths[0]) == depth
+    
+    def test_connected_components(self):
+        """Test components treat edges as undirected."""
+        components = self.ops.connected_components()
+        assert sorted(map(sorted, components)) == [["A", "B", "C"], ["X", "Y"]]
+        assert self.ops.weakly_connected_components() == components
+    
+    @pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_parallel_components_match_sequential(self, monkeypatch):
+        """Test parallel component labeling agrees with the BFS version."""
+        self.graph.add_edge("Y", "X", "back")
+        self.graph.add_node("lonely")
+        expected = self.ops.connected_components(edge_filter=lambda e: True)
+        
+        monkeypatch.setattr(self.ops, "_PARALLEL_COMPONENTS_MIN_EDGES", 0)
+        assert self.ops.connected_components() == expected
+    
+    def test_subgraph_components(self):
+        """Test subgraph views find components within their own nodes."""
+        view = self.graph.create_subgraph_view("abx", lambda nid, attrs: nid in ("A", "C", "X"))
+        assert sorted(map(sorted, view.find_components())) == [["A", "C"], ["X"]]
+        assert not view.is_connected()
+        
+        view = self.graph.create_subgraph_view("abc", lambda nid, attrs: nid in ("A", "B", "C"))
+        assert view.is_connected()
+    
+    def test_subgraph_components_stale_snapshot(self):
+        """Test subgraph components after a parent mutation skip the rebuild."""
+        view = self.graph.create_subgraph_view("abxy", lambda nid, attrs: nid in ("A", "B", "X", "Y"))
+        self.ops._ensure_csr()
+        expected = sorted(map(sorted, view.find_components()))
+        assert expected == [["A", "B"], ["X", "Y"]]
+        
+        self.graph.add_node("lonely")
+        snapshot = self.ops._csr
+        assert sorted(map(sorted, view.find_components())) == expected
+        assert not view.is_connected()
+        
+        self.graph.add_edge("Y", "B", "r")
+        assert view.is_connected()
+        assert self.ops._csr is snapshot
+    
+    def test_snapshot_tracks_mutations(self):
+        """Test the CSR snapshot is rebuilt after graph changes."""
+        assert self.ops.shortest_path("C", "X") is None
+        
+        self.graph.add_edge("C", "X", "r")
+        assert self.ops.shortest_path("C", "X") == ["C", "X"]
+        assert len(self.ops.connected_components()) == 1
+        
+        self.graph.remove_edge("C", "X", "r")
+        assert self.ops.shortest_path("C", "X") is None
+        
+        self.graph.remove_node("B")
+        assert self.ops.shortest_path("A", "C") == ["A", "C"]
+        assert self.ops.bfs("A").nodes == {"A", "C"}
+        
+        # clear() swaps in a fresh node dict
+        self.graph.clear()
+        with pytest.raises(NodeNotFoundError):
+            self.ops.neighbors_out("A")
+        self.graph.add_node("A")
+        assert self.ops.bfs("A").nodes == {"A"}
+    
+    def test_point_queries_skip_rebuild_after_mutation(self, monkeypatch):
+        """Test point traversals on a stale snapshot match the CSR results."""
+        graph = build_graph([(a, b, "r" if (i + j) % 3 else "s")
+                             for i, a in enumerate("ABCDEFGH")
+                             for j, b in enumerate("ABCDEFGH") if (i * j + i) % 4 == 1])
+        ops = graph.traversal_ops
+        keep_r = lambda e: e.rel == "r"
+        
+        def run():
+            results = []
+            for start in "ABCH":
+                for kwargs in ({}, {"max_depth": 1}, {"edge_filter": keep_r}):
+                    for traverse in (ops.bfs, ops.dfs):
+                        result = traverse(start, **kwargs)
+                        results.append((result.nodes, result.depth, len(result.edges)))
+                    results.append(ops.dfs(start, **kwargs).paths)
+                for end in "ADGH":
+                    results.append(ops.shortest_path(start, end))
+                    results.append(ops.shortest_path(start, end, edge_filter=keep_r))
+                    results.append(sorted(ops.all_shortest_paths(start, end)))
+                    results.append(sorted(ops.all_shortest_paths(start, end, edge_filter=keep_r)))
+                    results.append(list(ops.find_paths(start, end, max_length=4)))
+                    results.append(list(ops.find_paths(start, end, edge_filter=keep_r)))
+            return results
+        
+        ops._ensure_csr()
+        expected = run()
+        
+        graph.add_node("extra")
+        snapshot = ops._csr
+        monkeypatch.setattr(ops, "_CSR_REBUILD_QUERIES", 10 ** 9)
+        assert run() == expected
+        assert ops._csr is snapshot
+        
+        # Enough queries without another mutation rebuild the snapshot
+        monkeypatch.setattr(ops, "_CSR_REBUILD_QUERIES", 2)
+        ops.shortest_path("A", "D")
+        assert ops._csr is not snapshot
+        assert ops._csr.version == graph._mutation_version
+    
+    def test_reorder_preserves_results(self):
+        """Test node reordering changes layout but not traversal results."""
+        expected = (self.ops.bfs("A").nodes, self.ops.dfs("A").paths,
+                    self.ops.shortest_path("A", "C"))
+        for mode in ("freq", "rcm", "gorder"):
+            self.ops.reorder(mode)
+            assert sorted(self.ops._ensure_csr().int_to_id) == sorted(self.graph.graph["nodes"])
+            assert (self.ops.bfs("A").nodes, self.ops.dfs("A").paths,
+                    self.ops.shortest_path("A", "C")) == expected
+        
+        # The ordering is reapplied after mutations
+        self.graph.add_edge("C", "X", "r")
+        assert self.ops.shortest_path("A", "Y") == ["A", "C", "X", "Y"]
+        
+        self.ops.reorder(None)
+        assert self.ops._ensure_csr().int_to_id == list(self.graph.graph["nodes"])
+        with pytest.raises(ValidationError):
+            self.ops.reorder("hilbert")
+
+
+class TestCyclesAndOrdering:
+    """Test suite for cycle detection and topological sorting."""
+    
+    def test_dag_topological_order(self):
+        """Test topological order respects every edge."""
+        graph = build_graph([
+            ("shirt", "tie", "before"),
+            ("tie", "jacket", "before"),
+            ("pants", "shoes", "before"),
+            ("pants", "belt", "before"),
+            ("belt", "jacket", "before"),
+        ], extra_nodes=["watch"])
+        ops = graph.traversal_ops
+        assert not ops.has_cycles()
+        
+        order = ops.topological_sort()
+        assert sorted(order) == sorted(graph.graph["nodes"])
+        position = {node_id: i for i, node_id in enumerate(order)}
+        for edge in graph._edges.values():
+            assert position[edge.src] < position[edge.dst]
+    
+    def test_cycles_and_self_loops(self):
+        """Test cycles, including self-loops, are detected."""
+        graph = build_graph([("A", "B", "r"), ("B", "C", "r")])
+        ops = graph.traversal_ops
+        assert not ops.has_cycles()
+        
+        graph.add_edge("C", "C", "r")
+        assert ops.has_cycles()
+        assert ops.topological_sort() is None
+        
+        graph.remove_edge("C", "C", "r")
+        graph.add_edge("C", "A", "r")
+        assert ops.has_cycles()
+        assert ops.topological_sort() is None
+    
+    def test_results_memoized_until_mutation(self):
+        """Test memoized whole-graph results are copies and get invalidated."""
+        graph = build_graph([("A", "B", "r"), ("C", "D", "r")])
+        ops = graph.traversal_ops
+        
+        order = ops.topological_sort()
+        order.reverse()
+        assert ops.topological_sort() == ["A", "C", "B", "D"]
+        
+        components = ops.connected_components()
+        components[0].add("X")
+        assert sorted(map(sorted, ops.connected_components())) == [["A", "B"], ["C", "D"]]
+        
+        graph.add_edge("B", "C", "r")
+        assert len(ops.connected_components()) == 1
+        assert ops.topological_sort() == ["A", "B", "C", "D"]
+        
+        graph.add_edge("D", "A", "r")
+        assert ops.topological_sort() is None
+        assert ops.has_cycles()
+    
+    def test_long_chain_is_not_recursive(self):
+        """Test deep graphs don't hit the recursion limit."""
+        graph = FastGraph("chain")
+        depth = sys.getrecursionlimit() * 2
+        graph.add_nodes_batch([(f"n{i}", {}) for i in range(depth)])
+        graph.add_edges_batch([(f"n{i}", f"n{i + 1}", "next") for i in range(depth - 1)])
+        ops = graph.traversal_ops
+        assert not ops.has_cycles()
+        assert ops.topological_sort() == [f"n{i}" for i in range(depth)]
+    
+    def test_lowest_common_ancestor(self):
+        """Test LCA on a tree, across trees and through a cycle."""
+        graph = build_graph([
+            ("root", "a", "child"),
+            ("root", "b", "child"),
+            ("a", "a1", "child"),
+            ("a", "a2", "child"),
+            ("a2", "a2x", "child"),
+            ("other", "o1", "child"),
+        ])
+        ops = graph.traversal_ops
+        assert ops.lca("a1", "a2x") == "a"
+        assert ops.lca("a2x", "b") == "root"
+        assert ops.lca("a", "a2x") == "a"
+        assert ops.lca("a1", "a1") == "a1"
+        assert ops.lca("a1", "o1") is None
+        
+        # A cycle collapses into one ancestor component
+        graph.add_edge("b", "root", "child")
+        assert ops.lca("a1", "b") in {"root", "b"}
+        
+        with pytest.raises(NodeNotFoundError):
+            ops.lca("a1", "missing")
+    
+    def test_lca_stale_snapshot(self):
+        """Test LCA walks parent chains instead of rebuilding after a mutation."""
+        graph = build_graph([
+            ("root", "a", "child"),
+            ("root", "b", "child"),
+            ("a", "a1", "child"),
+            ("a", "a2", "child"),
+            ("a2", "a2x", "child"),
+            ("other", "o1", "child"),
+        ])
+        ops = graph.traversal_ops
+        pairs = [("a1", "a2x"), ("a2x", "b"), ("a", "a2x"), ("a1", "a1"), ("a1", "o1")]
+        expected = [ops.lca(a, b) for a, b in pairs]
+        snapshot = ops._csr
+        
+        graph.add_node("extra")
+        assert [ops.lca(a, b) for a, b in pairs] == expected
+        assert ops._csr is snapshot
+        assert ops.lca("extra", "a1") is None
+        
+        # A second parent falls back to the lifting tables
+        graph.add_edge("other", "a2", "child")
+        assert ops.lca("a2x", "a1") in {"a", None}
+        assert ops._csr is not snapshot